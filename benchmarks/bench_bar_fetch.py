@@ -0,0 +1,106 @@
+"""Historical bar retrieval, one request versus chunked parallel requests.
+
+    python benchmarks/bench_bar_fetch.py --symbols 500 3000 --bars 150
+
+The API is simulated with a fixed latency per request plus a transfer time
+per symbol, and answers with a freshly built bars frame like the Alpaca
+client does. The rate limit is lifted so the comparison isolates request
+concurrency and the assembly of the matrix. Peak memory is traced with
+tracemalloc over the whole call, response frames included.
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from alpaca_trade_api import TimeFrame
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from logic_modules import news_fetcher, price_utils
+from logic_modules.price_utils import bars_to_prices, fetch_price_matrix
+
+
+class SlowBarsAPI:
+    def __init__(self, symbols, bars, latency, per_symbol):
+        self.latency = latency
+        self.per_symbol = per_symbol
+        self.index = pd.bdate_range(end="2024-08-01", periods=bars, tz="UTC")
+        self.closes = 100 + np.random.default_rng(0).random((bars, len(symbols)))
+        self.position = {symbol: i for i, symbol in enumerate(symbols)}
+
+    def get_bars(self, symbols, timeframe, start=None):
+        time.sleep(self.latency + self.per_symbol * len(symbols))
+        columns = [self.position[symbol] for symbol in symbols]
+        bars = len(self.index)
+        frame = pd.DataFrame(
+            {
+                "close": self.closes[:, columns].T.ravel(),
+                "open": self.closes[:, columns].T.ravel(),
+                "volume": 1e6,
+                "symbol": np.repeat(symbols, bars),
+            },
+            index=pd.DatetimeIndex(np.tile(self.index, len(symbols)), name="timestamp"),
+        )
+        return SimpleNamespace(df=frame)
+
+
+def single_request(api, symbols, bars):
+    return bars_to_prices(api.get_bars(symbols, TimeFrame.Day).df, symbols)
+
+
+def chunked(api, symbols, bars):
+    return fetch_price_matrix(api, symbols, bars)
+
+
+def measure(function, *args):
+    # Timed and traced in separate runs, tracing slows allocations down a lot
+    started = time.perf_counter()
+    function(*args)
+    seconds = time.perf_counter() - started
+    tracemalloc.start()
+    prices = function(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 2**20, prices
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, nargs="+", default=[500, 3000])
+    parser.add_argument("--bars", type=int, default=150)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--per-symbol", type=float, default=2e-4)
+    parser.add_argument(
+        "--chunk-size", type=int, default=price_utils.config["chunk_size"]
+    )
+    parser.add_argument(
+        "--workers", type=int, default=price_utils.config["max_workers"]
+    )
+    args = parser.parse_args()
+    news_fetcher.set_config({"requests_per_second": 1e9, "burst": 1e9})
+    price_utils.set_config({"chunk_size": args.chunk_size, "max_workers": args.workers})
+
+    print(
+        f"{'symbols':>8}{'single s':>10}{'single MiB':>12}"
+        f"{'chunked s':>11}{'chunked MiB':>13}{'speedup':>9}"
+    )
+    for count in args.symbols:
+        symbols = [f"SYM{i:04d}" for i in range(count)]
+        api = SlowBarsAPI(symbols, args.bars, args.latency, args.per_symbol)
+        single_s, single_mb, expected = measure(single_request, api, symbols, args.bars)
+        chunked_s, chunked_mb, prices = measure(chunked, api, symbols, args.bars)
+        np.testing.assert_allclose(prices.to_numpy(), expected.to_numpy(), rtol=1e-6)
+        print(
+            f"{count:>8}{single_s:>10.2f}{single_mb:>12.1f}"
+            f"{chunked_s:>11.2f}{chunked_mb:>13.1f}{single_s / chunked_s:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Vectorized backtest engine wall time over years of daily bars.
+
+python benchmarks/bench_fast_backtest.py --symbols 25 500 --years 1 5 10
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from logic_modules.fast_backtest import run_fast_backtest
+from logic_modules.local_data import LocalDataset
+
+
+def synthetic_dataset(symbols, days, rng):
+    index = pd.bdate_range("2000-01-03", periods=days, tz="America/New_York")
+    closes = 100 * np.exp(np.cumsum(rng.normal(3e-4, 0.02, (days, symbols)), 0))
+    bars = {
+        f"SYM{i:04d}": pd.DataFrame(
+            {
+                "open": closes[:, i],
+                "high": closes[:, i],
+                "low": closes[:, i],
+                "close": closes[:, i],
+                "volume": 1e6,
+            },
+            index=index.tz_convert("UTC"),
+        )
+        for i in range(symbols)
+    }
+    return LocalDataset(bars), index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, nargs="+", default=[25, 500])
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--bars-length", type=int, default=150)
+    args = parser.parse_args()
+    logging.getLogger("tradebot").setLevel(logging.WARNING)
+
+    rng = np.random.default_rng(0)
+    print(f"{'symbols':>8}{'years':>7}{'days':>7}{'seconds':>10}{'trades':>9}")
+    for count in args.symbols:
+        for years in args.years:
+            days = years * 252 + args.bars_length
+            dataset, index = synthetic_dataset(count, days, rng)
+            start = index[args.bars_length].tz_localize(None).to_pydatetime()
+            end = datetime(index[-1].year + 1, 1, 1)
+            started = time.perf_counter()
+            run = run_fast_backtest(dataset, start, end, bars_length=args.bars_length)
+            elapsed = time.perf_counter() - started
+            print(
+                f"{count:>8}{years:>7}{len(run.equity):>7}"
+                f"{elapsed:>10.2f}{len(run.trades):>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Throughput and fp32 agreement of the FinBERT inference backends.
+
+    python benchmarks/bench_finbert_backends.py --headlines 512 --backends torch int8 onnx
+
+Uses FINBERT_MODEL (ProsusAI/finbert by default). The sentiment cache is
+bypassed so every run measures the model itself.
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from logic_modules.finbert_utils import MAX_BATCH_SIZE, MODEL_NAME, ModelHandle
+
+COMPANIES = ["Apple", "Microsoft", "Tesla", "JPMorgan", "Pfizer", "Exxon", "Boeing"]
+EVENTS = [
+    "beats quarterly earnings estimates",
+    "misses revenue forecasts as demand slows",
+    "announces share buyback program",
+    "faces regulatory probe over accounting",
+    "shares rally after upbeat guidance",
+    "cuts jobs amid restructuring",
+    "holds annual shareholder meeting",
+    "stock plunges on weak outlook",
+]
+SUFFIXES = ["", " analysts say", " in early trading", " despite market turmoil"]
+
+
+def synthetic_headlines(count):
+    combos = itertools.cycle(itertools.product(COMPANIES, EVENTS, SUFFIXES))
+    return [f"{c} {e}{s}" for c, e, s in itertools.islice(combos, count)]
+
+
+def score(handle, headlines, batch_size):
+    tokenizer, backend = handle.load()
+    predictions = []
+    for start in range(0, len(headlines), batch_size):
+        tokens = tokenizer(
+            headlines[start : start + batch_size], return_tensors="pt", padding=True
+        )
+        predictions.extend(backend.logits(tokens).argmax(-1).tolist())
+    return predictions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--headlines", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backends", nargs="+", default=["torch", "int8", "onnx"])
+    args = parser.parse_args()
+
+    headlines = synthetic_headlines(args.headlines)
+    reference = None
+    print(f"model: {MODEL_NAME}, {len(headlines)} headlines, batch {args.batch_size}")
+    print(f"{'backend':<10}{'load s':>9}{'headlines/s':>14}{'agreement':>12}")
+    for name in ["torch"] + [b for b in args.backends if b != "torch"]:
+        handle = ModelHandle(MODEL_NAME, name)
+        started = time.perf_counter()
+        try:
+            handle.load()
+        except ImportError as e:
+            print(f"{name:<10} skipped: {e}")
+            continue
+        load_time = time.perf_counter() - started
+
+        score(handle, headlines[: args.batch_size], args.batch_size)  # warm up
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            predictions = score(handle, headlines, args.batch_size)
+            best = min(best, time.perf_counter() - started)
+
+        if reference is None:
+            reference = predictions
+        agreement = sum(a == b for a, b in zip(predictions, reference)) / len(reference)
+        if name in args.backends:
+            print(
+                f"{name:<10}{load_time:>9.1f}{len(headlines) / best:>14.1f}{agreement:>12.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
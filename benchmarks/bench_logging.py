@@ -0,0 +1,64 @@
+"""Logging cost on the calling thread, synchronous vs queued handlers.
+
+python benchmarks/bench_logging.py --records 20000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import logger_setup
+
+
+def timed(logger, records, message):
+    started = time.perf_counter()
+    for i in range(records):
+        message(logger, i)
+    return (time.perf_counter() - started) / records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=20000)
+    args = parser.parse_args()
+
+    prices = pd.DataFrame(np.random.default_rng(0).random((30, 500)))
+    messages = {
+        "f-string": lambda logger, i: logger.info(f"Momentum: {i} {i * 0.5}"),
+        "lazy": lambda logger, i: logger.info("Momentum: %d %s", i, i * 0.5),
+        # The old per-iteration DataFrame dump vs the lazy debug record
+        "df f-string": lambda logger, i: logger.info(f"Prices: {prices.head()}"),
+        "df lazy debug": lambda logger, i: logger.debug("Prices:\n%s", prices),
+    }
+
+    print(f"{'handler':>14}{'message':>15}{'us/record':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in ("sync", "async", "async json"):
+            logger_setup.set_config(
+                {"async": mode != "sync", "format": mode.split()[-1]}
+            )
+            logger = logging.getLogger(f"bench.{mode}")
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            path = os.path.join(directory, f"{mode}.log")
+            logger_setup.configure_logger(logger, path, console=False)
+            for name, message in messages.items():
+                records = args.records // (1000 if "df" in name else 1)
+                seconds = timed(logger, records, message)
+                print(f"{mode:>14}{name:>15}{seconds * 1e6:>11.1f}")
+            logger_setup.stop_logging(logger)
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+                handler.close()
+
+
+if __name__ == "__main__":
+    main()
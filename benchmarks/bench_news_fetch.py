@@ -0,0 +1,59 @@
+"""News prefetch wall time, one symbol at a time versus the concurrent fetcher.
+
+    python benchmarks/bench_news_fetch.py --symbols 25 500 --latency 0.15
+
+The API is simulated with a fixed per-request latency; the rate limit is
+lifted so the comparison isolates request concurrency.
+"""
+
+import argparse
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from logic_modules import news_fetcher
+
+
+class SlowNewsAPI:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def get_news(self, symbol, start, end, limit=None):
+        time.sleep(self.latency)
+        return [SimpleNamespace(headline=f"{symbol} headline {i}") for i in range(5)]
+
+
+def timed(api, symbols, workers):
+    news_fetcher.set_config(
+        {"max_workers": workers, "requests_per_second": 1e9, "burst": 1e9}
+    )
+    started = time.perf_counter()
+    news_fetcher.fetch_headlines(api, symbols, "2024-01-01", "2024-01-04")
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, nargs="+", default=[25, 100])
+    parser.add_argument("--latency", type=float, default=0.15)
+    parser.add_argument(
+        "--workers", type=int, default=news_fetcher.config["max_workers"]
+    )
+    args = parser.parse_args()
+
+    api = SlowNewsAPI(args.latency)
+    print(f"{'symbols':>8}{'sequential s':>14}{'concurrent s':>14}{'speedup':>9}")
+    for count in args.symbols:
+        symbols = [f"SYM{i}" for i in range(count)]
+        sequential = timed(api, symbols, 1)
+        concurrent = timed(api, symbols, args.workers)
+        print(
+            f"{count:>8}{sequential:>14.2f}{concurrent:>14.2f}{sequential / concurrent:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""News ingestion per daily iteration, full window rescoring versus the news window.
+
+    python benchmarks/bench_news_ingest.py --symbols 25 500 --days 20
+
+Every symbol gets --per-day articles a day from an API that takes --transfer
+seconds per article returned. The full path fetches and scores the whole
+three day window on every iteration, as ``fetch_headlines`` and
+``estimate_sentiment_batch`` did. The incremental path keeps a ``NewsWindow``.
+The headline cache is disabled and the model is a stand-in that costs --cost
+seconds per headline, so the scoring work is visible.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from logic_modules import finbert_utils
+from logic_modules.finbert_utils import estimate_sentiment_batch
+from logic_modules.news_fetcher import fetch_headlines
+from logic_modules.news_window import NewsWindow
+from logic_modules.sentiment_cache import SentimentCache
+
+START = pd.Timestamp("2024-01-01", tz="UTC")
+
+
+def stand_in_logits(cost):
+    import torch
+
+    def logits(headlines, max_batch_size=finbert_utils.MAX_BATCH_SIZE):
+        time.sleep(cost * len(headlines))
+        return torch.ones(len(headlines), len(finbert_utils.labels))
+
+    return logits
+
+
+class NewsAPI:
+    """Articles at random minutes of the days, --transfer seconds per article."""
+
+    offline = True
+
+    def __init__(self, count, days, per_day, transfer, seed=0):
+        rng = np.random.default_rng(seed)
+        self.symbols = [f"SYM{i:04d}" for i in range(count)]
+        self.transfer = transfer
+        self.now = START
+        self.times = {
+            symbol: np.sort(
+                START
+                + pd.to_timedelta(rng.integers(0, days * 24 * 60, days * per_day), "m")
+            )
+            for symbol in self.symbols
+        }
+
+    def get_news(self, symbol, start, end, limit=None):
+        times = self.times[symbol]
+        lower = np.searchsorted(
+            times, pd.Timestamp(start, tz=None if "+" in start else "UTC")
+        )
+        upper = np.searchsorted(times, self.now, side="right")
+        if limit is not None:
+            lower = max(lower, upper - limit)  # the newest ones
+        time.sleep(self.transfer * max(0, upper - lower))
+        return [
+            SimpleNamespace(
+                id=f"{symbol}-{i}",
+                headline=f"{symbol} headline {i}",
+                created_at=times[i],
+            )
+            for i in range(lower, upper)
+        ]
+
+
+def run(api, days, incremental):
+    """Seconds and articles fetched per iteration, after the first one."""
+    window = NewsWindow(api.symbols)
+    seconds, fetched = [], []
+    for day in range(3, days):
+        api.now = START + pd.Timedelta(days=day, hours=13)
+        today = api.now.strftime("%Y-%m-%d")
+        start = (api.now - pd.Timedelta(days=3)).strftime("%Y-%m-%d")
+        before = window.stats["fetched"]
+        started = time.perf_counter()
+        if incremental:
+            window.update(api, start, today)
+            window.sentiments()
+            fetched.append(window.stats["fetched"] - before)
+        else:
+            news = fetch_headlines(api, api.symbols, start, today)
+            estimate_sentiment_batch(news)
+            fetched.append(sum(map(len, news.values())))
+        seconds.append(time.perf_counter() - started)
+    # The first iteration fills the window on both paths
+    return np.mean(seconds[1:]), np.mean(fetched[1:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, nargs="+", default=[25, 500])
+    parser.add_argument("--days", type=int, default=20)
+    parser.add_argument("--per-day", type=int, default=5)
+    parser.add_argument("--cost", type=float, default=2e-4)
+    parser.add_argument("--transfer", type=float, default=1e-4)
+    args = parser.parse_args()
+    logging.getLogger("tradebot").setLevel(logging.WARNING)
+    finbert_utils._model_logits = stand_in_logits(args.cost)
+    finbert_utils.sentiment_cache = SentimentCache(path=None, max_memory_items=0)
+
+    print(
+        f"{'symbols':>8}{'full s':>9}{'articles':>10}"
+        f"{'window s':>10}{'articles':>10}{'speedup':>9}"
+    )
+    for count in args.symbols:
+        api = NewsAPI(count, args.days, args.per_day, args.transfer)
+        full_s, full_n = run(api, args.days, incremental=False)
+        window_s, window_n = run(api, args.days, incremental=True)
+        print(
+            f"{count:>8}{full_s:>9.3f}{full_n:>10.0f}"
+            f"{window_s:>10.3f}{window_n:>10.0f}{full_s / window_s:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
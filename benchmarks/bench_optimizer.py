@@ -0,0 +1,74 @@
+"""Portfolio optimization latency, full PyPortfolioOpt recompute vs rolling moments.
+
+python benchmarks/bench_optimizer.py --symbols 10 50 200 --bars 60 --steps 20
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from pypfopt.efficient_frontier import EfficientFrontier
+from pypfopt.expected_returns import mean_historical_return
+from pypfopt.risk_models import CovarianceShrinkage
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from logic_modules import portfolio_utils
+
+
+def recompute(historical_prices):
+    """The previous implementation, every estimate rebuilt from the whole window."""
+    mu = mean_historical_return(historical_prices)
+    S = CovarianceShrinkage(historical_prices).ledoit_wolf()
+    ef = EfficientFrontier(mu, S)
+    ef.max_sharpe()
+    return ef.clean_weights()
+
+
+def timed(function, windows):
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for window in windows:
+            function(window)
+    return (time.perf_counter() - started) / len(windows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--bars", type=int, default=60)
+    parser.add_argument("--steps", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'symbols':>8}{'recompute ms':>14}{'rolling ms':>12}{'cache hits':>12}")
+    for count in args.symbols:
+        total = args.bars + args.steps
+        prices = pd.DataFrame(
+            100 * np.exp(np.cumsum(rng.normal(3e-4, 0.01, (total, count)), 0)),
+            index=pd.date_range("2024-01-01", periods=total, freq="B", tz="UTC"),
+            columns=[f"SYM{i:04d}" for i in range(count)],
+        )
+        # Each step slides the window by one bar, and is then repeated as an
+        # iteration without a new bar would be
+        windows = [
+            prices.iloc[step : step + args.bars]
+            for step in range(args.steps)
+            for _ in range(2)
+        ]
+        portfolio_utils._moments = portfolio_utils.RollingMoments()
+        portfolio_utils._cache = portfolio_utils.OptimizerCache()
+        before = portfolio_utils.optimizer_stats()["cache_hits"]
+        old = timed(recompute, windows)
+        new = timed(portfolio_utils.optimize_portfolio, windows)
+        hits = portfolio_utils.optimizer_stats()["cache_hits"] - before
+        print(f"{count:>8}{old * 1e3:>14.2f}{new * 1e3:>12.2f}{hits:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Building the price matrix from a long bars frame, per-symbol masks vs one reshape.
+
+python benchmarks/bench_price_matrix.py --symbols 25 500 3000 --bars 150
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from logic_modules.price_utils import bars_to_prices
+
+
+def synthetic_bars(symbols, bars, missing=0.01, seed=0):
+    """Alpaca-style long bars frame with a fraction of bars randomly missing."""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2020-01-01", periods=bars, tz="UTC")
+    timestamps = np.tile(index, len(symbols))
+    names = np.repeat(symbols, bars)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (len(symbols), bars)), 1))
+    keep = rng.random(len(names)) > missing
+    frame = pd.DataFrame(
+        {"symbol": names[keep], "close": closes.ravel()[keep]},
+        index=pd.DatetimeIndex(timestamps[keep], name="timestamp"),
+    )
+    return frame
+
+
+def masked(bars, symbols):
+    """The previous implementation: one boolean mask over the frame per symbol.
+
+    Ragged columns are NaN-padded here; the original raised on them instead.
+    """
+    price_data = {}
+    for symbol in symbols:
+        df = bars[bars["symbol"] == symbol]
+        if not df.empty:
+            price_data[symbol] = pd.Series(df["close"].values)
+    return pd.DataFrame(price_data)
+
+
+def best_of(repeat, function, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, nargs="+", default=[25, 500, 3000])
+    parser.add_argument("--bars", type=int, default=150)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'symbols':>8}{'rows':>10}{'masked ms':>12}{'reshape ms':>12}{'speedup':>9}"
+    )
+    for count in args.symbols:
+        symbols = np.array([f"SYM{i:04d}" for i in range(count)])
+        bars = synthetic_bars(symbols, args.bars)
+        old = best_of(args.repeat, masked, bars, symbols)
+        new = best_of(args.repeat, bars_to_prices, bars, list(symbols))
+        print(
+            f"{count:>8}{len(bars):>10}{old * 1e3:>12.1f}{new * 1e3:>12.1f}{old / new:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Cold-start benchmark for the UI, the test suite and FinBERT loading.
+
+Every case runs in a fresh interpreter so import costs are not shared:
+
+    python benchmarks/bench_startup.py --repeat 3
+
+The "eager" case loads FinBERT right after building the UI, which is what
+every import paid before the model handle became lazy.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+
+CASES = {
+    "import finbert_utils": "import logic_modules.finbert_utils",
+    "main.create_ui (lazy)": "import main; main.create_ui()",
+    "main.create_ui (eager)": (
+        "import main; main.create_ui();"
+        "from logic_modules.finbert_utils import model_handle; model_handle.load()"
+    ),
+}
+
+PROBE = (
+    "import resource, time; started = time.perf_counter(); {code};"
+    "print(time.perf_counter() - started, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+)
+
+
+def run_case(code):
+    """Wall time of the snippet, total process time and peak RSS in MB."""
+    env = {**os.environ, "PYTHONPATH": SRC}
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(code=code)],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=ROOT,
+        check=True,
+    )
+    total = time.perf_counter() - started
+    inner, max_rss_kb = result.stdout.strip().splitlines()[-1].split()
+    return float(inner), total, int(max_rss_kb) / 1024
+
+
+def run_tests():
+    env = {**os.environ, "PYTHONPATH": SRC}
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "tests"],
+        capture_output=True,
+        env=env,
+        cwd=ROOT,
+    )
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-tests", action="store_true")
+    args = parser.parse_args()
+
+    print(f"{'case':<28}{'snippet s':>11}{'process s':>11}{'peak MB':>10}")
+    for name, code in CASES.items():
+        try:
+            runs = [run_case(code) for _ in range(args.repeat)]
+        except subprocess.CalledProcessError as e:
+            print(f"{name:<28} failed: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        inner, total, rss = (min(values) for values in zip(*runs))
+        print(f"{name:<28}{inner:>11.2f}{total:>11.2f}{rss:>10.0f}")
+
+    if not args.skip_tests:
+        print(f"{'pytest tests/':<28}{'':>11}{run_tests():>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""Hot path benchmark suite at realistic universe sizes, against a stored baseline.
+
+Runs offline on synthetic fixtures. Headlines are scored by a tiny stand-in
+for FinBERT unless --finbert is given:
+
+    python benchmarks/bench_suite.py --symbols 25 500 3000
+    python benchmarks/bench_suite.py --save-baseline     # refresh the baseline
+
+The timings are written as JSON to --output and every case is compared with
+--baseline: a case slower than the baseline by more than --tolerance (a
+fraction) is reported as a regression and the exit status is 1.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from logic_modules import finbert_utils, pipeline, portfolio_utils
+from logic_modules.finbert_utils import estimate_sentiment_batch
+from logic_modules.local_data import LocalDataset, LocalREST
+from logic_modules.momentum_trading import execute_momentum_trades
+from logic_modules.price_utils import fetch_historical_prices
+from logic_modules.quote_feed import QuoteBook
+from logic_modules.sentiment_cache import SentimentCache
+from logic_modules.trade_plan import BUY, TradePlan
+from logic_modules.transaction_filter import filter_transactions
+from main import PortfolioTrader
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+NOW = pd.Timestamp("2024-08-01 13:30", tz="UTC")
+WORDS = ["shares", "rose", "fell", "profit", "loss", "market", "report", "today"]
+
+
+def stub_logits(headlines, max_batch_size=finbert_utils.MAX_BATCH_SIZE):
+    """Deterministic logits from the words of each headline, no model load."""
+    import torch
+
+    weights = torch.tensor([[1.0, -1.0, 0.0]]) * torch.tensor(
+        [[len(h.split()) % 3 - 1.0] for h in headlines]
+    )
+    return weights + 0.1
+
+
+def synthetic_dataset(count, bars=200, headlines=3, seed=0):
+    rng = np.random.default_rng(seed)
+    symbols = [f"SYM{i:04d}" for i in range(count)]
+    index = pd.bdate_range(
+        end=NOW.tz_localize(None).normalize() - pd.Timedelta(days=1), periods=bars
+    )
+    closes = 100 * np.exp(np.cumsum(rng.normal(3e-4, 0.02, (bars, count)), 0))
+    frames = {
+        symbol: pd.DataFrame(
+            {
+                "open": closes[:, i],
+                "high": closes[:, i] * 1.01,
+                "low": closes[:, i] * 0.99,
+                "close": closes[:, i],
+                "volume": 1e6,
+            },
+            index=index.tz_localize("UTC"),
+        )
+        for i, symbol in enumerate(symbols)
+    }
+    news = pd.DataFrame(
+        {
+            "symbol": np.repeat(symbols, headlines),
+            "created_at": NOW
+            - pd.to_timedelta(rng.integers(1, 48, count * headlines), "h"),
+            "headline": [
+                " ".join(rng.choice(WORDS, rng.integers(3, 9)))
+                for _ in range(count * headlines)
+            ],
+        }
+    )
+    mids = closes[-1]
+    spreads = rng.uniform(0.0, 0.04, count) * mids
+    quotes = pd.DataFrame(
+        {
+            "symbol": symbols,
+            "timestamp": NOW - pd.Timedelta(minutes=1),
+            "bid_price": mids - spreads / 2,
+            "ask_price": mids + spreads / 2,
+        }
+    )
+    return LocalDataset(frames, news, quotes)
+
+
+def bench_trader(data_dir, symbols):
+    """PortfolioTrader on the offline dataset with an in-memory broker."""
+
+    class BenchTrader(PortfolioTrader):
+        def get_datetime(self, *args, **kwargs):
+            return NOW.to_pydatetime()
+
+        def get_cash(self):
+            return 100000.0
+
+        def get_positions(self):
+            return []
+
+        def get_position(self, symbol):
+            return None
+
+        def get_last_prices(self, symbols, *args, **kwargs):
+            closes = self.dataset.bars
+            return {s: float(closes[s]["close"].iloc[-1]) for s in symbols}
+
+        def create_order(self, symbol, quantity, side, **kwargs):
+            return SimpleNamespace(symbol=symbol, quantity=quantity, side=side)
+
+        def submit_order(self, order):
+            return order
+
+    # No lumibot broker or data source, only what the iteration touches
+    trader = BenchTrader.__new__(BenchTrader)
+    trader.is_backtesting = True
+    trader.logger = logging.getLogger("tradebot")
+    trader.initialize(symbols=symbols, data_dir=data_dir)
+    return trader
+
+
+def cases(dataset, data_dir):
+    symbols = dataset.symbols
+    api = LocalREST(dataset, lambda: NOW)
+    prices = fetch_historical_prices(api, symbols, bars_length=150)
+    news = {
+        symbol: [
+            article.headline
+            for article in api.get_news(symbol, "2024-07-29", "2024-08-01")
+        ]
+        for symbol in symbols
+    }
+    book = QuoteBook(symbols)
+    quotes = dataset.quotes
+    book.update_many(
+        quotes["symbol"],
+        quotes["bid_price"],
+        quotes["ask_price"],
+        np.full(len(quotes), NOW.timestamp()),
+    )
+    trader = bench_trader(data_dir, symbols)
+
+    def sentiment():
+        # A cold headline cache, every headline goes through the model
+        finbert_utils.sentiment_cache = SentimentCache(path=None)
+        estimate_sentiment_batch(news)
+
+    def optimizer():
+        portfolio_utils._moments = portfolio_utils.RollingMoments()
+        portfolio_utils._cache = portfolio_utils.OptimizerCache()
+        portfolio_utils.optimize_portfolio(prices)
+
+    def spread_filter():
+        plan = TradePlan(symbols)
+        plan.assign(slice(None), BUY, "momentum")
+        filter_transactions(None, plan, book.spreads(symbols))
+
+    def iteration():
+        portfolio_utils._moments = portfolio_utils.RollingMoments()
+        portfolio_utils._cache = portfolio_utils.OptimizerCache()
+        finbert_utils.sentiment_cache = SentimentCache(path=None)
+        trader.on_trading_iteration()
+
+    return {
+        "estimate_sentiment": sentiment,
+        "fetch_historical_prices": lambda: fetch_historical_prices(api, symbols, 150),
+        "optimize_portfolio": optimizer,
+        "execute_momentum_trades": lambda: execute_momentum_trades(
+            trader, TradePlan(symbols), prices
+        ),
+        "filter_transactions": spread_filter,
+        "on_trading_iteration": iteration,
+    }
+
+
+def best_of(repeat, function):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def compare(results, baseline, tolerance):
+    """Rows of case, symbols, seconds, baseline seconds and ratio; regressions."""
+    rows, regressions = [], []
+    for case, timings in results.items():
+        for count, seconds in timings.items():
+            before = baseline.get(case, {}).get(count)
+            ratio = seconds / before if before else None
+            rows.append((case, count, seconds, before, ratio))
+            if ratio is not None and ratio > 1 + tolerance:
+                regressions.append((case, count, ratio))
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, nargs="+", default=[25, 500, 3000])
+    parser.add_argument("--cases", nargs="+", help="Only these cases")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--finbert", action="store_true", help="Use the real model")
+    parser.add_argument("--output", default=os.path.join(HERE, "results.json"))
+    parser.add_argument("--baseline", default=os.path.join(HERE, "baseline.json"))
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+    logging.getLogger("tradebot").setLevel(logging.WARNING)
+    pipeline.set_config({"timings_file": None})
+    if not args.finbert:
+        finbert_utils._model_logits = stub_logits
+    # Load torch (and the model with --finbert) before anything is timed
+    estimate_sentiment_batch({"WARMUP": ["shares rose today"]})
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.symbols:
+            dataset = synthetic_dataset(count)
+            data_dir = os.path.join(directory, str(count))
+            dataset.save(data_dir)
+            for case, function in cases(dataset, data_dir).items():
+                if args.cases and case not in args.cases:
+                    continue
+                seconds = best_of(args.repeat, function)
+                results.setdefault(case, {})[str(count)] = seconds
+                print(f"{case:>26}{count:>7}{seconds * 1e3:>12.1f} ms", flush=True)
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "model": "finbert" if args.finbert else "stub",
+        "results": results,
+    }
+    path = args.baseline if args.save_baseline else args.output
+    with open(path, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {path}")
+    if args.save_baseline or not os.path.exists(args.baseline):
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)["results"]
+    rows, regressions = compare(results, baseline, args.tolerance)
+    print(f"\n{'case':>26}{'symbols':>9}{'ms':>10}{'baseline':>10}{'ratio':>8}")
+    for case, count, seconds, before, ratio in rows:
+        before = f"{before * 1e3:.1f}" if before else "-"
+        ratio = f"{ratio:.2f}" if ratio else "-"
+        print(f"{case:>26}{count:>9}{seconds * 1e3:>10.1f}{before:>10}{ratio:>8}")
+    for case, count, ratio in regressions:
+        print(f"REGRESSION {case} at {count} symbols: {ratio:.2f}x the baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,180 @@
 # logger_setup.py
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import time
+from datetime import datetime, timezone
+
+# ``async`` hands records to a background thread that formats and writes them.
+# The file rotates at ``max_bytes`` (0: never) or, when ``rotate_when`` is set
+# ("midnight", "H", ...), on that schedule instead. ``format`` is "text" or
+# "json" (one JSON object per line) for the file, the console stays text.
+config = {
+    "file": os.getenv("LOG_FILE", "tradebot.log"),
+    "async": os.getenv("LOG_ASYNC", "1") != "0",
+    "format": os.getenv("LOG_FORMAT", "text"),
+    "max_bytes": int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+    "backup_count": int(os.getenv("LOG_BACKUP_COUNT", "5")),
+    "rotate_when": os.getenv("LOG_ROTATE_WHEN"),
+}
+
+_listeners = []
+_stats = {"records": 0, "seconds": 0.0}
+
+
+def set_config(new_config):
+    global config
+    config.update(new_config)
+
+
+def log_stats():
+    """Records logged and the seconds the logging threads spent handing them off."""
+    return dict(_stats)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _Timed:
+    # Time spent by the thread that logged, i.e. what logging costs the caller
+    def handle(self, record):
+        started = time.perf_counter()
+        try:
+            return super().handle(record)
+        finally:
+            _stats["records"] += 1
+            _stats["seconds"] += time.perf_counter() - started
+
+
+class _QueueHandler(_Timed, logging.handlers.QueueHandler):
+    """Queues records as they are, message and arguments are only formatted
+    by the listener thread. Arguments should not be mutated after logging.
+
+    A forked child has no listener thread, there records are written on the
+    calling thread instead (see ``_after_fork``)."""
+
+    direct = False
+
+    def prepare(self, record):
+        return record
+
+    def emit(self, record):
+        if not self.direct:
+            return super().emit(record)
+        for handler in self.listener.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+class _SyncHandler(_Timed, logging.Handler):
+    """Writes records to ``handlers`` on the calling thread."""
+
+    def __init__(self, handlers):
+        super().__init__()
+        self.handlers = handlers
+
+    def emit(self, record):
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def close(self):
+        for handler in self.handlers:
+            handler.close()
+        super().close()
+
+
+def _file_handler(path):
+    if config["rotate_when"]:
+        return logging.handlers.TimedRotatingFileHandler(
+            path, when=config["rotate_when"], backupCount=config["backup_count"]
+        )
+    if config["max_bytes"]:
+        return logging.handlers.RotatingFileHandler(
+            path, maxBytes=config["max_bytes"], backupCount=config["backup_count"]
+        )
+    return logging.FileHandler(path)
+
+
+def configure_logger(logger, file=None, console=True):
+    """Attach the console and file handlers of ``config`` to ``logger``."""
+    file = file or config["file"]
+    os.makedirs(os.path.dirname(file) or ".", exist_ok=True)
+
+    # Create a formatter and add it to the handlers
+    formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+    file_handler = _file_handler(file)
+    file_handler.setLevel(logging.INFO)
+    file_handler.setFormatter(
+        JsonFormatter() if config["format"] == "json" else formatter
+    )
+    handlers = [file_handler]
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.INFO)
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+
+    if config["async"]:
+        records = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(
+            records, *handlers, respect_handler_level=True
+        )
+        listener.start()
+        _listeners.append(listener)
+        handler = _QueueHandler(records)
+        handler.listener = listener
+        listener.queue_handler = handler
+        logger.addHandler(handler)
+    else:
+        logger.addHandler(_SyncHandler(handlers))
+    return logger
+
+
+def stop_logging(logger=None):
+    """Write out the queued records and stop the listener threads, only those
+    of ``logger`` when given."""
+    listeners = list(_listeners)
+    if logger is not None:
+        listeners = [
+            h.listener
+            for h in logger.handlers
+            if hasattr(h, "listener") and h.listener in _listeners
+        ]
+    for listener in listeners:
+        _listeners.remove(listener)
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def _after_fork():
+    # Only the forking thread survives a fork, so the listeners of the parent
+    # are gone in the child, e.g. a ProcessPoolExecutor worker. Records queued
+    # there would never be written.
+    for listener in _listeners:
+        listener.queue_handler.direct = True
+    _listeners.clear()
+
+
+atexit.register(stop_logging)
+os.register_at_fork(after_in_child=_after_fork)
 
 
 def setup_logger():
@@ -9,21 +184,6 @@ def setup_logger():
 
     # Check if logger already has handlers (to avoid duplicate logs)
     if not logger.hasHandlers():
-        # Create handlers for both console and file
-        console_handler = logging.StreamHandler()
-        file_handler = logging.FileHandler("tradebot.log")
-
-        # Set level for handlers
-        console_handler.setLevel(logging.INFO)
-        file_handler.setLevel(logging.INFO)
-
-        # Create a formatter and add it to the handlers
-        formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-        console_handler.setFormatter(formatter)
-        file_handler.setFormatter(formatter)
-
-        # Add handlers to the logger
-        logger.addHandler(console_handler)
-        logger.addHandler(file_handler)
+        configure_logger(logger)
 
     return logger
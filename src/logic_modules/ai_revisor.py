@@ -1,60 +1,210 @@
 # ai_revisor.py
+import collections
+import concurrent.futures
+import functools
+import hashlib
 import logging
 import os
+import threading
 
 from dotenv import load_dotenv
 from openai import AzureOpenAI
 
+from logic_modules.trade_plan import ACTIONS, TradePlan
+
 # Load environment variables from .env file
 load_dotenv()
 
 logger = logging.getLogger("tradebot")
 
-# Set up Azure OpenAI client
-client = AzureOpenAI(
-    api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-    api_version="2024-02-01",
-    azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-)
+# ``timeout`` is the latency budget in seconds of one revision, past it the
+# original plan is traded. ``cache_size`` revisions are kept by plan hash.
+config = {"timeout": 5.0, "cache_size": 256, "max_tokens": 150, "temperature": 0.5}
 
 deployment_name = os.getenv("AZURE_DEPLOYMENT_NAME")  # Read deployment name from .env
 
+_client = None
+_executor = None
+_lock = threading.Lock()
+_cache = collections.OrderedDict()
+_stats = {"requests": 0, "cache_hits": 0, "skipped": 0, "timeouts": 0, "errors": 0}
 
-def revise_plan(plan):
-    try:
-        # Convert plan to a string format for the prompt
-        plan_str = "\n".join(
-            [f"{symbol}: {action[0]} {action[1]}" for symbol, action in plan.items()]
+
+def set_config(new_config):
+    global config, _client
+    config.update(new_config)
+    _client = None
+
+
+def get_client():
+    """The Azure OpenAI client, created on first use from the environment."""
+    global _client
+    with _lock:
+        if _client is None:
+            # No retries, they could never fit in the latency budget
+            _client = AzureOpenAI(
+                api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+                api_version="2024-02-01",
+                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+                max_retries=0,
+            )
+        return _client
+
+
+def _worker_pool():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=2, thread_name_prefix="revisor"
+            )
+        return _executor
+
+
+def revisor_stats():
+    """Counters of requests, cache hits, skipped (empty) plans, timeouts and errors."""
+    return dict(_stats, cached=len(_cache))
+
+
+def _plan_lines(plan):
+    lines = []
+    for symbol, entry in sorted(plan.items()):
+        action, quantity = entry if isinstance(entry, tuple) else (entry, None)
+        lines.append(
+            f"{symbol}: {action}" + ("" if quantity is None else f" {quantity}")
         )
+    return lines
+
+
+def plan_key(plan):
+    """Canonical hash of a plan, equal plans hash the same in any order."""
+    text = "\n".join([str(deployment_name)] + _plan_lines(plan))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _parse_plan(text, plan):
+    """The valid ``SYMBOL: action [quantity]`` lines of a reply.
+
+    Only symbols of ``plan``, buy or sell actions and positive integer
+    quantities are kept; anything else (prose, new symbols) is skipped.
+    """
+    revised_plan = {}
+    for line in text.split("\n"):
+        fields = line.replace(":", " ").split()
+        if len(fields) not in (2, 3):
+            if fields:
+                logger.debug("Skipping reply line %r", line)
+            continue
+        symbol, action = fields[0].upper(), fields[1].lower()
+        if symbol not in plan or action not in ACTIONS:
+            logger.warning("Skipping invalid plan line %r", line)
+            continue
+        if len(fields) == 2:
+            revised_plan[symbol] = action
+            continue
+        try:
+            quantity = int(fields[2])
+        except ValueError:
+            quantity = 0
+        if quantity <= 0:
+            logger.warning("Skipping plan line without a valid quantity %r", line)
+            continue
+        revised_plan[symbol] = (action, quantity)
+    return revised_plan
 
-        # Create a prompt for the AI model
-        prompt = f"""
+
+def _request(plan):
+    """One completion call, returns the revision in the type of ``plan``.
+
+    Raises for a reply that does not make a valid plan, so it is never cached.
+    """
+    _stats["requests"] += 1
+    plan_str = "\n".join(_plan_lines(plan))
+
+    # Create a prompt for the AI model
+    prompt = f"""
         You are a trading assistant. Review the following trading plan and suggest any necessary revisions for sanity check:
-        
+
         {plan_str}
-        
+
         Provide your revised plan in the same format.
         """
 
-        # Call the Azure OpenAI API
-        response = client.completions.create(
-            model=deployment_name, prompt=prompt, max_tokens=150, temperature=0.5
-        )
+    response = get_client().completions.create(
+        model=deployment_name,
+        prompt=prompt,
+        max_tokens=config["max_tokens"],
+        temperature=config["temperature"],
+        timeout=config["timeout"],
+    )
+    revised_plan = _parse_plan(response.choices[0].text.strip(), plan)
+    if not revised_plan:
+        raise ValueError("No valid plan lines in the response")
+    return _like(plan, revised_plan)
+
+
+def _remember(key, future):
+    # Also keeps revisions that arrive after the budget ran out, so the next
+    # iteration with the same plan gets them at once
+    if future.cancelled() or future.exception() is not None:
+        return
+    with _lock:
+        # Plain entries, a cached TradePlan could be changed by the pipeline
+        _cache[key] = dict(future.result().items())
+        _cache.move_to_end(key)
+        while len(_cache) > config["cache_size"]:
+            _cache.popitem(last=False)
+
 
-        # Parse the response
-        revised_plan_str = response.choices[0].text.strip()
-        revised_plan = {}
-        for line in revised_plan_str.split("\n"):
-            try:
-                symbol, action, quantity = line.split()
-                revised_plan[symbol] = (action, int(quantity))
-            except ValueError as ve:
-                logger.warning(f"Could not parse line '{line}': {ve}")
-                continue  # Skip malformed lines
-
-        logger.info(f"Revised Plan: {revised_plan}")
+def _like(plan, revised_plan):
+    # Hand the revision back in the type of plan that came in
+    if isinstance(plan, TradePlan):
+        return TradePlan.from_dict(revised_plan, plan.symbols, source="ai")
+    return dict(revised_plan)
+
+
+def revise_plan(plan):
+    """The plan as revised by the model, or ``plan`` itself as the fallback.
+
+    Empty plans are not sent and revisions are memoized by ``plan_key``, so an
+    unchanged plan costs nothing. A call that errors or exceeds
+    ``config["timeout"]`` falls back to the original plan.
+    """
+    if not plan:
+        _stats["skipped"] += 1
+        return plan
+
+    key = plan_key(plan)
+    with _lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+    if cached is not None:
+        try:
+            revised_plan = _like(plan, cached)
+        except ValueError as e:
+            _stats["errors"] += 1
+            logger.error("Cached revision is not a valid plan: %s", e)
+            return plan
+        _stats["cache_hits"] += 1
+        logger.info("Revised Plan (cached): %s", cached)
         return revised_plan
 
+    future = _worker_pool().submit(_request, plan)
+    future.add_done_callback(functools.partial(_remember, key))
+    try:
+        revised_plan = future.result(timeout=config["timeout"])
+    except concurrent.futures.TimeoutError:
+        _stats["timeouts"] += 1
+        logger.warning(
+            "Plan revision exceeded its %.1fs budget, keeping the original plan",
+            config["timeout"],
+        )
+        return plan
     except Exception as e:
+        _stats["errors"] += 1
         logger.error(f"Error revising plan: {e}")
         return plan  # Return the original plan if there's an error
+
+    logger.info("Revised Plan: %s", revised_plan)
+    return revised_plan
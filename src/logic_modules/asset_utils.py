@@ -1,11 +1,15 @@
 import logging
 from datetime import datetime
 
-import torch
 from pandas import Timedelta
 
 from logger_setup import setup_logger
-from logic_modules.finbert_utils import estimate_sentiment
+from logic_modules.finbert_utils import (
+    cache_stats,
+    estimate_sentiment,
+    estimate_sentiment_batch,
+)
+from logic_modules.news_fetcher import fetch_headlines
 
 # Set up the logger
 logger = setup_logger()
@@ -18,10 +22,24 @@ def get_dates(strategy_instance):
     return today.strftime("%Y-%m-%d"), three_days_prior.strftime("%Y-%m-%d")
 
 
-def position_sizing(strategy_instance, symbol, cash_at_risk):
-    """Calculate position size based on cash at risk."""
-    cash = strategy_instance.get_cash()
-    last_price = strategy_instance.get_last_price(symbol)
+def position_sizing(strategy_instance, symbol, cash_at_risk, snapshot=None):
+    """Calculate position size based on cash at risk.
+
+    With a ``BrokerSnapshot`` the cash and price come from it instead of the
+    broker, the broker is only asked for prices the snapshot lacks. Without
+    a price the quantity is 0.
+    """
+    if snapshot is not None:
+        cash = snapshot.cash
+        last_price = snapshot.last_price(symbol)
+        if last_price is None:
+            last_price = strategy_instance.get_last_price(symbol)
+    else:
+        cash = strategy_instance.get_cash()
+        last_price = strategy_instance.get_last_price(symbol)
+    if not last_price:
+        logger.warning("No last price for %s, not sizing a position", symbol)
+        return cash, last_price, 0
     quantity = round(
         (cash * cash_at_risk / len(strategy_instance.symbols)) / last_price, 0
     )
@@ -48,7 +66,7 @@ def get_sentiment(strategy_instance, symbol):
         probability, sentiment = estimate_sentiment(headlines)
 
         # Convert tensor to float
-        if isinstance(probability, torch.Tensor):
+        if hasattr(probability, "item"):
             probability = probability.item()  # Convert tensor to a Python float
 
         logger.info("Good news for %s probability: %f", symbol, probability)
@@ -56,3 +74,33 @@ def get_sentiment(strategy_instance, symbol):
     except Exception as e:
         logger.error("Error fetching news for %s: %s", symbol, e)
         return 0.0, "neutral"
+
+
+def get_news_headlines(strategy_instance, symbols):
+    """Collect the last three days of headlines for every symbol."""
+    today, three_days_prior = get_dates(strategy_instance)
+    return fetch_headlines(strategy_instance.api, symbols, three_days_prior, today)
+
+
+def update_news(strategy_instance, news_window):
+    """Bring a ``NewsWindow`` to the last three days, fetching only new articles."""
+    today, three_days_prior = get_dates(strategy_instance)
+    return news_window.update(strategy_instance.api, three_days_prior, today)
+
+
+def get_sentiments(strategy_instance, symbols):
+    """Estimate sentiment for all symbols with a single batched model run."""
+    news_by_symbol = get_news_headlines(strategy_instance, symbols)
+    try:
+        sentiments = estimate_sentiment_batch(news_by_symbol)
+    except Exception as e:
+        logger.error("Error estimating sentiment: %s", e)
+        return {symbol: (0.0, "neutral") for symbol in symbols}
+
+    for symbol, (probability, sentiment) in sentiments.items():
+        if news_by_symbol[symbol]:
+            logger.info(
+                "Sentiment for %s: %s probability: %f", symbol, sentiment, probability
+            )
+    logger.info("Sentiment cache: %s", cache_stats())
+    return sentiments
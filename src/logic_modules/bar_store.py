@@ -0,0 +1,122 @@
+# bar_store.py
+import logging
+import os
+import threading
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows, no locking across processes
+    fcntl = None
+
+logger = logging.getLogger("tradebot")
+
+DEFAULT_BAR_STORE = os.getenv("BAR_STORE_DIR", os.path.join("cache", "bars"))
+
+# One fixed-size record per bar, timestamps in nanoseconds since the epoch (UTC)
+BAR_DTYPE = np.dtype(
+    [
+        ("timestamp", "<i8"),
+        ("open", "<f8"),
+        ("high", "<f8"),
+        ("low", "<f8"),
+        ("close", "<f8"),
+        ("volume", "<f8"),
+    ]
+)
+
+
+class BarStore:
+    """Append-only bar history on disk, one file per symbol and timeframe.
+
+    Files are flat arrays of ``BAR_DTYPE`` records in timestamp order, so
+    appending new bars is a plain write and reading a window is a slice of a
+    read-only ``np.memmap`` that never copies the data.
+    """
+
+    def __init__(self, root=DEFAULT_BAR_STORE):
+        self.root = root
+        self._maps = {}
+        self._lock = threading.Lock()
+
+    def _path(self, symbol, timeframe):
+        return os.path.join(self.root, str(timeframe), f"{symbol}.bars")
+
+    def bars(self, symbol, timeframe):
+        """All stored bars as a read-only memory map, empty if there are none."""
+        path = self._path(symbol, timeframe)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return np.empty(0, dtype=BAR_DTYPE)
+        with self._lock:
+            cached = self._maps.get(path)
+            if cached is None or cached.nbytes != size:
+                if size == 0:
+                    return np.empty(0, dtype=BAR_DTYPE)
+                cached = np.memmap(path, dtype=BAR_DTYPE, mode="r")
+                self._maps[path] = cached
+            return cached
+
+    def window(self, symbol, timeframe, length):
+        """The latest ``length`` bars, a view into the memory map."""
+        return self.bars(symbol, timeframe)[-length:]
+
+    def last_timestamp(self, symbol, timeframe):
+        bars = self.bars(symbol, timeframe)
+        return int(bars["timestamp"][-1]) if len(bars) else None
+
+    def append(self, symbol, timeframe, records):
+        """Append bars newer than the last stored one, returns how many were added.
+
+        A bar with the same timestamp as the last stored one replaces it: that
+        bar may have been fetched while its period was still open. The last
+        timestamp is read under an exclusive file lock, so processes sharing
+        the store (parallel backtests) never append the same bars twice.
+        """
+        records = np.asarray(records, dtype=BAR_DTYPE)
+        # One record per timestamp in time order, a later version of a bar wins
+        _, latest = np.unique(records["timestamp"][::-1], return_index=True)
+        records = records[len(records) - 1 - latest]
+        path = self._path(symbol, timeframe)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        descriptor = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        with self._lock, os.fdopen(descriptor, "r+b") as file:
+            if fcntl is not None:
+                fcntl.flock(file, fcntl.LOCK_EX)
+            size = file.seek(0, os.SEEK_END)
+            replaced = 0
+            if size >= BAR_DTYPE.itemsize:
+                file.seek(size - BAR_DTYPE.itemsize)
+                last = np.frombuffer(file.read(BAR_DTYPE.itemsize), dtype=BAR_DTYPE)
+                records = records[records["timestamp"] >= last["timestamp"][0]]
+                if len(records) and records["timestamp"][0] == last["timestamp"][0]:
+                    # Overwrite the last stored bar with its latest version
+                    file.seek(size - BAR_DTYPE.itemsize)
+                    replaced = 1
+            if len(records):
+                file.write(records.tobytes())
+        return len(records) - replaced
+
+    def append_frame(self, bars, timeframe):
+        """Append an Alpaca-style bars frame (timestamp index, ``symbol`` column)."""
+        if bars.empty:
+            return 0
+        index = bars.index
+        index = (
+            index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+        )
+        timestamps = index.as_unit("ns").asi8
+        records = np.empty(len(bars), dtype=BAR_DTYPE)
+        records["timestamp"] = timestamps
+        for field in BAR_DTYPE.names[1:]:
+            records[field] = bars[field].to_numpy(dtype=np.float64)
+
+        added = 0
+        symbols = bars["symbol"].to_numpy()
+        order = np.argsort(symbols, kind="stable")
+        boundaries = np.flatnonzero(symbols[order][1:] != symbols[order][:-1]) + 1
+        for rows in np.split(order, boundaries):
+            added += self.append(symbols[rows[0]], timeframe, records[rows])
+        return added
@@ -0,0 +1,43 @@
+# broker_snapshot.py
+import logging
+import time
+
+logger = logging.getLogger("tradebot")
+
+
+class BrokerSnapshot:
+    """Cash, positions and last prices of one iteration, fetched once.
+
+    ``take`` makes three broker calls whatever the number of symbols, sizing
+    and sells then read from the snapshot instead of asking the broker per
+    symbol. Orders submitted during the iteration are not reflected.
+    """
+
+    def __init__(self, cash, positions, prices):
+        self.cash = cash
+        self.positions = positions
+        self.prices = prices
+
+    @classmethod
+    def take(cls, strategy, symbols):
+        started = time.perf_counter()
+        cash = strategy.get_cash()
+        positions = {
+            position.asset.symbol: position.quantity
+            for position in strategy.get_positions()
+        }
+        prices = strategy.get_last_prices(list(symbols)) if symbols else {}
+        logger.info(
+            "Broker snapshot of %d positions and %d prices took %.2fs",
+            len(positions),
+            len(prices),
+            time.perf_counter() - started,
+        )
+        return cls(cash, positions, dict(prices))
+
+    def position(self, symbol):
+        """Quantity held of ``symbol``, 0 if none."""
+        return self.positions.get(symbol, 0)
+
+    def last_price(self, symbol):
+        return self.prices.get(symbol)
@@ -0,0 +1,306 @@
+# fast_backtest.py
+import logging
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from lumibot.tools.indicators import stats_summary
+from lumibot.tools.pandas import day_deduplicate
+
+from logic_modules import momentum_trading, news_fetcher, news_reaction, random_trading
+from logic_modules import transaction_filter
+from logic_modules.finbert_utils import estimate_sentiment_batch
+from logic_modules.quote_feed import spread_matrix
+from logic_modules.trade_plan import BUY, SELL
+
+logger = logging.getLogger("tradebot")
+
+# Fills happen at the "open" (lumibot's daily market orders) or the "close" of
+# the trading day. Slippage moves every fill against us, commission is charged
+# per share plus a rate on the traded notional.
+config = {
+    "initial_cash": 100000.0,
+    "fill_price": "open",
+    "slippage_bps": 0.0,
+    "commission_per_share": 0.0,
+    "commission_rate": 0.0,
+    "news_lookback_days": 3,
+}
+
+TRADE_COLUMNS = [
+    "time",
+    "strategy",
+    "identifier",
+    "symbol",
+    "side",
+    "type",
+    "status",
+    "multiplier",
+    "time_in_force",
+    "asset.strike",
+    "asset.multiplier",
+    "asset.asset_type",
+    "price",
+    "filled_quantity",
+    "trade_cost",
+]
+
+
+def set_config(new_config):
+    global config
+    config.update(new_config)
+
+
+def _bar_matrix(dataset, symbols, column):
+    """Days x symbols matrix of one bar column, days as New York midnights."""
+    frame = pd.DataFrame({s: dataset.bars[s][column] for s in symbols})
+    frame.index = frame.index.tz_convert("America/New_York").normalize()
+    return frame.sort_index()
+
+
+def news_sentiment(dataset, decision_times, symbols, lookback_days=None):
+    """Sentiment probability and label of every decision time x symbol.
+
+    Each cell scores the headlines the strategy's news requests return at
+    that time: the ``news_fetcher.config["limit"]`` newest published from
+    midnight UTC ``lookback_days`` dates back until the decision. All windows
+    go through FinBERT in one batch, so headlines shared by overlapping
+    windows hit the sentiment cache.
+    """
+    lookback_days = lookback_days or config["news_lookback_days"]
+    days = decision_times.normalize().tz_localize(None)
+    starts = (days - pd.Timedelta(days=lookback_days)).tz_localize("UTC")
+    ends = decision_times.tz_convert("UTC")
+
+    news_by_cell = {}
+    for column, symbol in enumerate(symbols):
+        news = dataset.news[dataset.news["symbol"] == symbol]
+        if news.empty:
+            continue
+        published = news["created_at"].to_numpy()
+        headlines = news["headline"].to_numpy()
+        lower = np.searchsorted(published, starts.to_numpy(), side="left")
+        upper = np.searchsorted(published, ends.to_numpy(), side="left")
+        lower = np.maximum(lower, upper - news_fetcher.config["limit"])
+        for row in np.flatnonzero(upper > lower):
+            news_by_cell[row, column] = list(headlines[lower[row] : upper[row]])
+
+    probability = np.zeros((len(decision_times), len(symbols)))
+    labels = np.full(probability.shape, "neutral", dtype=object)
+    if news_by_cell:
+        for (row, column), (p, label) in estimate_sentiment_batch(news_by_cell).items():
+            probability[row, column] = p
+            labels[row, column] = label
+    return probability, labels
+
+
+def news_signals(probability, labels):
+    """``react_to_news`` over whole arrays: BUY, SELL or 0 per cell."""
+    buy = (labels == "positive") & (
+        probability > news_reaction.config["positive_threshold"]
+    )
+    sell = (labels == "negative") & (
+        probability > news_reaction.config["negative_threshold"]
+    )
+    return np.where(buy, BUY, np.where(sell, SELL, 0))
+
+
+def momentum_signals(closes, start, bars_length):
+    """``execute_momentum_trades`` for every day from row ``start`` on.
+
+    The decision on day ``t`` sees the closes of the ``bars_length`` days
+    before it, so a lookback only counts once it fits in that window, exactly
+    as ``momentum_scores`` drops lookbacks longer than the history.
+    """
+    rows = np.arange(start, len(closes))
+    history = np.minimum(rows, bars_length)
+    last = closes[rows - 1]
+    totals = np.zeros((len(rows), closes.shape[1]))
+    counts = np.zeros(totals.shape)
+    for k in momentum_trading.config["lookbacks"]:
+        usable = (k > 0) & (k < history)
+        if not usable.any():
+            continue
+        past = closes[np.maximum(rows - 1 - k, 0)]
+        returns = last / past - 1
+        valid = usable[:, None] & np.isfinite(returns)
+        totals += np.where(valid, returns, 0.0)
+        counts += valid
+    scores = np.divide(
+        totals, counts, out=np.full(totals.shape, np.nan), where=counts > 0
+    )
+    threshold = momentum_trading.config["momentum_threshold"]
+    return np.where(scores > threshold, BUY, np.where(scores < -threshold, SELL, 0))
+
+
+def _fill_prices(prices, sides):
+    slippage = config["slippage_bps"] / 1e4
+    return prices * (1 + slippage * sides)
+
+
+def _commission(quantities, prices):
+    return (
+        quantities * config["commission_per_share"]
+        + quantities * prices * config["commission_rate"]
+    )
+
+
+def run_fast_backtest(
+    dataset,
+    start_date,
+    end_date,
+    symbols=None,
+    cash_at_risk=0.5,
+    bars_length=150,
+    seed=0,
+    spreads=None,
+    sentiment=None,
+    risk_free_rate=0.0,
+    name="PortfolioTrader",
+):
+    """Backtest the plan pipeline of ``PortfolioTrader`` on a ``LocalDataset``.
+
+    News, momentum and spread signals are computed for all days and symbols
+    at once; only cash and positions are carried from day to day. Decisions
+    are taken at the New York open of every bar day from ``start_date`` up to
+    ``end_date`` (exclusive) and sized, filled and recorded the way lumibot
+    does for daily data, without the AI revision.
+
+    ``spreads`` and ``sentiment`` optionally replace the spreads of the
+    dataset's quotes and the FinBERT scores, as days x symbols arrays (``sentiment`` a
+    ``(probability, labels)`` pair). Returns ``results`` (lumibot's summary),
+    ``equity`` (the stats file) and ``trades`` (the trades file).
+    """
+    started = time.perf_counter()
+    # Random trades and position sizing count the whole watchlist, like the
+    # strategy does, even symbols without data
+    watchlist = list(symbols or dataset.symbols)
+    symbols = [s for s in watchlist if s in dataset.bars]
+    opens = _bar_matrix(dataset, symbols, "open")
+    closes = _bar_matrix(dataset, symbols, "close").ffill().to_numpy()
+    days = opens.index
+    marks = opens.ffill().to_numpy()
+    opens = opens.to_numpy()
+
+    start = days.searchsorted(pd.Timestamp(start_date).tz_localize("America/New_York"))
+    stop = days.searchsorted(pd.Timestamp(end_date).tz_localize("America/New_York"))
+    decision_times = (
+        days[start:stop].tz_localize(None) + pd.Timedelta(hours=9, minutes=30)
+    ).tz_localize("America/New_York")
+
+    # Plan precedence of the pipeline: momentum overrides news, then the
+    # spread filter drops what it rejects
+    if sentiment is None:
+        sentiment = news_sentiment(dataset, decision_times, symbols)
+    signals = news_signals(*sentiment)
+    momentum = momentum_signals(closes, start, bars_length)[: stop - start]
+    signals = np.where(momentum != 0, momentum, signals)
+    if spreads is None and len(dataset.quotes):
+        spreads = spread_matrix(dataset.quotes, decision_times, symbols)
+    if spreads is not None:
+        signals[spreads > transaction_filter.config["spread_limit"]] = 0
+
+    fill_prices = opens if config["fill_price"] == "open" else closes
+    random_trading.seed(seed)
+    cash = float(config["initial_cash"])
+    positions = np.zeros(len(symbols))
+    bought = np.zeros(len(symbols), dtype=bool)
+    equity, trades = [], []
+    for row, when in enumerate(decision_times):
+        day = start + row
+        value = cash + np.nansum(marks[day] * positions)
+        equity.append((when, value, cash, positions.copy()))
+
+        sides = signals[row].copy()
+        quantities = np.full(len(symbols), np.nan)
+        held = [s for s, b in zip(symbols, bought) if b]
+        for symbol, action, quantity in random_trading.draw_random_trades(
+            watchlist, held
+        ):
+            if symbol not in symbols:
+                continue
+            column = symbols.index(symbol)
+            sides[column] = BUY if action == "buy" else SELL
+            quantities[column] = quantity if action == "buy" else np.nan
+
+        # position_sizing with the cash before today's fills
+        sized = np.round(cash * cash_at_risk / len(watchlist) / opens[day])
+        quantities = np.where(np.isnan(quantities), sized, quantities)
+        quantities = np.where(sides == BUY, quantities, positions)
+        tradable = (sides != 0) & (quantities > 0) & np.isfinite(fill_prices[day])
+
+        prices = _fill_prices(fill_prices[day], sides)
+        traded = np.flatnonzero(tradable)
+        costs = _commission(quantities[traded], prices[traded])
+        cash -= float((sides[traded] * quantities[traded] * prices[traded]).sum())
+        cash -= float(costs.sum())
+        positions[traded] += sides[traded] * quantities[traded]
+        bought[traded[sides[traded] == BUY]] = True
+        trades.extend(
+            (when, symbols[c], sides[c], prices[c], quantities[c], cost)
+            for c, cost in zip(traded, costs)
+        )
+
+    result = SimpleNamespace(
+        equity=_equity_frame(equity, symbols),
+        trades=_trade_frame(trades, name),
+    )
+    result.results = (
+        stats_summary(day_deduplicate(result.equity), risk_free_rate)
+        if len(result.equity)
+        else {}
+    )
+    logger.info(
+        "Fast backtest of %d days x %d symbols took %.2fs",
+        len(decision_times),
+        len(symbols),
+        time.perf_counter() - started,
+    )
+    return result
+
+
+def _equity_frame(rows, symbols):
+    equity = pd.DataFrame(
+        [
+            {
+                "datetime": when,
+                "portfolio_value": value,
+                "cash": cash,
+                "positions": [
+                    {"asset": s, "quantity": q} for s, q in zip(symbols, positions) if q
+                ],
+            }
+            for when, value, cash, positions in rows
+        ],
+        columns=["datetime", "portfolio_value", "cash", "positions"],
+    ).set_index("datetime")
+    equity["return"] = equity["portfolio_value"].pct_change()
+    return equity
+
+
+def _trade_frame(rows, name):
+    trades = pd.DataFrame(
+        [
+            {
+                "time": when,
+                "strategy": name,
+                "identifier": f"{when:%Y%m%d}-{symbol}",
+                "symbol": symbol,
+                "side": "buy" if side == BUY else "sell",
+                "type": "market",
+                "status": "fill",
+                "multiplier": 1,
+                "time_in_force": "day",
+                "asset.strike": 0.0,
+                "asset.multiplier": 1,
+                "asset.asset_type": "stock",
+                "price": price,
+                "filled_quantity": quantity,
+                "trade_cost": cost,
+            }
+            for when, symbol, side, price, quantity, cost in rows
+        ],
+        columns=TRADE_COLUMNS,
+    )
+    return trades
@@ -0,0 +1,121 @@
+# finbert_backends.py
+import inspect
+import logging
+import os
+import re
+
+logger = logging.getLogger("tradebot")
+
+ONNX_DIR = os.getenv("FINBERT_ONNX_DIR", os.path.join("cache", "onnx"))
+
+
+class TorchBackend:
+    """The fp32 PyTorch model, run without autograd."""
+
+    name = "torch"
+
+    def __init__(self, model_name, device):
+        import torch
+        from transformers import AutoModelForSequenceClassification
+
+        self.device = device
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        self.model = self.model.to(device).eval()
+        self._torch = torch
+
+    def logits(self, tokens):
+        with self._torch.inference_mode():
+            return self.model(
+                tokens["input_ids"].to(self.device),
+                attention_mask=tokens["attention_mask"].to(self.device),
+            )["logits"]
+
+
+class QuantizedTorchBackend(TorchBackend):
+    """Dynamic int8 quantization of the Linear layers, CPU only."""
+
+    name = "int8"
+
+    def __init__(self, model_name, device):
+        super().__init__(model_name, "cpu")
+        self.model = self._torch.ao.quantization.quantize_dynamic(
+            self.model, {self._torch.nn.Linear}, dtype=self._torch.qint8
+        )
+
+
+class OnnxBackend:
+    """ONNX Runtime session over a model exported once to ``ONNX_DIR``."""
+
+    name = "onnx"
+
+    def __init__(self, model_name, device):
+        try:
+            import onnxruntime
+        except ImportError as e:
+            raise ImportError(
+                "The onnx FinBERT backend needs onnxruntime: pip install onnxruntime onnx"
+            ) from e
+        import torch
+
+        self._torch = torch
+        path = os.path.join(ONNX_DIR, re.sub(r"[^\w.-]", "_", model_name), "model.onnx")
+        if not os.path.exists(path):
+            self._export(model_name, path)
+        self.session = onnxruntime.InferenceSession(
+            path, providers=["CPUExecutionProvider"]
+        )
+
+    def _export(self, model_name, path):
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        logger.info("Exporting %s to %s", model_name, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+        sample = AutoTokenizer.from_pretrained(model_name)(
+            ["markets rallied", "shares fell after the report"],
+            return_tensors="pt",
+            padding=True,
+        )
+        # Newer torch defaults to the dynamo exporter, keep the TorchScript one
+        options = {}
+        if "dynamo" in inspect.signature(self._torch.onnx.export).parameters:
+            options["dynamo"] = False
+        self._torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch"},
+            },
+            opset_version=17,
+            **options,
+        )
+
+    def logits(self, tokens):
+        (logits,) = self.session.run(
+            ["logits"],
+            {
+                "input_ids": tokens["input_ids"].cpu().numpy(),
+                "attention_mask": tokens["attention_mask"].cpu().numpy(),
+            },
+        )
+        return self._torch.from_numpy(logits)
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (TorchBackend, QuantizedTorchBackend, OnnxBackend)
+}
+
+
+def create_backend(name, model_name, device):
+    """Build the inference backend registered under ``name``."""
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown FinBERT backend {name!r}, expected one of {sorted(BACKENDS)}"
+        )
+    return BACKENDS[name](model_name, device)
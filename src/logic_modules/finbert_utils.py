@@ -1,27 +1,243 @@
-from typing import Tuple
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Tuple
 
-import torch
-from transformers import AutoModelForSequenceClassification, AutoTokenizer
+import numpy as np
 
-# Set device for model
-DEVICE = "cuda:0" if torch.cuda.is_available() else "cpu"
+from logic_modules.sentiment_cache import SentimentCache
+
+logger = logging.getLogger("tradebot")
+
+MODEL_NAME = os.getenv("FINBERT_MODEL", "ProsusAI/finbert")
 
-# Load tokenizer and model
-tokenizer = AutoTokenizer.from_pretrained("ProsusAI/finbert")
-model = AutoModelForSequenceClassification.from_pretrained("ProsusAI/finbert").to(
-    DEVICE
-)
 labels = ["positive", "negative", "neutral"]
 
+# Upper bound on headlines per forward pass, keeps padding and peak memory in check
+MAX_BATCH_SIZE = 64
+
+# Inference backend, one of finbert_backends.BACKENDS: "torch", "int8" or "onnx".
+# With ``server`` (a socket path or host:port of sentiment_server) headlines
+# are scored by that process, and in-process only when it can't be reached.
+config = {
+    "backend": os.getenv("FINBERT_BACKEND", "torch"),
+    "server": os.getenv("FINBERT_SERVER") or None,
+}
+
+
+class ModelHandle:
+    """Tokenizer and inference backend that are only loaded when first needed.
+
+    torch and transformers are imported on the first ``load()``, so importing
+    this module stays cheap for code paths that never score a headline.
+    ``warmup()`` does the same load on a background thread.
+    """
+
+    def __init__(self, name=MODEL_NAME, backend=None):
+        self.name = name
+        self.backend_name = backend or config["backend"]
+        self.device = None
+        self.tokenizer = None
+        self.backend = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def loaded(self):
+        return self.backend is not None
+
+    @property
+    def model(self):
+        return getattr(self.backend, "model", self.backend)
+
+    def load(self):
+        """Load the tokenizer and backend once and return them."""
+        if self.backend is None:
+            with self._lock:
+                if self.backend is None:
+                    started = time.perf_counter()
+                    import torch
+                    from transformers import AutoTokenizer
+
+                    from logic_modules.finbert_backends import create_backend
+
+                    self.device = "cuda:0" if torch.cuda.is_available() else "cpu"
+                    self.tokenizer = AutoTokenizer.from_pretrained(self.name)
+                    self.backend = create_backend(
+                        self.backend_name, self.name, self.device
+                    )
+                    logger.info(
+                        "Loaded %s with the %s backend in %.1fs",
+                        self.name,
+                        self.backend_name,
+                        time.perf_counter() - started,
+                    )
+        return self.tokenizer, self.backend
+
+    def warmup(self):
+        """Start loading in a background thread, returns the thread."""
+        with self._lock:
+            if self._thread is None and self.backend is None:
+                self._thread = threading.Thread(
+                    target=self._warmup, name="finbert-warmup", daemon=True
+                )
+                self._thread.start()
+        return self._thread
+
+    def _warmup(self):
+        try:
+            self.load()
+        except Exception as e:
+            logger.error("Error loading %s: %s", self.name, e)
+
+
+model_handle = ModelHandle()
+
+# Per-headline logits, so overlapping news windows are only scored once. Each
+# backend gets its own namespace since int8 and ONNX logits differ slightly.
+sentiment_cache = SentimentCache(namespace=f"{MODEL_NAME}:{config['backend']}")
+
+
+def set_config(new_config):
+    global model_handle
+    config.update(new_config)
+    if config["backend"] != model_handle.backend_name:
+        model_handle = ModelHandle(model_handle.name, config["backend"])
+        sentiment_cache.namespace = f"{model_handle.name}:{config['backend']}"
+
+
+def warmup():
+    """Load FinBERT in the background so the first iteration does not pay for it."""
+    if config["server"]:
+        # The server holds the model, it is only loaded here as a fallback
+        return None
+    return model_handle.warmup()
+
+
+def __getattr__(name):
+    # Keep the old module attributes working without loading at import time
+    if name == "tokenizer":
+        return model_handle.load()[0]
+    if name == "model":
+        model_handle.load()
+        return model_handle.model
+    if name == "DEVICE":
+        model_handle.load()
+        return model_handle.device
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def cache_stats():
+    """Hit and miss counters of the headline cache."""
+    return sentiment_cache.stats()
+
+
+def _model_logits(headlines, max_batch_size=MAX_BATCH_SIZE):
+    """Run headlines through the model in size-capped chunks, one logits row each."""
+    import torch
+
+    tokenizer, backend = model_handle.load()
+    # Group headlines of similar length so each chunk pads as little as possible
+    order = sorted(range(len(headlines)), key=lambda i: len(headlines[i]))
+    chunks = []
+    for start in range(0, len(order), max_batch_size):
+        batch = [headlines[i] for i in order[start : start + max_batch_size]]
+        tokens = tokenizer(batch, return_tensors="pt", padding=True)
+        chunks.append(backend.logits(tokens).float().cpu())
+    stacked = torch.cat(chunks)
+    logits = torch.empty_like(stacked)
+    logits[torch.tensor(order)] = stacked
+    return logits
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _server_client():
+    """The shared client of the configured server, created on first use."""
+    global _client
+    from logic_modules.sentiment_server import SentimentClient
+
+    with _client_lock:
+        if _client is not None and _client.address != config["server"]:
+            _client.close()
+            _client = None
+        if _client is None:
+            _client = SentimentClient(config["server"])
+        return _client
+
+
+def _server_logits(headlines):
+    """Logits from the sentiment server, None when it can't be reached."""
+    global _client
+    import torch
+
+    client = None
+    try:
+        client = _server_client()
+        return torch.from_numpy(client.logits(headlines))
+    except Exception as e:
+        logger.warning(
+            "Sentiment server %s unavailable (%s), scoring in-process",
+            config["server"],
+            e,
+        )
+        with _client_lock:
+            # Another thread may already have replaced it
+            if client is not None and _client is client:
+                client.close()
+                _client = None
+        return None
+
+
+def _cached_logits(headlines, compute):
+    """Per-headline logits, ``compute`` only gets the headlines not in the
+    cache. None if ``compute`` returns None."""
+    import torch
+
+    cached = sentiment_cache.get_many(headlines)
+    missing = [i for i, row in enumerate(cached) if row is None]
+
+    logits = torch.empty(len(headlines), len(labels))
+    if missing:
+        computed = compute([headlines[i] for i in missing])
+        if computed is None:
+            return None
+        logits[torch.tensor(missing)] = computed
+        sentiment_cache.put_many([headlines[i] for i in missing], computed.numpy())
+    hits = [i for i, row in enumerate(cached) if row is not None]
+    if hits:
+        logits[torch.tensor(hits)] = torch.from_numpy(
+            np.stack([cached[i] for i in hits])
+        )
+    return logits
+
+
+def headline_logits(headlines, max_batch_size=MAX_BATCH_SIZE):
+    """Per-headline logits from the cache, then the sentiment server if there
+    is one, else the local model."""
+    if config["server"]:
+        logits = _cached_logits(headlines, _server_logits)
+        if logits is not None:
+            return logits
+    return local_logits(headlines, max_batch_size)
+
+
+def local_logits(headlines, max_batch_size=MAX_BATCH_SIZE):
+    """Per-headline logits, running the model only for headlines not in the cache."""
+    return _cached_logits(
+        headlines, lambda missing: _model_logits(missing, max_batch_size)
+    )
+
 
 def estimate_sentiment(news):
     """Estimate sentiment from news headlines."""
     if news:
-        tokens = tokenizer(news, return_tensors="pt", padding=True).to(DEVICE)
+        import torch
 
-        result = model(tokens["input_ids"], attention_mask=tokens["attention_mask"])[
-            "logits"
-        ]
+        result = headline_logits(list(news))
         result = torch.nn.functional.softmax(torch.sum(result, 0), dim=-1)
         probability = result[torch.argmax(result)]
         sentiment = labels[torch.argmax(result)]
@@ -29,7 +245,42 @@ def estimate_sentiment(news):
     return 0, labels[-1]
 
 
+def estimate_sentiment_batch(
+    news_by_symbol: Dict[str, List[str]], max_batch_size: int = MAX_BATCH_SIZE
+) -> Dict[str, Tuple[float, str]]:
+    """Estimate sentiment for many symbols at once.
+
+    All headlines of the universe go through the model together, in as few
+    forward passes as ``max_batch_size`` allows, and the logits are then summed
+    back per symbol before the softmax, exactly as ``estimate_sentiment`` does
+    for a single symbol. Symbols without headlines come back as neutral.
+    """
+    results = {symbol: (0.0, labels[-1]) for symbol in news_by_symbol}
+    symbols = [symbol for symbol, news in news_by_symbol.items() if news]
+    if not symbols:
+        return results
+
+    import torch
+
+    headlines, owners = [], []
+    for position, symbol in enumerate(symbols):
+        headlines.extend(news_by_symbol[symbol])
+        owners.extend([position] * len(news_by_symbol[symbol]))
+
+    logits = headline_logits(headlines, max_batch_size)
+    summed = torch.zeros(len(symbols), logits.shape[-1]).index_add_(
+        0, torch.tensor(owners), logits
+    )
+    probability, best = torch.nn.functional.softmax(summed, dim=-1).max(dim=-1)
+
+    for symbol, p, index in zip(symbols, probability.tolist(), best.tolist()):
+        results[symbol] = (p, labels[index])
+    return results
+
+
 if __name__ == "__main__":
+    import torch
+
     tensor, sentiment = estimate_sentiment(
         ["markets responded negatively to the news!", "traders were displeased!"]
     )
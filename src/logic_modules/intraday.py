@@ -0,0 +1,276 @@
+# intraday.py
+import collections
+import logging
+import queue
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from alpaca_trade_api import TimeFrame, TimeFrameUnit
+
+from logic_modules.price_utils import fill_gaps
+
+logger = logging.getLogger("tradebot")
+
+# Bar minutes of the intraday ``timeframe`` values of the strategy
+TIMEFRAMES = {"minute": 1, "5minute": 5}
+
+
+def _utc(timestamp):
+    timestamp = pd.Timestamp(timestamp)
+    if timestamp.tzinfo is None:
+        return timestamp.tz_localize("UTC")
+    return timestamp.tz_convert("UTC")
+
+
+def bar_timeframe(timeframe):
+    """Alpaca ``TimeFrame`` of a strategy ``timeframe``, daily unless intraday."""
+    if timeframe in TIMEFRAMES:
+        return TimeFrame(TIMEFRAMES[timeframe], TimeFrameUnit.Minute)
+    return TimeFrame.Day
+
+
+class BarAggregator:
+    """Turns the per-symbol minute bars of a stream into watchlist bars.
+
+    Minute bars are combined into ``minutes`` bars. A bar is complete when
+    every symbol sent its last minute, or as soon as a minute of a later bar
+    arrives (symbols that did not trade keep NaN). Minutes of a bar that was
+    already completed are dropped. Completed bars are put on ``events`` as
+    namespaces of ``timestamp`` (bar start), ``end`` (bar start plus the
+    period), ``received`` (wall time it completed) and
+    ``open``/``high``/``low``/``close``/``volume`` arrays over ``symbols``.
+    """
+
+    def __init__(self, symbols, minutes=1, events=None):
+        self.symbols = list(symbols)
+        self.symbol_index = {s: i for i, s in enumerate(self.symbols)}
+        self.period = pd.Timedelta(minutes=minutes)
+        self.events = queue.Queue() if events is None else events
+        self.bucket = None
+        self.completed = None  # start of the last completed bar
+        self._lock = threading.Lock()
+
+    def _start(self, bucket):
+        self.bucket = bucket
+        count = len(self.symbols)
+        self._bar = {
+            name: np.full(count, np.nan) for name in ("open", "high", "low", "close")
+        }
+        self._bar["volume"] = np.zeros(count)
+        self._done = np.zeros(count, dtype=bool)
+
+    def _emit(self):
+        self.events.put(
+            SimpleNamespace(
+                timestamp=self.bucket,
+                end=self.bucket + self.period,
+                received=time.time(),
+                **self._bar,
+            )
+        )
+        self.completed, self.bucket = self.bucket, None
+
+    def add(self, symbol, timestamp, open, high, low, close, volume):
+        i = self.symbol_index.get(symbol)
+        if i is None:
+            return
+        timestamp = _utc(timestamp)
+        bucket = timestamp.floor(self.period)
+        with self._lock:
+            if self.bucket is not None and bucket > self.bucket:
+                self._emit()
+            if (self.bucket is not None and bucket < self.bucket) or (
+                self.completed is not None and bucket <= self.completed
+            ):
+                logger.debug("Dropping late %s bar of %s", symbol, timestamp)
+                return
+            if self.bucket is None:
+                self._start(bucket)
+
+            bar = self._bar
+            if np.isnan(bar["open"][i]):
+                bar["open"][i], bar["high"][i], bar["low"][i] = open, high, low
+            else:
+                bar["high"][i] = max(bar["high"][i], high)
+                bar["low"][i] = min(bar["low"][i], low)
+            bar["close"][i] = close
+            bar["volume"][i] += volume
+            if timestamp + pd.Timedelta(minutes=1) >= bucket + self.period:
+                self._done[i] = True
+                if self._done.all():
+                    self._emit()
+
+    def flush(self):
+        """Complete the current bar with whatever arrived."""
+        with self._lock:
+            if self.bucket is not None:
+                self._emit()
+
+
+def next_bars(events, timeout=None):
+    """Every completed bar on ``events``, waiting up to ``timeout`` seconds for
+    the first one (None: don't wait)."""
+    bars = []
+    try:
+        if timeout:
+            bars.append(events.get(timeout=timeout))
+        while True:
+            bars.append(events.get_nowait())
+    except queue.Empty:
+        return bars
+
+
+class BarWindow:
+    """The last ``length`` closes of the watchlist, updated a bar at a time.
+
+    A symbol without a bar keeps its previous close, so nothing is refetched
+    between bars. ``prices`` gives the same matrix as ``fetch_historical_prices``.
+    """
+
+    def __init__(self, symbols, length):
+        self.symbols = list(symbols)
+        self.length = length
+        self.closes = np.full((length, len(self.symbols)), np.nan)
+        self.times = np.full(length, np.datetime64("NaT"), dtype="datetime64[ns]")
+        self.head = 0
+        self.count = 0
+
+    @classmethod
+    def from_prices(cls, price_df, symbols, length):
+        """Window seeded with a price matrix (timestamps x symbols)."""
+        window = cls(symbols, length)
+        price_df = price_df.reindex(columns=window.symbols).iloc[-length:]
+        for timestamp, closes in zip(price_df.index, price_df.to_numpy(dtype=float)):
+            window.append(timestamp, closes)
+        return window
+
+    @property
+    def last_time(self):
+        if not self.count:
+            return None
+        return pd.Timestamp(self.times[(self.head - 1) % self.length], tz="UTC")
+
+    def append(self, timestamp, closes):
+        timestamp = _utc(timestamp)
+        last = self.last_time
+        if last is not None and timestamp <= last:
+            return False
+        closes = np.asarray(closes, dtype=float)
+        if self.count:
+            previous = self.closes[(self.head - 1) % self.length]
+            closes = np.where(np.isnan(closes), previous, closes)
+        self.closes[self.head] = closes
+        self.times[self.head] = timestamp.tz_localize(None).to_datetime64()
+        self.head = (self.head + 1) % self.length
+        self.count = min(self.count + 1, self.length)
+        return True
+
+    def update(self, bar):
+        """Add a completed bar from a ``BarAggregator``, older bars are ignored."""
+        return self.append(bar.timestamp, bar.close)
+
+    def prices(self, gap_policy=None):
+        rows = (np.arange(self.count) + self.head - self.count) % self.length
+        price_df = pd.DataFrame(
+            self.closes[rows],
+            index=pd.DatetimeIndex(self.times[rows], name="timestamp").tz_localize(
+                "UTC"
+            ),
+            columns=self.symbols,
+        )
+        return fill_gaps(price_df, gap_policy)
+
+
+class ReplayBarStream:
+    """Local stand-in for the live bar stream, replaying minute bars.
+
+    ``bars`` maps symbols to frames indexed by bar start like
+    ``LocalDataset.bars``. ``advance(until)`` sends the aggregator every bar
+    that closed by ``until``, so backtests and tests control the clock.
+    """
+
+    def __init__(self, aggregator, bars):
+        self.aggregator = aggregator
+        frames = [
+            frame.assign(symbol=symbol)
+            for symbol, frame in bars.items()
+            if symbol in aggregator.symbol_index
+        ]
+        rows = pd.concat(frames).sort_index(kind="stable") if frames else None
+        self._rows = [] if rows is None else list(rows.itertuples())
+        index = (
+            pd.DatetimeIndex([], tz="UTC")
+            if rows is None
+            else rows.index.tz_convert("UTC")
+        )
+        self._closes = index + pd.Timedelta(minutes=1)
+        self.position = 0
+
+    def _stop(self, until):
+        return int(self._closes.searchsorted(_utc(until), side="right"))
+
+    def seek(self, until):
+        """Skip the bars up to ``until`` without sending them."""
+        self.position = max(self.position, self._stop(until))
+
+    def advance(self, until):
+        """Send the bars that closed by ``until``, returns how many."""
+        stop = self._stop(until)
+        for row in self._rows[self.position : stop]:
+            self.aggregator.add(
+                row.symbol,
+                row.Index,
+                row.open,
+                row.high,
+                row.low,
+                row.close,
+                row.volume,
+            )
+        sent, self.position = max(0, stop - self.position), max(self.position, stop)
+        return sent
+
+
+class AlpacaBarStream:
+    """Live minute bars of the aggregator's symbols from an ``AlpacaDataStream``."""
+
+    def __init__(self, aggregator, stream):
+        self.aggregator = aggregator
+        stream.subscribe_bars(self._on_bar, *aggregator.symbols)
+
+    async def _on_bar(self, bar):
+        timestamp = bar.timestamp
+        if hasattr(timestamp, "to_datetime"):  # msgpack timestamps
+            timestamp = timestamp.to_datetime()
+        self.aggregator.add(
+            bar.symbol, timestamp, bar.open, bar.high, bar.low, bar.close, bar.volume
+        )
+
+
+class LatencyTracker:
+    """Seconds from a bar's period ending to its orders being submitted, so
+    the delay of the stream and of the aggregation counts too."""
+
+    def __init__(self, size=1000):
+        self.samples = collections.deque(maxlen=size)
+
+    def observe(self, end, submitted=None):
+        """``end`` and ``submitted`` in epoch seconds, ``submitted`` defaults to now."""
+        latency = (time.time() if submitted is None else submitted) - end
+        self.samples.append(latency)
+        return latency
+
+    def summary(self):
+        """Count, mean, median, 95th percentile and max of the recent latencies."""
+        if not self.samples:
+            return {"count": 0}
+        samples = np.array(self.samples)
+        return {
+            "count": len(samples),
+            "mean": float(samples.mean()),
+            "p50": float(np.percentile(samples, 50)),
+            "p95": float(np.percentile(samples, 95)),
+            "max": float(samples.max()),
+        }
@@ -0,0 +1,276 @@
+# local_data.py
+import functools
+import glob
+import logging
+import os
+import re
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from lumibot.backtesting import YahooDataBacktesting
+from lumibot.entities import Asset
+
+logger = logging.getLogger("tradebot")
+
+BAR_COLUMNS = ["open", "high", "low", "close", "volume"]
+_BAR_UNITS = {"Min": "min", "Hour": "h", "Day": "D", "Week": "W"}
+
+
+def _read_table(path):
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def _find_table(root, name):
+    for extension in (".parquet", ".csv"):
+        path = os.path.join(root, name + extension)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _utc_index(values):
+    index = pd.DatetimeIndex(pd.to_datetime(values, utc=True), name="timestamp")
+    return index.as_unit("ns")
+
+
+def _utc(value):
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        return timestamp.tz_localize("UTC")
+    return timestamp.tz_convert("UTC")
+
+
+def bar_duration(timeframe):
+    """Length of one bar for an Alpaca ``TimeFrame`` or a string like "5Min"."""
+    match = re.fullmatch(r"(\d+)(Min|Hour|Day|Week)", str(timeframe))
+    if not match:
+        raise ValueError(f"Unsupported timeframe {timeframe!r}")
+    return pd.Timedelta(int(match[1]), _BAR_UNITS[match[2]])
+
+
+class LocalDataset:
+    """Bars, news and quotes for a backtest, held in memory.
+
+    ``bars`` maps symbols to frames with a UTC timestamp index and the
+    ``BAR_COLUMNS``. ``news`` has ``symbol``, ``created_at`` and ``headline``
+    columns, ``quotes`` has ``symbol``, ``timestamp``, ``bid_price`` and
+    ``ask_price``; both are optional.
+    """
+
+    def __init__(self, bars, news=None, quotes=None):
+        self.bars = {
+            symbol: frame.sort_index()[BAR_COLUMNS].rename_axis("timestamp")
+            for symbol, frame in bars.items()
+        }
+        if news is None:
+            news = pd.DataFrame(columns=["symbol", "created_at", "headline"])
+        if quotes is None:
+            quotes = pd.DataFrame(
+                columns=["symbol", "timestamp", "bid_price", "ask_price"]
+            )
+        self.news = news.assign(created_at=_utc_index(news["created_at"]))
+        self.news = self.news.sort_values(["symbol", "created_at"], kind="stable")
+        self.quotes = quotes.assign(timestamp=_utc_index(quotes["timestamp"]))
+        self.quotes = self.quotes.sort_values(["symbol", "timestamp"], kind="stable")
+
+    @property
+    def symbols(self):
+        return sorted(self.bars)
+
+    @classmethod
+    def from_directory(cls, root):
+        """Load ``bars/<SYMBOL>.csv``, ``news.csv`` and ``quotes.csv`` from ``root``.
+
+        Every table can be a ``.parquet`` file instead.
+        """
+        bars = {}
+        for path in sorted(glob.glob(os.path.join(root, "bars", "*"))):
+            symbol, extension = os.path.splitext(os.path.basename(path))
+            if extension not in (".csv", ".parquet"):
+                continue
+            frame = _read_table(path)
+            bars[symbol] = frame.set_index(_utc_index(frame.pop("timestamp")))
+        if not bars:
+            raise FileNotFoundError(
+                f"No bar files found in {os.path.join(root, 'bars')}"
+            )
+
+        tables = {}
+        for name in ("news", "quotes"):
+            path = _find_table(root, name)
+            tables[name] = _read_table(path) if path else None
+        logger.info(f"Loaded local data for {len(bars)} symbols from {root}")
+        return cls(bars, **tables)
+
+    @classmethod
+    def from_bar_store(cls, store, symbols, timeframe, news=None, quotes=None):
+        """Snapshot of everything a ``BarStore`` holds for ``symbols``."""
+        bars = {}
+        for symbol in symbols:
+            records = store.bars(symbol, timeframe)
+            if len(records):
+                frame = pd.DataFrame(
+                    {column: np.array(records[column]) for column in BAR_COLUMNS},
+                    index=_utc_index(np.array(records["timestamp"])),
+                )
+                bars[symbol] = frame
+        return cls(bars, news, quotes)
+
+    def save(self, root, file_format="csv"):
+        """Write the dataset in the layout ``from_directory`` reads."""
+        write = {
+            "csv": lambda frame, path: frame.to_csv(path, index=False),
+            "parquet": lambda frame, path: frame.to_parquet(path, index=False),
+        }[file_format]
+        os.makedirs(os.path.join(root, "bars"), exist_ok=True)
+        for symbol, frame in self.bars.items():
+            path = os.path.join(root, "bars", f"{symbol}.{file_format}")
+            write(frame.reset_index(), path)
+        write(self.news, os.path.join(root, f"news.{file_format}"))
+        write(self.quotes, os.path.join(root, f"quotes.{file_format}"))
+
+    def benchmark_returns(self, symbol, start, end):
+        """Daily returns of ``symbol`` in the shape lumibot expects, None if absent."""
+        if symbol not in self.bars:
+            return None
+        frame = self.bars[symbol]
+        frame = frame[(frame.index >= _utc(start)) & (frame.index <= _utc(end))].copy()
+        frame["return"] = frame["close"].pct_change()
+        frame["symbol_cumprod"] = (1 + frame["return"]).cumprod()
+        return frame
+
+
+@functools.lru_cache(maxsize=4)
+def load_dataset(root):
+    """Dataset of a directory, read once per process."""
+    return LocalDataset.from_directory(root)
+
+
+class LocalREST:
+    """The part of ``alpaca_trade_api.REST`` the strategy uses, served offline.
+
+    ``clock`` returns the current (backtest) time. Only bars that closed and
+    news published by then are returned, so a backtest never sees the future.
+    """
+
+    # Local reads need no client-side rate limiting
+    offline = True
+
+    def __init__(self, dataset, clock):
+        self.dataset = dataset
+        self.clock = clock
+
+    def _now(self):
+        return _utc(self.clock())
+
+    def get_bars(self, symbols, timeframe, start=None, end=None, limit=None):
+        """Alpaca-style bars frame, ``limit`` applies per symbol."""
+        if isinstance(symbols, str):
+            symbols = [symbols]
+        closed_before = self._now() - bar_duration(timeframe)
+        frames = []
+        for symbol in symbols:
+            frame = self.dataset.bars.get(symbol)
+            if frame is None:
+                continue
+            upper = closed_before
+            if end is not None:
+                upper = min(upper, _utc(end))
+            frame = frame[frame.index <= upper]
+            if start is not None:
+                frame = frame[frame.index >= _utc(start)]
+            if limit is not None:
+                frame = frame.iloc[-limit:]
+            frames.append(frame.assign(symbol=symbol))
+
+        if frames:
+            df = pd.concat(frames)
+        else:
+            df = pd.DataFrame(columns=BAR_COLUMNS + ["symbol"], index=_utc_index([]))
+        return SimpleNamespace(df=df)
+
+    def get_news(self, symbol, start, end, limit=None):
+        """Articles for ``symbol`` published between the ``start`` and ``end`` dates."""
+        news = self.dataset.news
+        upper = min(self._now(), _utc(end) + pd.Timedelta(days=1))
+        rows = news[
+            (news["symbol"] == symbol)
+            & (news["created_at"] >= _utc(start))
+            & (news["created_at"] < upper)
+        ]
+        if limit is not None:
+            rows = rows.iloc[-limit:]
+        return [
+            SimpleNamespace(symbol=symbol, headline=headline, created_at=created_at)
+            for headline, created_at in zip(rows["headline"], rows["created_at"])
+        ]
+
+    def get_latest_quotes(self, symbols):
+        """The last quote of every symbol at the current time, missing ones left out."""
+        quotes = self.dataset.quotes
+        quotes = quotes[
+            quotes["symbol"].isin(symbols) & (quotes["timestamp"] <= self._now())
+        ]
+        latest = quotes.groupby("symbol", sort=False).tail(1)
+        return {
+            row.symbol: SimpleNamespace(
+                bid_price=row.bid_price,
+                ask_price=row.ask_price,
+                timestamp=row.timestamp,
+            )
+            for row in latest.itertuples(index=False)
+        }
+
+    def get_latest_quote(self, symbol):
+        quote = self.get_latest_quotes([symbol]).get(symbol)
+        if quote is None:
+            raise KeyError(f"No quote for {symbol}")
+        return quote
+
+
+class LocalDataBacktesting(YahooDataBacktesting):
+    """lumibot data source serving the dataset in ``data_dir`` instead of Yahoo.
+
+    The bars go through YahooData's own store, so fills, last prices and
+    lookback windows behave exactly as in a Yahoo backtest. Use
+    ``local_data_backtesting`` to get a subclass bound to a directory, since
+    lumibot builds the data source itself.
+    """
+
+    data_dir = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for symbol, frame in load_dataset(self.data_dir).bars.items():
+            # YahooData keeps daily bars at midnight New York time with its
+            # own column names. Intraday bars keep their times.
+            frame = frame.rename(columns=str.capitalize)
+            index = frame.index.tz_convert("America/New_York")
+            midnight = index.normalize()
+            frame.index = index if midnight.has_duplicates else midnight
+            frame = frame.assign(Dividends=0.0, **{"Stock Splits": 0.0})
+            self._append_data(Asset(symbol), frame)
+
+    def _pull_source_symbol_bars(self, asset, length, *args, **kwargs):
+        if asset not in self._data_store:
+            logger.error(f"No local data for {asset} in {self.data_dir}")
+            return None
+        return super()._pull_source_symbol_bars(asset, length, *args, **kwargs)
+
+    def _pull_source_bars(
+        self, assets, length, timestep="day", timeshift=None, **kwargs
+    ):
+        return {
+            asset: self._pull_source_symbol_bars(
+                asset, length, timestep=timestep, timeshift=timeshift
+            )
+            for asset in assets
+        }
+
+
+def local_data_backtesting(data_dir):
+    """The ``LocalDataBacktesting`` data source class for ``data_dir``."""
+    return type("LocalDataBacktesting", (LocalDataBacktesting,), {"data_dir": data_dir})
@@ -0,0 +1,72 @@
+# log_tail.py
+import collections
+import logging
+import os
+
+logger = logging.getLogger("tradebot")
+
+# ``max_lines`` recent lines are kept, a file seen for the first time is read
+# from at most ``initial_bytes`` before its end. ``interval`` is the seconds
+# between updates of a streaming log view.
+config = {"max_lines": 2000, "initial_bytes": 1024 * 1024, "interval": 1.0}
+
+
+def set_config(new_config):
+    global config
+    config.update(new_config)
+
+
+class LogTail:
+    """Follows a growing log file, reading only what was appended since the
+    last ``read``.
+
+    The last ``max_lines`` lines are kept in ``lines``. A file that shrinks or
+    is replaced (rotated) is followed from its start again.
+    """
+
+    def __init__(self, path, max_lines=None, initial_bytes=None):
+        self.path = path
+        self.lines = collections.deque(maxlen=max_lines or config["max_lines"])
+        self.initial_bytes = (
+            config["initial_bytes"] if initial_bytes is None else initial_bytes
+        )
+        self.offset = None
+        self._inode = None
+        self._partial = b""
+
+    def read(self):
+        """The complete lines appended since the last call."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+
+        skip_first = False
+        if self.offset is None:
+            # Only the end of a large existing file
+            self.offset = max(0, stat.st_size - self.initial_bytes)
+            skip_first = self.offset > 0
+        elif stat.st_ino != self._inode or stat.st_size < self.offset:
+            logger.debug("%s was truncated or rotated, reading it again", self.path)
+            self.offset, self._partial = 0, b""
+        self._inode = stat.st_ino
+        if stat.st_size == self.offset:
+            return []
+
+        with open(self.path, "rb") as file:
+            file.seek(self.offset)
+            data = self._partial + file.read(stat.st_size - self.offset)
+        self.offset = stat.st_size
+
+        # An unterminated last line waits for the rest of it
+        *complete, self._partial = data.split(b"\n")
+        if skip_first and complete:
+            complete = complete[1:]
+        new_lines = [line.decode("utf-8", "replace").rstrip("\r") for line in complete]
+        self.lines.extend(new_lines)
+        return new_lines
+
+    def text(self):
+        """The recent lines, after reading what is new."""
+        self.read()
+        return "\n".join(self.lines)
@@ -1,11 +1,15 @@
 import logging
 
 import gradio as gr
+import numpy as np
+import pandas as pd
+
+from logic_modules.trade_plan import BUY, SELL
 
 logger = logging.getLogger("tradebot")
 
 # Default configuration
-config = {"momentum_threshold": 0.05, "verbose": False}
+config = {"momentum_threshold": 0.05, "lookbacks": [1, 5, 20, 60], "verbose": False}
 
 
 def set_config(new_config):
@@ -13,30 +17,75 @@ def set_config(new_config):
     config.update(new_config)
 
 
+def _price_matrix(historical_prices, symbols):
+    """Bars x symbols float matrix for the symbols that have prices.
+
+    Accepts the price DataFrame from ``fetch_historical_prices`` or a plain
+    ``{symbol: prices}`` dict, whose series are aligned on their last bar.
+    """
+    if isinstance(historical_prices, pd.DataFrame):
+        positions = historical_prices.columns.get_indexer(symbols)
+        found = positions >= 0
+        matrix = historical_prices.to_numpy(dtype=np.float64)[:, positions[found]]
+        return [s for s, ok in zip(symbols, found) if ok], matrix
+
+    available = [s for s in symbols if s in historical_prices]
+    length = max((len(historical_prices[s]) for s in available), default=0)
+    matrix = np.full((length, len(available)), np.nan)
+    for column, symbol in enumerate(available):
+        prices = np.asarray(historical_prices[symbol], dtype=np.float64)
+        matrix[length - len(prices) :, column] = prices
+    return available, matrix
+
+
+def momentum_scores(prices, lookbacks):
+    """Mean relative return over every lookback that fits, one score per column.
+
+    ``prices`` is a bars x symbols matrix. Lookbacks longer than the history,
+    or reaching into a symbol's missing bars, are left out of its mean; a
+    symbol with no usable lookback scores NaN.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    lookbacks = np.asarray([k for k in lookbacks if 0 < k < len(prices)], dtype=int)
+    if not len(lookbacks):
+        return np.full(prices.shape[1], np.nan)
+
+    returns = prices[-1] / prices[-1 - lookbacks] - 1
+    valid = np.isfinite(returns)
+    counts = valid.sum(axis=0)
+    totals = np.where(valid, returns, 0.0).sum(axis=0)
+    return np.divide(
+        totals, counts, out=np.full(prices.shape[1], np.nan), where=counts > 0
+    )
+
+
 def execute_momentum_trades(strategy, plan, historical_prices):
     try:
-        # Example logic (replace with actual logic)
-        for symbol in strategy.watchlist:
-            # Check if historical prices are available
-            if symbol not in historical_prices:
-                strategy.logger.warning(f"No historical prices for {symbol}")
-                continue
-
-            # Example momentum logic
-            prices = historical_prices[symbol]
-            if len(prices) < 2:
-                strategy.logger.warning(f"Not enough data for {symbol}")
-                continue
-
-            # Calculate momentum (example)
-            momentum = prices[-1] - prices[-2]
-            strategy.logger.info(f"Momentum for {symbol}: {momentum}")
-
-            # Decide action based on momentum
-            if momentum > 0:
-                plan[symbol] = "buy"
-            elif momentum < 0:
-                plan[symbol] = "sell"
+        symbols, prices = _price_matrix(historical_prices, strategy.watchlist)
+        available = set(symbols)
+        missing = [s for s in strategy.watchlist if s not in available]
+        if missing:
+            strategy.logger.warning(f"No historical prices for {missing}")
+
+        scores = momentum_scores(prices, config["lookbacks"])
+        symbols = np.asarray(symbols, dtype=object)
+        if np.isnan(scores).any():
+            strategy.logger.warning(
+                f"Not enough data for {list(symbols[np.isnan(scores)])}"
+            )
+        if config["verbose"]:
+            strategy.logger.info("Momentum: %s", dict(zip(symbols, scores.round(4))))
+
+        # NaN compares False on both sides, so symbols without a score are skipped
+        threshold = config["momentum_threshold"]
+        buys = symbols[scores > threshold]
+        sells = symbols[scores < -threshold]
+        plan.assign(plan.index(buys), BUY, "momentum")
+        plan.assign(plan.index(sells), SELL, "momentum")
+        strategy.logger.info(
+            f"Momentum signals: {len(buys)} buy, {len(sells)} sell "
+            f"of {len(symbols)} symbols"
+        )
 
     except Exception as e:
         strategy.logger.error(f"Error executing momentum trades: {e}")
@@ -47,13 +96,23 @@ def create_ui():
         momentum_threshold = gr.Slider(
             minimum=0.01, maximum=0.1, label="Momentum Threshold"
         )
+        lookbacks = gr.Textbox(
+            value=", ".join(str(k) for k in config["lookbacks"]),
+            label="Lookbacks (bars)",
+        )
         verbose = gr.Checkbox(label="Verbose Logging")
 
         update_button = gr.Button("Update Momentum Config")
 
         update_button.click(
-            lambda m, v: set_config({"momentum_threshold": m, "verbose": v}),
-            inputs=[momentum_threshold, verbose],
+            lambda m, l, v: set_config(
+                {
+                    "momentum_threshold": m,
+                    "lookbacks": [int(k) for k in l.split(",") if k.strip()],
+                    "verbose": v,
+                }
+            ),
+            inputs=[momentum_threshold, lookbacks, verbose],
             outputs=None,
         )
     return ui
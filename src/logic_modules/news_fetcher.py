@@ -0,0 +1,116 @@
+# news_fetcher.py
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("tradebot")
+
+# Alpaca allows 200 data requests a minute on the free plan. Each request
+# returns the ``limit`` newest articles of a symbol (Alpaca's default).
+config = {
+    "limit": 10,
+    "max_workers": 8,
+    "requests_per_second": 200 / 60,
+    "burst": 10,
+    "retries": 3,
+    "backoff": 0.5,
+}
+
+
+def set_config(new_config):
+    global config, _bucket
+    config.update(new_config)
+    _bucket = None
+
+
+class TokenBucket:
+    """Thread-safe token bucket, ``acquire`` blocks until a token is free."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_bucket = None
+
+
+def _rate_limiter():
+    # Shared across calls so the limit holds over consecutive iterations too
+    global _bucket
+    if _bucket is None:
+        _bucket = TokenBucket(config["requests_per_second"], config["burst"])
+    return _bucket
+
+
+def _fetch_symbol(api, symbol, start, end):
+    bucket = _rate_limiter()
+    for attempt in range(config["retries"] + 1):
+        # Offline stand-ins (backtest data) are not rate limited
+        if not getattr(api, "offline", False):
+            bucket.acquire()
+        try:
+            return list(
+                api.get_news(symbol=symbol, start=start, end=end, limit=config["limit"])
+            )
+        except Exception as e:
+            if attempt == config["retries"]:
+                logger.error("Error fetching news for %s: %s", symbol, e)
+                return []
+            delay = config["backoff"] * 2**attempt * (1 + random.random())
+            logger.warning(
+                "News request for %s failed (%s), retrying in %.1fs", symbol, e, delay
+            )
+            time.sleep(delay)
+
+
+def fetch_articles(api, symbols, start, end):
+    """Fetch the articles of every symbol concurrently.
+
+    Like ``fetch_headlines`` but returns the article objects. ``start`` is one
+    date for all symbols or a ``{symbol: start}`` dict.
+    """
+    started = time.perf_counter()
+    starts = start if isinstance(start, dict) else dict.fromkeys(symbols, start)
+    workers = max(1, min(config["max_workers"], len(symbols)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="news") as pool:
+        results = pool.map(lambda s: _fetch_symbol(api, s, starts[s], end), symbols)
+        articles = dict(zip(symbols, results))
+    logger.info(
+        "Fetched news for %d symbols in %.2fs",
+        len(symbols),
+        time.perf_counter() - started,
+    )
+    return articles
+
+
+def fetch_headlines(api, symbols, start, end):
+    """Fetch headlines for every symbol concurrently.
+
+    Requests go through a bounded thread pool and a shared token bucket, and
+    failed requests are retried with exponential backoff. Returns
+    ``{symbol: [headline, ...]}`` with an empty list for symbols that failed.
+    """
+    articles = fetch_articles(api, symbols, start, end)
+    return {
+        symbol: [article.headline for article in news]
+        for symbol, news in articles.items()
+    }
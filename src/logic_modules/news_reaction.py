@@ -1,8 +1,10 @@
 import logging
 
 import gradio as gr
+import numpy as np
 
-from logic_modules.finbert_utils import estimate_sentiment
+from logic_modules.finbert_utils import estimate_sentiment_batch
+from logic_modules.trade_plan import BUY, SELL
 
 logger = logging.getLogger("tradebot")
 
@@ -15,22 +17,27 @@ def set_config(new_config):
     config.update(new_config)
 
 
-def react_to_news(portfolio, plan, news_data):
+def react_to_news(portfolio, plan, news_data, sentiments=None):
+    """Plan news trades, ``sentiments`` are scored from ``news_data`` unless given."""
     try:
-        for symbol, news in news_data.items():
-            probability, sentiment = estimate_sentiment(news)
-
-            if config["verbose"]:
-                logger.info(f"News for {symbol}: {news}")
+        if sentiments is None:
+            sentiments = estimate_sentiment_batch(news_data)
+        symbols = list(news_data)
+        probability = np.array([sentiments[s][0] for s in symbols], dtype=float)
+        sentiment = np.array([sentiments[s][1] for s in symbols], dtype=object)
+
+        if config["verbose"]:
+            for symbol, p, label in zip(symbols, probability, sentiment):
+                logger.info("News for %s: %s", symbol, news_data[symbol])
                 logger.info(
-                    f"Sentiment for {symbol}: Probability={probability}, Sentiment={sentiment}"
+                    "Sentiment for %s: Probability=%s, Sentiment=%s", symbol, p, label
                 )
 
-            if sentiment == "positive" and probability > config["positive_threshold"]:
-                plan[symbol] = "buy"
-
-            elif sentiment == "negative" and probability > config["negative_threshold"]:
-                plan[symbol] = "sell"
+        positions = plan.index(symbols)
+        buy = (sentiment == "positive") & (probability > config["positive_threshold"])
+        sell = (sentiment == "negative") & (probability > config["negative_threshold"])
+        plan.assign(positions[buy], BUY, "news")
+        plan.assign(positions[sell], SELL, "news")
 
     except Exception as e:
         logger.error(f"Error reacting to news: {e}")
@@ -0,0 +1,137 @@
+# news_window.py
+import collections
+import logging
+
+import numpy as np
+import pandas as pd
+
+from logic_modules import finbert_utils, news_fetcher
+from logic_modules.news_fetcher import fetch_articles
+
+logger = logging.getLogger("tradebot")
+
+
+def _utc(timestamp):
+    timestamp = pd.Timestamp(timestamp)
+    if timestamp.tzinfo is None:
+        return timestamp.tz_localize("UTC")
+    return timestamp.tz_convert("UTC")
+
+
+def _article_key(article):
+    # Alpaca articles have ids, local ones are told apart by time and text
+    key = getattr(article, "id", None)
+    return key if key is not None else (str(article.created_at), article.headline)
+
+
+class NewsWindow:
+    """Headlines of the news lookback window and their logits, kept up to date
+    one iteration at a time.
+
+    Each symbol has a high-water mark, the newest ``created_at`` seen so far.
+    ``update`` only requests articles from there on and only scores the ones
+    it has not seen. A symbol keeps its ``news_fetcher.config["limit"]``
+    newest articles, the ones a full ``fetch_headlines`` request returns. The
+    logits of a symbol's articles are kept as a running sum: new articles are
+    added to it and articles that fall out of the window are subtracted.
+    ``sentiments`` then gives what ``estimate_sentiment_batch`` returns for
+    the headlines of ``fetch_headlines``.
+    """
+
+    def __init__(self, symbols):
+        self.symbols = list(symbols)
+        self.high_water = dict.fromkeys(self.symbols)
+        # (created_at, key, headline, logits) in publication order
+        self._articles = {symbol: collections.deque() for symbol in self.symbols}
+        # Keys of the articles published at the high-water mark itself
+        self._latest = {symbol: set() for symbol in self.symbols}
+        self.sums = np.zeros((len(self.symbols), len(finbert_utils.labels)))
+        self.stats = {"fetched": 0, "scored": 0, "expired": 0}
+
+    def update(self, api, start, end):
+        """Bring the window to ``[start, end]`` (dates like ``get_dates``).
+
+        Returns the number of new articles.
+        """
+        cutoff = _utc(start)
+        self.expire(cutoff)
+        starts = {
+            symbol: start if last is None else max(last, cutoff).isoformat()
+            for symbol, last in self.high_water.items()
+        }
+        fetched = fetch_articles(api, self.symbols, starts, end)
+
+        new = []
+        for symbol, articles in fetched.items():
+            last, latest = self.high_water[symbol], self._latest[symbol]
+            for article in articles:
+                created_at = _utc(article.created_at)
+                key = _article_key(article)
+                if created_at < cutoff or (last is not None and created_at < last):
+                    continue
+                if created_at == last and key in latest:
+                    continue
+                new.append((symbol, created_at, key, article.headline))
+            self.stats["fetched"] += len(articles)
+
+        if new:
+            new.sort(key=lambda item: item[1])
+            logits = finbert_utils.headline_logits([item[3] for item in new])
+            logits = logits.numpy().astype(np.float64)
+            positions = {symbol: i for i, symbol in enumerate(self.symbols)}
+            for (symbol, created_at, key, headline), row in zip(new, logits):
+                self._articles[symbol].append((created_at, key, headline, row))
+                self.sums[positions[symbol]] += row
+                if created_at != self.high_water[symbol]:
+                    self.high_water[symbol] = created_at
+                    self._latest[symbol] = set()
+                self._latest[symbol].add(key)
+            self.stats["scored"] += len(new)
+            self._trim(news_fetcher.config["limit"])
+        logger.info(
+            "News window: %d new articles, %d in the window",
+            len(new),
+            sum(len(articles) for articles in self._articles.values()),
+        )
+        return len(new)
+
+    def expire(self, cutoff):
+        """Drop the articles published before ``cutoff``."""
+        cutoff = _utc(cutoff)
+        for i, symbol in enumerate(self.symbols):
+            articles = self._articles[symbol]
+            while articles and articles[0][0] < cutoff:
+                self.sums[i] -= articles.popleft()[3]
+                self.stats["expired"] += 1
+            if not articles:
+                # No rounding error left behind by the subtractions
+                self.sums[i] = 0.0
+
+    def _trim(self, limit):
+        # Only the newest ``limit`` articles, older ones were pushed out
+        for i, symbol in enumerate(self.symbols):
+            articles = self._articles[symbol]
+            while len(articles) > limit:
+                self.sums[i] -= articles.popleft()[3]
+                self.stats["expired"] += 1
+
+    def headlines(self):
+        """``{symbol: [headline, ...]}`` of the window, like ``fetch_headlines``."""
+        return {
+            symbol: [article[2] for article in articles]
+            for symbol, articles in self._articles.items()
+        }
+
+    def sentiments(self):
+        """``{symbol: (probability, label)}`` from the summed logits."""
+        exp = np.exp(self.sums - self.sums.max(axis=1, keepdims=True))
+        probabilities = exp / exp.sum(axis=1, keepdims=True)
+        best = probabilities.argmax(axis=1)
+        results = {}
+        for i, symbol in enumerate(self.symbols):
+            if self._articles[symbol]:
+                label = finbert_utils.labels[best[i]]
+                results[symbol] = (float(probabilities[i, best[i]]), label)
+            else:
+                results[symbol] = (0.0, finbert_utils.labels[-1])
+        return results
@@ -0,0 +1,107 @@
+# order_execution.py
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from logic_modules.trade_plan import TradePlan
+
+logger = logging.getLogger("tradebot")
+
+# Orders in flight at once. Backtests always submit one at a time, the
+# emulated broker is not thread-safe and has no latency to hide.
+config = {"max_workers": 8}
+
+
+def set_config(new_config):
+    global config
+    config.update(new_config)
+
+
+def plan_orders(plan):
+    """``(symbol, action, quantity)`` of every entry of a ``TradePlan``.
+
+    Dict plans work too: signals are plain "buy"/"sell" strings and get a
+    ``None`` quantity, random trades are ``(action, quantity)`` tuples.
+    """
+    if isinstance(plan, TradePlan):
+        return [
+            (symbol, action, quantity) for symbol, action, quantity, _ in plan.entries()
+        ]
+    orders = []
+    for symbol, entry in plan.items():
+        action, quantity = entry if isinstance(entry, tuple) else (entry, None)
+        orders.append((symbol, action, quantity))
+    return orders
+
+
+def _submit(strategy, symbol, action, quantity, snapshot):
+    """Size and submit one order, returns the submitted quantity (0 if none)."""
+    if action == "buy":
+        if quantity is None:
+            quantity = strategy.position_sizing(symbol)[2]
+    elif action == "sell":
+        # Sells always close the whole position
+        if snapshot is not None:
+            quantity = snapshot.position(symbol)
+        else:
+            position = strategy.get_position(symbol)
+            quantity = position.quantity if position else 0
+    else:
+        raise ValueError(f"Unknown action {action!r}")
+    if quantity <= 0:
+        return 0
+
+    order = strategy.create_order(
+        symbol, quantity, action, type="market", time_in_force="day"
+    )
+    strategy.submit_order(order)
+    return quantity
+
+
+def execute_plan(strategy, plan, max_workers=None, snapshot=None):
+    """Submit the orders of ``plan`` concurrently with bounded parallelism.
+
+    Sells close the positions of ``snapshot`` (a ``BrokerSnapshot``) when
+    given, instead of looking every position up. A failing order is logged
+    and reported without stopping the others.
+    Returns ``{"submitted": {symbol: (action, quantity)}, "failed": {symbol:
+    error}, "seconds": wall time of the batch}``.
+    """
+    orders = plan_orders(plan)
+    workers = max_workers or config["max_workers"]
+    if getattr(strategy, "is_backtesting", False):
+        workers = 1
+    workers = max(1, min(workers, len(orders)))
+
+    started = time.perf_counter()
+    submitted, failed = {}, {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="orders") as pool:
+        futures = {
+            pool.submit(_submit, strategy, symbol, action, quantity, snapshot): (
+                symbol,
+                action,
+            )
+            for symbol, action, quantity in orders
+        }
+        for future, (symbol, action) in futures.items():
+            try:
+                quantity = future.result()
+            except Exception as e:
+                logger.error(f"Error submitting {action} order for {symbol}: {e}")
+                failed[symbol] = str(e)
+                continue
+            if quantity:
+                logger.info(
+                    f"Placed {action} order for {symbol} - Quantity: {quantity}"
+                )
+                submitted[symbol] = (action, quantity)
+    seconds = time.perf_counter() - started
+
+    logger.info(
+        "Submitted %d orders (%d failed) in %.2fs on %d workers",
+        len(submitted),
+        len(failed),
+        seconds,
+        workers,
+    )
+    return {"submitted": submitted, "failed": failed, "seconds": seconds}
@@ -0,0 +1,138 @@
+# param_sweep.py
+import concurrent.futures
+import copy
+import itertools
+import logging
+import os
+import time
+
+import pandas as pd
+
+from logic_modules import momentum_trading, news_reaction, random_trading
+from logic_modules import transaction_filter
+
+logger = logging.getLogger("tradebot")
+
+# Parameters passed to the strategy itself, everything else goes to a module config
+STRATEGY_PARAMETERS = ("symbols", "cash_at_risk", "data_dir", "seed")
+MODULES = {
+    "news_reaction": news_reaction,
+    "momentum_trading": momentum_trading,
+    "transaction_filter": transaction_filter,
+    "random_trading": random_trading,
+}
+
+config = {"max_workers": os.cpu_count(), "rank_by": "sharpe", "log_dir": "logs"}
+
+
+def set_config(new_config):
+    global config
+    config.update(new_config)
+
+
+def expand_grid(grid):
+    """Parameter sets from a ``{name: [values]}`` grid or an explicit list of sets.
+
+    A grid expands to the cartesian product of its values. Symbol lists may be
+    given as comma separated strings.
+    """
+    if isinstance(grid, dict):
+        names = list(grid)
+        values = [v if isinstance(v, list) else [v] for v in grid.values()]
+        sets = [dict(zip(names, combo)) for combo in itertools.product(*values)]
+    else:
+        sets = [dict(params) for params in grid]
+
+    known = set(STRATEGY_PARAMETERS).union(*(m.config for m in MODULES.values()))
+    for params in sets:
+        unknown = set(params) - known
+        if unknown:
+            raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+        if isinstance(params.get("symbols"), str):
+            params["symbols"] = [
+                s.strip() for s in params["symbols"].split(",") if s.strip()
+            ]
+    return sets
+
+
+def module_configs():
+    """Snapshot of every tunable module's current config."""
+    return {name: copy.deepcopy(module.config) for name, module in MODULES.items()}
+
+
+def apply_parameters(params, base_configs):
+    """Reset the module configs to ``base_configs`` and apply the overrides.
+
+    Returns the parameters meant for the strategy. Worker processes are reused
+    across runs, so every run starts again from the same base.
+    """
+    for name, module in MODULES.items():
+        overrides = {k: v for k, v in params.items() if k in base_configs[name]}
+        module.set_config({**base_configs[name], **overrides})
+    return {k: params[k] for k in STRATEGY_PARAMETERS if k in params}
+
+
+def _metrics(result):
+    result = result or {}
+    drawdown = result.get("max_drawdown")
+    if isinstance(drawdown, dict):
+        drawdown = drawdown.get("drawdown")
+    return {
+        "return": result.get("total_return"),
+        "sharpe": result.get("sharpe"),
+        "max_drawdown": drawdown,
+    }
+
+
+def _run(job, run_id, params, base_configs, log_file_path):
+    """One sweep run in a worker process, never raises."""
+    started = time.perf_counter()
+    row = {"run": run_id, **params}
+    try:
+        strategy_parameters = apply_parameters(params, base_configs)
+        row.update(_metrics(job(strategy_parameters, log_file_path)))
+        row["error"] = None
+    except Exception as e:
+        logger.error(f"Sweep run {run_id} failed: {e}")
+        row.update(_metrics(None))
+        row["error"] = str(e)
+    row["wall_time"] = time.perf_counter() - started
+    row["log_file"] = log_file_path
+    return row
+
+
+def run_sweep(job, param_sets, max_workers=None, rank_by=None):
+    """Run ``job(strategy_parameters, log_file_path)`` for every parameter set.
+
+    ``job`` must be a picklable top-level function returning the backtest
+    results dict. Runs are spread over a process pool, each writes its own log
+    file under ``<log_dir>/sweep/``, and the summary is ranked by ``rank_by``
+    (best first, failed runs last).
+    """
+    max_workers = max_workers or config["max_workers"]
+    rank_by = rank_by or config["rank_by"]
+    log_dir = os.path.join(config["log_dir"], "sweep", time.strftime("%Y%m%d-%H%M%S"))
+    os.makedirs(log_dir, exist_ok=True)
+    base_configs = module_configs()
+
+    logger.info(f"Sweeping {len(param_sets)} parameter sets on {max_workers} workers")
+    started = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _run,
+                job,
+                run_id,
+                params,
+                base_configs,
+                os.path.join(log_dir, f"run_{run_id:03d}.log"),
+            )
+            for run_id, params in enumerate(param_sets)
+        ]
+        rows = [future.result() for future in futures]
+    logger.info(f"Sweep finished in {time.perf_counter() - started:.1f}s")
+
+    summary = pd.DataFrame(rows)
+    ascending = rank_by in ("max_drawdown", "wall_time")
+    summary = summary.sort_values(rank_by, ascending=ascending, na_position="last")
+    return summary.reset_index(drop=True)
@@ -0,0 +1,187 @@
+# pipeline.py
+import cProfile
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from logger_setup import log_stats
+
+logger = logging.getLogger("tradebot")
+
+# ``timings_file`` gets one JSON line per iteration (None to disable).
+# ``profile_iterations`` iterations are profiled with ``profiler`` ("cprofile"
+# or "pyinstrument"), the reports go to ``profile_dir``.
+config = {
+    "timings_file": os.path.join("logs", "stage_timings.jsonl"),
+    "profile_iterations": int(os.getenv("PROFILE_ITERATIONS", "0")),
+    "profiler": os.getenv("PROFILER", "cprofile"),
+    "profile_dir": os.path.join("logs", "profiles"),
+}
+
+
+def set_config(new_config):
+    global config
+    config.update(new_config)
+
+
+class _Profiler:
+    """cProfile, or pyinstrument when installed and selected."""
+
+    def __init__(self, kind):
+        self.kind = kind
+        if kind == "pyinstrument":
+            from pyinstrument import Profiler
+
+            self._profiler = Profiler()
+        else:
+            self._profiler = cProfile.Profile()
+
+    def start(self):
+        if self.kind == "pyinstrument":
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self, path):
+        if self.kind == "pyinstrument":
+            self._profiler.stop()
+            path += ".html"
+            with open(path, "w") as file:
+                file.write(self._profiler.output_html())
+        else:
+            self._profiler.disable()
+            path += ".prof"
+            self._profiler.dump_stats(path)
+        return path
+
+
+class Pipeline:
+    """Named stages run in order on a shared state, each one timed.
+
+    A stage is ``function(state)``; returning ``False`` ends the iteration
+    early and an exception ends it with an error logged against the stage.
+    Wall and CPU time and call counts add up per stage in ``stats``, and every
+    iteration appends its timings to ``config["timings_file"]``. The first
+    ``config["profile_iterations"]`` runs are profiled.
+    """
+
+    def __init__(self, name="iteration"):
+        self.name = name
+        self.stages = []
+        self.stats = {}
+        self.iterations = 0
+        self._profile_remaining = config["profile_iterations"]
+
+    def register(self, name, function):
+        if name in self.stats:
+            raise ValueError(f"Stage {name!r} is already registered")
+        self.stages.append((name, function))
+        self.stats[name] = {"calls": 0, "wall": 0.0, "cpu": 0.0}
+        return function
+
+    def stage(self, name):
+        """Decorator form of ``register``."""
+        return lambda function: self.register(name, function)
+
+    def profile(self, iterations):
+        """Profile the next ``iterations`` runs."""
+        self._profile_remaining = iterations
+
+    def run(self, state, **fields):
+        """Run every stage on ``state``, returns the iteration's timing record.
+
+        ``fields`` are added to the record, e.g. the strategy time.
+        """
+        self.iterations += 1
+        profiler = None
+        if self._profile_remaining > 0:
+            self._profile_remaining -= 1
+            try:
+                profiler = _Profiler(config["profiler"])
+                profiler.start()
+            except Exception as e:
+                logger.error(f"Could not start the {config['profiler']} profiler: {e}")
+                profiler = None
+
+        record = {
+            "pipeline": self.name,
+            "iteration": self.iterations,
+            "time": datetime.now(timezone.utc).isoformat(),
+            **fields,
+            "stages": {},
+            "stopped_at": None,
+            "error": None,
+        }
+        logged = log_stats()["seconds"]
+        started = time.perf_counter()
+        for name, function in self.stages:
+            wall, cpu = time.perf_counter(), time.process_time()
+            try:
+                result = function(state)
+            except Exception as e:
+                logger.error(f"Error during {self.name} stage {name}: {e}")
+                record["error"] = f"{name}: {e}"
+                result = False
+            finally:
+                wall = time.perf_counter() - wall
+                cpu = time.process_time() - cpu
+                stats = self.stats[name]
+                stats["calls"] += 1
+                stats["wall"] += wall
+                stats["cpu"] += cpu
+                record["stages"][name] = {"wall": wall, "cpu": cpu}
+            if result is False:
+                record["stopped_at"] = name
+                break
+        record["wall"] = time.perf_counter() - started
+
+        if profiler is not None:
+            os.makedirs(config["profile_dir"], exist_ok=True)
+            path = os.path.join(
+                config["profile_dir"], f"{self.name}_{self.iterations:05d}"
+            )
+            logger.info(f"Profile written to {profiler.stop(path)}")
+
+        logger.info(
+            "Trading %s took %.2fs (%s)",
+            self.name,
+            record["wall"],
+            ", ".join(f"{n} {t['wall']:.2f}s" for n, t in record["stages"].items()),
+        )
+        # Time the iteration's threads spent logging, the stages included
+        record["logging"] = log_stats()["seconds"] - logged
+        self._write(record)
+        return record
+
+    def _write(self, record):
+        path = config["timings_file"]
+        if not path:
+            return
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "a") as file:
+                file.write(json.dumps(record, default=str) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write stage timings to {path}: {e}")
+
+
+def load_timings(path=None):
+    """Iterations x stages wall times from a timings file, plus the total and
+    the time spent logging."""
+    path = path or config["timings_file"]
+    rows = []
+    with open(path, "r") as file:
+        for line in file:
+            record = json.loads(line)
+            row = {name: t["wall"] for name, t in record["stages"].items()}
+            row.update(
+                time=record["time"],
+                total=record["wall"],
+                logging=record.get("logging", 0.0),
+            )
+            rows.append(row)
+    return pd.DataFrame(rows)
@@ -1,11 +1,208 @@
+import logging
+import time
+from collections import deque
+
+import numpy as np
 import pandas as pd
 from pypfopt.efficient_frontier import EfficientFrontier
-from pypfopt.expected_returns import mean_historical_return
-from pypfopt.risk_models import CovarianceShrinkage
+
+logger = logging.getLogger("tradebot")
+
+# Trading days per year, as in PyPortfolioOpt. Re-optimization is skipped while
+# expected returns and covariances move less than the tolerance.
+config = {"frequency": 252, "tolerance": 1e-4}
+
+
+def set_config(new_config):
+    global config
+    config.update(new_config)
+
+
+class RollingMoments:
+    """Expected returns and Ledoit-Wolf covariance over a sliding price window.
+
+    Matches ``mean_historical_return`` and ``CovarianceShrinkage.ledoit_wolf``
+    but keeps running sums of the daily returns, so a new bar costs O(n^2) in
+    the number of symbols instead of a pass over the whole window. The sums are
+    rebuilt from scratch whenever the frame is not a continuation of the last
+    one (other symbols, a changed bar anywhere in the part both windows share,
+    or a non-sliding index), and when a return with a NaN leaves the window,
+    since it can't be subtracted again.
+    """
+
+    def __init__(self):
+        self.symbols = None
+        self.rebuilds = 0
+        self.updates = 0
+
+    def _reset(self, symbols):
+        p = len(symbols)
+        self.symbols = symbols
+        self.last_prices = None
+        self.index = deque()
+        self.rows = deque()
+        self.n = 0
+        self.sum = np.zeros(p)
+        self.outer = np.zeros((p, p))
+        self.log_growth = np.zeros(p)
+        self.norm2 = 0.0  # sum of |x|^2
+        self.norm4 = 0.0  # sum of |x|^4
+        self.weighted = np.zeros(p)  # sum of |x|^2 x
+
+    def _add(self, label, row):
+        norm2 = row @ row
+        self.index.append(label)
+        self.rows.append(row)
+        self.n += 1
+        self.sum += row
+        self.outer += np.outer(row, row)
+        self.log_growth += np.log1p(row)
+        self.norm2 += norm2
+        self.norm4 += norm2 * norm2
+        self.weighted += norm2 * row
+
+    def _remove(self):
+        self.index.popleft()
+        row = self.rows.popleft()
+        norm2 = row @ row
+        self.n -= 1
+        self.sum -= row
+        self.outer -= np.outer(row, row)
+        self.log_growth -= np.log1p(row)
+        self.norm2 -= norm2
+        self.norm4 -= norm2 * norm2
+        self.weighted -= norm2 * row
+        return np.isfinite(row).all()
+
+    def _continues(self, prices, symbols):
+        if symbols != self.symbols or self.last_prices is None:
+            return False
+        if not prices.index.is_monotonic_increasing:
+            return False
+        position = prices.index.searchsorted(self.last_index[-1])
+        if position >= len(prices) or prices.index[position] != self.last_index[-1]:
+            return False
+        # Every bar both windows share must be unchanged, a bar rewritten
+        # anywhere in the window (e.g. by the bar store) is in the sums
+        overlap = min(position + 1, len(self.last_index))
+        shared = slice(position + 1 - overlap, position + 1)
+        if not prices.index[shared].equals(self.last_index[-overlap:]):
+            return False
+        return np.array_equal(
+            prices.iloc[shared].to_numpy(dtype=np.float64),
+            self.last_prices[-overlap:],
+            equal_nan=True,
+        )
+
+    def update(self, prices):
+        """Bring the moments in line with ``prices`` (bars x symbols)."""
+        symbols = tuple(prices.columns)
+        if self._continues(prices, symbols):
+            start = prices.index.searchsorted(self.last_index[-1])
+            self.updates += 1
+        else:
+            self._reset(symbols)
+            start = 0
+            self.rebuilds += 1
+
+        window = prices.iloc[start:]
+        returns = window.pct_change().iloc[1:]
+        for label, row in zip(returns.index, returns.to_numpy(dtype=np.float64)):
+            self._add(label, row)
+        finite = True
+        while self.n > len(prices) - 1:
+            finite &= self._remove()
+        if not finite or (self.n and self.index[0] != prices.index[1]):
+            # The window did not slide the way we assumed, or the sums kept a
+            # NaN of a row that is gone: start over
+            self.symbols = None
+            self.updates -= 1
+            return self.update(prices)
+
+        self.last_index = prices.index
+        self.last_prices = prices.to_numpy(dtype=np.float64, copy=True)
+
+    def expected_returns(self):
+        """Annualised geometric mean return, like ``mean_historical_return``."""
+        growth = np.exp(self.log_growth * config["frequency"] / self.n) - 1
+        return pd.Series(growth, index=self.symbols)
+
+    def ledoit_wolf(self):
+        """Annualised Ledoit-Wolf covariance with a constant variance target."""
+        n, p = self.n, len(self.symbols)
+        mean = self.sum / n
+        cov = self.outer / n - np.outer(mean, mean)
+
+        # sum over rows of |x - mean|^4, expanded into the running sums
+        c = mean @ mean
+        centered_norm4 = (
+            self.norm4
+            + 4 * mean @ self.outer @ mean
+            + n * c * c
+            - 4 * mean @ self.weighted
+            + 2 * c * self.norm2
+            - 4 * c * (mean @ self.sum)
+        )
+
+        trace = np.trace(cov)
+        mu = trace / p
+        delta_ = np.sum(cov**2)
+        beta = (centered_norm4 / n - delta_) / (p * n)
+        delta = (delta_ - 2 * mu * trace + p * mu**2) / p
+        beta = min(beta, delta)
+        shrinkage = 0 if beta == 0 else beta / delta
+
+        shrunk = (1 - shrinkage) * cov
+        shrunk.flat[:: p + 1] += shrinkage * mu
+        return pd.DataFrame(
+            shrunk * config["frequency"], index=self.symbols, columns=self.symbols
+        )
+
+
+class OptimizerCache:
+    """Last max-Sharpe weights, reused while the inputs stay within tolerance."""
+
+    def __init__(self):
+        self.inputs = None
+        self.weights = None
+
+    def lookup(self, mu, S):
+        if self.inputs is None:
+            return None
+        cached_mu, cached_S = self.inputs
+        if not cached_mu.index.equals(mu.index):
+            return None
+        tolerance = config["tolerance"]
+        if (
+            np.max(np.abs(cached_mu.to_numpy() - mu.to_numpy())) <= tolerance
+            and np.max(np.abs(cached_S.to_numpy() - S.to_numpy())) <= tolerance
+        ):
+            return self.weights
+        return None
+
+    def store(self, mu, S, weights):
+        self.inputs = (mu, S)
+        self.weights = weights
+
+
+_moments = RollingMoments()
+_cache = OptimizerCache()
+_stats = {"calls": 0, "cache_hits": 0, "optimizations": 0, "seconds": 0.0}
+
+
+def optimizer_stats():
+    """Call counts and latency of optimize_portfolio since start-up."""
+    stats = dict(_stats)
+    stats["moment_rebuilds"] = _moments.rebuilds
+    stats["moment_updates"] = _moments.updates
+    stats["mean_seconds"] = stats["seconds"] / stats["calls"] if stats["calls"] else 0
+    return stats
 
 
 def optimize_portfolio(historical_prices):
     """Optimize portfolio allocation using PyPortfolioOpt."""
+    started = time.perf_counter()
+    _stats["calls"] += 1
     try:
         # Check for empty or NaN values
         if historical_prices.empty or historical_prices.isnull().values.any():
@@ -15,11 +212,19 @@ def optimize_portfolio(historical_prices):
         if len(historical_prices) < 2:
             raise ValueError("Not enough data points for optimization.")
 
-        mu = mean_historical_return(historical_prices)
-        S = CovarianceShrinkage(historical_prices).ledoit_wolf()
-        ef = EfficientFrontier(mu, S)
-        ef.max_sharpe()
-        cleaned_weights = ef.clean_weights()
+        _moments.update(historical_prices)
+        mu = _moments.expected_returns()
+        S = _moments.ledoit_wolf()
+
+        cleaned_weights = _cache.lookup(mu, S)
+        if cleaned_weights is not None:
+            _stats["cache_hits"] += 1
+        else:
+            ef = EfficientFrontier(mu, S)
+            ef.max_sharpe()
+            cleaned_weights = ef.clean_weights()
+            _cache.store(mu, S, cleaned_weights)
+            _stats["optimizations"] += 1
 
         print("Optimized Weights:", cleaned_weights)
 
@@ -27,3 +232,7 @@ def optimize_portfolio(historical_prices):
     except Exception as e:
         print(f"Error optimizing portfolio: {e}")
         return {}
+    finally:
+        elapsed = time.perf_counter() - started
+        _stats["seconds"] += elapsed
+        logger.info("Portfolio optimization took %.3fs: %s", elapsed, optimizer_stats())
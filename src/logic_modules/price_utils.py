@@ -1,30 +1,262 @@
 # price_utils.py
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 
+import numpy as np
 import pandas as pd
-from alpaca_trade_api import REST, TimeFrame
+from alpaca_trade_api import REST, TimeFrame, TimeFrameUnit
+
+from logic_modules import news_fetcher
 
 logger = logging.getLogger("tradebot")
 
+# How missing bars are handled in the price matrix: "ffill" or "drop".
+# Bars are requested ``chunk_size`` symbols at a time, ``max_workers`` chunks
+# concurrently. Fetched price matrices hold float32 closes, half the memory
+# of float64 at thousands of symbols.
+config = {"gap_policy": "ffill", "chunk_size": 200, "max_workers": 4}
+
+
+def set_config(new_config):
+    global config
+    config.update(new_config)
+
+
+def _cold_start(bars_length, timeframe=TimeFrame.Day, now=None):
+    """Start date that covers ``bars_length`` bars before ``now`` (default the
+    current time) plus weekends and holidays."""
+    if timeframe.unit == TimeFrameUnit.Minute:
+        # 390 minutes per regular trading session
+        sessions = -(-bars_length * timeframe.amount // 390)
+    elif timeframe.unit == TimeFrameUnit.Hour:
+        sessions = -(-bars_length * timeframe.amount // 7)
+    else:
+        sessions = bars_length
+    days = int(sessions * 7 / 5) + 10
+    now = datetime.now(timezone.utc) if now is None else now
+    return (now - timedelta(days=days)).date().isoformat()
+
+
+def update_bar_store(api, symbols, store, bars_length, timeframe=TimeFrame.Day):
+    """Fetch only the bars from the last one the store holds on."""
+    # Symbols are grouped by where their bars start, so a stale or halted
+    # symbol does not make the whole universe refetch its gap. The last
+    # stored bar is requested again since it may have been stored before its
+    # period closed; the store drops the bars each symbol already has.
+    groups = {}
+    for symbol in symbols:
+        last = store.last_timestamp(symbol, timeframe)
+        if last is None:
+            start = _cold_start(bars_length, timeframe)
+        else:
+            start = pd.Timestamp(last, tz="UTC").isoformat()
+        groups.setdefault(start, []).append(symbol)
+
+    requests = [
+        (start, chunk) for start, group in groups.items() for chunk in _chunks(group)
+    ]
+    added = 0
+    with _pool(len(requests)) as pool:
+        frames = pool.map(
+            lambda request: _request_bars(api, request[1], timeframe, request[0]),
+            requests,
+        )
+        # Appended one chunk at a time as the requests complete, in order
+        for bars in frames:
+            added += store.append_frame(bars, timeframe)
+    logger.info(
+        "Stored %d new bars for %d symbols in %d requests",
+        added,
+        len(symbols),
+        len(requests),
+    )
+    return added
+
+
+def price_matrix(timestamps, symbol_codes, closes, symbols, dtype=np.float64):
+    """Scatter long-format closes into a timestamp x symbol float matrix.
+
+    ``timestamps`` are nanoseconds since the epoch and ``symbol_codes`` index
+    into ``symbols`` (negative codes are ignored). Missing bars stay NaN.
+    """
+    keep = symbol_codes >= 0
+    time_codes, times = pd.factorize(timestamps[keep], sort=True)
+    matrix = np.full((len(times), len(symbols)), np.nan, dtype=dtype)
+    matrix[time_codes, symbol_codes[keep]] = closes[keep]
+    index = pd.DatetimeIndex(pd.to_datetime(times, utc=True), name="timestamp")
+    return pd.DataFrame(matrix, index=index, columns=list(symbols))
+
+
+def fill_gaps(price_df, gap_policy=None):
+    """Apply the gap policy so the matrix has no NaNs left.
+
+    "ffill" carries the last close over missing bars. Symbols whose first bar
+    comes after the first half of the window are removed, and the leading rows
+    before the remaining symbols' first bars are trimmed. "drop" removes every
+    symbol with a missing bar. Symbols without any data are always removed.
+    """
+    gap_policy = gap_policy or config["gap_policy"]
+    empty = price_df.columns[price_df.isna().all().to_numpy()]
+    for symbol in empty:
+        logger.warning(f"No data for {symbol}")
+    price_df = price_df.drop(columns=empty)
+    if price_df.empty:
+        return price_df
+
+    if gap_policy == "ffill":
+        price_df = price_df.ffill()
+        late = price_df.columns[(price_df.isna().sum() > len(price_df) // 2).to_numpy()]
+        if len(late):
+            logger.warning(f"Dropping symbols with too short a history: {list(late)}")
+        price_df = price_df.drop(columns=late)
+        first_complete = price_df.notna().all(axis=1).to_numpy().argmax()
+        price_df = price_df.iloc[first_complete:]
+    elif gap_policy == "drop":
+        gappy = price_df.columns[price_df.isna().any().to_numpy()]
+        if len(gappy):
+            logger.warning(f"Dropping symbols with missing bars: {list(gappy)}")
+        price_df = price_df.drop(columns=gappy)
+    else:
+        raise ValueError(f"Unknown gap policy {gap_policy!r}")
+    return price_df
+
+
+def bars_to_prices(bars, symbols, gap_policy=None):
+    """Closing price matrix from an Alpaca bars frame in a single reshape."""
+    if bars.empty:
+        return pd.DataFrame(columns=list(symbols), dtype=float)
+    index = bars.index
+    index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+    codes = pd.Categorical(bars["symbol"], categories=list(symbols)).codes
+    price_df = price_matrix(
+        index.as_unit("ns").asi8,
+        codes.astype(np.int64),
+        bars["close"].to_numpy(dtype=np.float64),
+        symbols,
+    )
+    return fill_gaps(price_df, gap_policy)
 
-def fetch_historical_prices(api, symbols):
-    logger.info(f"Fetching historical prices for {', '.join(symbols)}")
+
+def _chunks(symbols):
+    size = max(1, config["chunk_size"])
+    return [symbols[offset : offset + size] for offset in range(0, len(symbols), size)]
+
+
+def _pool(requests):
+    workers = max(1, min(config["max_workers"], requests))
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bars")
+
+
+def _request_bars(api, symbols, timeframe, start):
+    """Bars frame of ``symbols`` since ``start`` in one rate-limited request."""
+    # The data API limit is shared with the news requests
+    if not getattr(api, "offline", False):
+        news_fetcher._rate_limiter().acquire()
+    # A limit would cap the bars of the whole request, not those of each symbol
+    return api.get_bars(symbols, timeframe, start=start).df
+
+
+def _chunk_closes(api, chunk, offset, timeframe, start):
+    """Compact arrays of one chunk's bars, the bars frame is dropped right away.
+
+    Returns nanosecond timestamps, watchlist positions (``offset`` plus the
+    position within the chunk, -1 for unexpected symbols) and float32 closes.
+    """
+    bars = _request_bars(api, chunk, timeframe, start)
+    if bars.empty:
+        return (
+            np.empty(0, dtype=np.int64),
+            np.empty(0, dtype=np.int64),
+            np.empty(0, dtype=np.float32),
+        )
+    index = bars.index
+    index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+    codes = pd.Categorical(bars["symbol"], categories=list(chunk)).codes
+    codes = np.where(codes >= 0, codes.astype(np.int64) + offset, -1)
+    return index.as_unit("ns").asi8, codes, bars["close"].to_numpy(dtype=np.float32)
+
+
+def fetch_price_matrix(
+    api, symbols, bars_length, timeframe=TimeFrame.Day, gap_policy=None
+):
+    """Closing prices of ``symbols`` requested in chunks over a thread pool.
+
+    Every chunk is reduced to arrays as soon as it arrives, and the closes are
+    then scattered into one preallocated float32 timestamp x symbol matrix,
+    so the per-chunk frames are never concatenated. The last ``bars_length``
+    bars are kept, like ``prices_from_store`` does.
+    """
+    started = time.perf_counter()
+    symbols = list(symbols)
+    # An offline API serves bars up to its own (backtest) clock
+    clock = getattr(api, "clock", None)
+    start = _cold_start(bars_length, timeframe, clock() if clock else None)
+    size = max(1, config["chunk_size"])
+    offsets = range(0, len(symbols), size)
+    with _pool(len(offsets)) as pool:
+        chunks = list(
+            pool.map(
+                lambda offset: _chunk_closes(
+                    api, symbols[offset : offset + size], offset, timeframe, start
+                ),
+                offsets,
+            )
+        )
+
+    times = np.unique(
+        np.concatenate([np.empty(0, np.int64)] + [chunk[0] for chunk in chunks])
+    )
+    matrix = np.full((len(times), len(symbols)), np.nan, dtype=np.float32)
+    for timestamps, codes, closes in chunks:
+        keep = codes >= 0
+        matrix[np.searchsorted(times, timestamps[keep]), codes[keep]] = closes[keep]
+    index = pd.DatetimeIndex(pd.to_datetime(times, utc=True), name="timestamp")
+    price_df = pd.DataFrame(matrix, index=index, columns=symbols, copy=False)
+    logger.info(
+        "Fetched bars for %d symbols in %d chunks in %.2fs",
+        len(symbols),
+        len(chunks),
+        time.perf_counter() - started,
+    )
+    return fill_gaps(price_df, gap_policy).iloc[-bars_length:]
+
+
+def prices_from_store(
+    store, symbols, bars_length, timeframe=TimeFrame.Day, gap_policy=None
+):
+    """Closing prices of the last ``bars_length`` stored bars, one column per
+    symbol, float32 like ``fetch_price_matrix``."""
+    windows = [store.window(symbol, timeframe, bars_length) for symbol in symbols]
+    lengths = [len(window) for window in windows]
+    price_df = price_matrix(
+        np.concatenate([window["timestamp"] for window in windows]),
+        np.repeat(np.arange(len(symbols)), lengths),
+        np.concatenate([window["close"] for window in windows]),
+        symbols,
+        dtype=np.float32,
+    )
+    return fill_gaps(price_df, gap_policy).iloc[-bars_length:]
+
+
+def fetch_historical_prices(
+    api, symbols, bars_length=30, store=None, timeframe=TimeFrame.Day
+):
+    logger.info("Fetching historical prices for %d symbols", len(symbols))
 
     try:
-        bars = api.get_bars(
-            symbols, TimeFrame.Day, limit=30
-        ).df  # Ensure this returns a DataFrame
-
-        price_data = {}
-        for symbol in symbols:
-            df = bars[bars["symbol"] == symbol]  # Ensure 'symbol' column exists
-            if df.empty:
-                logger.warning(f"No data for {symbol}")
-            else:
-                price_data[symbol] = df["close"].values
-
-        price_df = pd.DataFrame(price_data)
-        logger.info(f"Retrieved historical prices: {price_df.head()}")
+        if store is not None:
+            update_bar_store(api, symbols, store, bars_length, timeframe)
+            price_df = prices_from_store(store, symbols, bars_length, timeframe)
+        else:
+            price_df = fetch_price_matrix(api, symbols, bars_length, timeframe)
+
+        logger.info(
+            "Retrieved historical prices: %d bars x %d symbols", *price_df.shape
+        )
+        # Only rendered when debug logging is on
+        logger.debug("Historical prices:\n%s", price_df)
         return price_df
 
     except Exception as e:
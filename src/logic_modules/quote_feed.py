@@ -0,0 +1,185 @@
+# quote_feed.py
+import logging
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from alpaca_trade_api.common import URL
+from alpaca_trade_api.stream import Stream
+
+logger = logging.getLogger("tradebot")
+
+# Quotes older than ``max_age`` seconds count as missing (None: never stale).
+# ``data_feed`` is the Alpaca quote stream, "iex" or "sip".
+config = {"max_age": None, "data_feed": "iex"}
+
+
+def set_config(new_config):
+    global config
+    config.update(new_config)
+
+
+def _epoch_seconds(timestamps):
+    return (
+        pd.DatetimeIndex(pd.to_datetime(timestamps, utc=True)).as_unit("ns").asi8 / 1e9
+    )
+
+
+def relative_spreads(bid, ask):
+    """``(ask - bid) / mid``, NaN where a side is missing or the quote is crossed."""
+    bid = np.asarray(bid, dtype=float)
+    ask = np.asarray(ask, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        spread = (ask - bid) / ((ask + bid) / 2)
+    return np.where((bid > 0) & (ask >= bid), spread, np.nan)
+
+
+class QuoteBook:
+    """Latest bid and ask of every symbol of a watchlist, held in memory.
+
+    Feeds write into it from their own threads, the strategy reads all the
+    spreads at once with ``spreads`` without any request.
+    """
+
+    def __init__(self, symbols):
+        self.symbols = list(symbols)
+        self.symbol_index = pd.Index(self.symbols)
+        self.bid = np.full(len(self.symbols), np.nan)
+        self.ask = np.full(len(self.symbols), np.nan)
+        self.timestamp = np.full(len(self.symbols), np.nan)  # epoch seconds
+        self.updates = 0
+        self._lock = threading.Lock()
+
+    def update(self, symbol, bid, ask, timestamp=None):
+        """One quote, stamped with the time it arrived unless given."""
+        i = self.symbol_index.get_indexer([symbol])[0]
+        if i < 0:
+            return
+        timestamp = time.time() if timestamp is None else _epoch_seconds([timestamp])[0]
+        with self._lock:
+            self.bid[i], self.ask[i], self.timestamp[i] = bid, ask, timestamp
+            self.updates += 1
+
+    def update_many(self, symbols, bids, asks, timestamps):
+        """Quotes in time order as arrays, timestamps in epoch seconds."""
+        positions = self.symbol_index.get_indexer(symbols)
+        known = positions >= 0
+        positions = positions[known]
+        with self._lock:
+            # A symbol quoted several times keeps its last quote
+            self.bid[positions] = np.asarray(bids, dtype=float)[known]
+            self.ask[positions] = np.asarray(asks, dtype=float)[known]
+            self.timestamp[positions] = np.asarray(timestamps, dtype=float)[known]
+            self.updates += int(known.sum())
+
+    def spreads(self, symbols=None, now=None):
+        """Relative spreads of ``symbols`` (the whole book by default) as an array.
+
+        NaN for symbols without a quote, or with one older than
+        ``config["max_age"]`` seconds at ``now`` (default the current time).
+        """
+        with self._lock:
+            if symbols is None:
+                bid, ask, stamp = (
+                    self.bid.copy(),
+                    self.ask.copy(),
+                    self.timestamp.copy(),
+                )
+            else:
+                # Unknown symbols (-1) land on an appended NaN
+                positions = self.symbol_index.get_indexer(symbols)
+                bid, ask, stamp = (
+                    np.append(values, np.nan)[positions]
+                    for values in (self.bid, self.ask, self.timestamp)
+                )
+        spread = relative_spreads(bid, ask)
+        if config["max_age"] is not None:
+            now = time.time() if now is None else _epoch_seconds([now])[0]
+            spread[~(now - stamp <= config["max_age"])] = np.nan
+        return spread
+
+
+class ReplayQuoteFeed:
+    """Local stand-in for the live feed, replaying a quotes table into a book.
+
+    ``quotes`` has ``symbol``, ``timestamp``, ``bid_price`` and ``ask_price``
+    columns like ``LocalDataset.quotes``. ``advance(until)`` delivers every
+    quote up to ``until``, so backtests and tests control the clock.
+    """
+
+    def __init__(self, book, quotes):
+        quotes = quotes.sort_values("timestamp", kind="stable")
+        self.book = book
+        self._symbols = quotes["symbol"].to_numpy()
+        self._bids = quotes["bid_price"].to_numpy(dtype=float)
+        self._asks = quotes["ask_price"].to_numpy(dtype=float)
+        self._times = _epoch_seconds(quotes["timestamp"])
+        self.position = 0
+
+    def advance(self, until):
+        """Deliver the quotes up to ``until``, returns how many."""
+        stop = int(np.searchsorted(self._times, _epoch_seconds([until])[0], "right"))
+        if stop <= self.position:
+            return 0
+        window = slice(self.position, stop)
+        self.book.update_many(
+            self._symbols[window],
+            self._bids[window],
+            self._asks[window],
+            self._times[window],
+        )
+        delivered, self.position = stop - self.position, stop
+        return delivered
+
+
+class AlpacaDataStream(Stream):
+    """The account's connection to Alpaca's market data stream.
+
+    Alpaca accepts a limited number of market data websockets per account, so
+    the quote feed and the intraday bar stream subscribe on this one. Call
+    ``start`` once everything is subscribed, it runs on a background thread.
+    """
+
+    def __init__(self, creds, data_feed=None):
+        super().__init__(
+            creds["API_KEY"],
+            creds["API_SECRET"],
+            base_url=URL(creds["BASE_URL"]) if creds["BASE_URL"] else None,
+            data_feed=data_feed or config["data_feed"],
+        )
+
+    def start(self):
+        threading.Thread(target=self._run, name="market-data", daemon=True).start()
+        return self
+
+    def _run(self):
+        try:
+            self.run()
+        except Exception as e:
+            logger.error(f"Market data stream stopped: {e}")
+
+
+class AlpacaQuoteFeed:
+    """Live quotes of the book's symbols from an ``AlpacaDataStream``.
+
+    Every quote updates the book as it arrives on the stream's thread.
+    """
+
+    def __init__(self, book, stream):
+        self.book = book
+        stream.subscribe_quotes(self._on_quote, *book.symbols)
+
+    async def _on_quote(self, quote):
+        self.book.update(quote.symbol, quote.bid_price, quote.ask_price)
+
+
+def spread_matrix(quotes, times, symbols):
+    """Times x symbols spreads of the last quote at or before every time."""
+    book = QuoteBook(symbols)
+    feed = ReplayQuoteFeed(book, quotes)
+    rows = np.full((len(times), len(symbols)), np.nan)
+    for row, when in enumerate(times):
+        feed.advance(when)
+        rows[row] = book.spreads(now=when)
+    return rows
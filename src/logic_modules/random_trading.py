@@ -14,33 +14,48 @@ config = {
     "max_quantity": 10,
 }
 
+# Separate generator so backtests can make the random trades reproducible
+_rng = random.Random()
+
 
 def set_config(new_config):
     global config
     config.update(new_config)
 
 
+def seed(value):
+    """Reseed the random trades, the same seed gives the same trades."""
+    _rng.seed(value)
+
+
+def draw_random_trades(watchlist, held):
+    """The random buy and sell of one iteration as ``(symbol, action, quantity)``.
+
+    ``held`` are the symbols a random sell may pick from.
+    """
+    trades = []
+    if _rng.random() < config["buy_probability"]:
+        symbol = _rng.choice(watchlist)
+        quantity = _rng.randint(config["min_quantity"], config["max_quantity"])
+        trades.append((symbol, "buy", quantity))
+
+    if _rng.random() < config["sell_probability"] and held:
+        symbol = _rng.choice(held)
+        quantity = _rng.randint(config["min_quantity"], config["max_quantity"])
+        trades.append((symbol, "sell", quantity))
+    return trades
+
+
 def execute_random_trades(strategy, plan):
     try:
-        if random.random() < config["buy_probability"]:
-            symbol = random.choice(strategy.watchlist)
-            quantity = random.randint(config["min_quantity"], config["max_quantity"])
-            logger.info(f"Random buy: {symbol}, Quantity: {quantity}")
-            plan[symbol] = ("buy", quantity)
-
-        if random.random() < config["sell_probability"]:
-            portfolio_symbols = [
-                symbol
-                for symbol in strategy.last_trades
-                if strategy.last_trades[symbol] == "buy"
-            ]
-            if portfolio_symbols:
-                symbol = random.choice(portfolio_symbols)
-                quantity = random.randint(
-                    config["min_quantity"], config["max_quantity"]
-                )
-                logger.info(f"Random sell: {symbol}, Quantity: {quantity}")
-                plan[symbol] = ("sell", quantity)
+        held = [
+            symbol
+            for symbol in strategy.last_trades
+            if strategy.last_trades[symbol] == "buy"
+        ]
+        for symbol, action, quantity in draw_random_trades(strategy.watchlist, held):
+            logger.info("Random %s: %s, Quantity: %s", action, symbol, quantity)
+            plan.set(symbol, action, quantity, source="random")
 
     except Exception as e:
         logger.error(f"Error executing random trades: {e}")
@@ -0,0 +1,192 @@
+# sentiment_cache.py
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger("tradebot")
+
+DEFAULT_CACHE_PATH = os.getenv(
+    "SENTIMENT_CACHE_PATH", os.path.join("cache", "sentiment_cache.sqlite")
+)
+
+# SQLite caps the number of bound parameters per statement
+_SQL_CHUNK = 500
+
+
+class SentimentCache:
+    """Per-headline logits cache keyed by a hash of the headline text.
+
+    Lookups go to an in-memory LRU first and then to an SQLite file that
+    survives restarts. The file is kept under ``max_disk_bytes`` by dropping
+    the least recently used rows. Pass ``path=None`` for a memory-only cache.
+    """
+
+    def __init__(
+        self,
+        path=DEFAULT_CACHE_PATH,
+        max_memory_items=50_000,
+        max_disk_bytes=64 * 1024 * 1024,
+        namespace="",
+    ):
+        self.path = path or None
+        self.max_memory_items = max_memory_items
+        self.max_disk_bytes = max_disk_bytes
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._memory = OrderedDict()
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def key(self, headline):
+        text = f"{self.namespace}\0{headline}"
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, headlines):
+        """Return cached logits for each headline, None where there is no entry."""
+        keys = [self.key(headline) for headline in headlines]
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+
+            missing = [key for key in dict.fromkeys(keys) if key not in found]
+            if missing and self.path:
+                from_disk = self._disk_get(missing)
+                self.disk_hits += len(from_disk)
+                for key, logits in from_disk.items():
+                    self._memory_put(key, logits)
+                found.update(from_disk)
+
+            results = [found.get(key) for key in keys]
+            hits = sum(row is not None for row in results)
+            self.hits += hits
+            self.misses += len(results) - hits
+        return results
+
+    def put_many(self, headlines, logits):
+        """Store one logits row per headline in both tiers."""
+        rows = {
+            self.key(headline): np.asarray(row, dtype=np.float32)
+            for headline, row in zip(headlines, logits)
+        }
+        with self._lock:
+            for key, row in rows.items():
+                self._memory_put(key, row)
+            if self.path:
+                self._disk_put(rows)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_items": len(self._memory),
+                "disk_bytes": self._disk_bytes() if self.path else 0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self.path:
+                self._db().execute("DELETE FROM logits")
+                self._db().commit()
+            self.hits = self.misses = self.disk_hits = 0
+
+    def _memory_put(self, key, row):
+        self._memory[key] = row
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _db(self):
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            # Must be set before the first table is created to take effect
+            self._connection.execute("PRAGMA auto_vacuum = FULL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS logits "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS logits_accessed ON logits (accessed)"
+            )
+        return self._connection
+
+    def _disk_get(self, keys):
+        found = {}
+        try:
+            db = self._db()
+            for start in range(0, len(keys), _SQL_CHUNK):
+                chunk = keys[start : start + _SQL_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                for key, value in db.execute(
+                    f"SELECT key, value FROM logits WHERE key IN ({marks})", chunk
+                ):
+                    found[key] = np.frombuffer(value, dtype=np.float32)
+            if found:
+                now = time.time()
+                db.executemany(
+                    "UPDATE logits SET accessed = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                db.commit()
+        except sqlite3.Error as e:
+            logger.error("Error reading sentiment cache %s: %s", self.path, e)
+        return found
+
+    def _disk_put(self, rows):
+        try:
+            db = self._db()
+            now = time.time()
+            db.executemany(
+                "INSERT OR REPLACE INTO logits (key, value, accessed) VALUES (?, ?, ?)",
+                [(key, row.tobytes(), now) for key, row in rows.items()],
+            )
+            db.commit()
+            self._evict()
+        except sqlite3.Error as e:
+            logger.error("Error writing sentiment cache %s: %s", self.path, e)
+
+    def _disk_bytes(self):
+        db = self._db()
+        page_count = db.execute("PRAGMA page_count").fetchone()[0]
+        page_size = db.execute("PRAGMA page_size").fetchone()[0]
+        return page_count * page_size
+
+    def _evict(self):
+        db = self._db()
+        evicted = 0
+        size = self._disk_bytes()
+        # Freed rows leave half-empty b-tree pages behind, so trim until the
+        # file itself is back under budget rather than trusting one estimate
+        while size > self.max_disk_bytes:
+            count = db.execute("SELECT COUNT(*) FROM logits").fetchone()[0]
+            if not count:
+                break
+            drop = max(1, count - int(count * 0.9 * self.max_disk_bytes / size))
+            db.execute(
+                "DELETE FROM logits WHERE key IN "
+                "(SELECT key FROM logits ORDER BY accessed LIMIT ?)",
+                (drop,),
+            )
+            db.commit()
+            evicted += drop
+            size = self._disk_bytes()
+        if evicted:
+            logger.info("Evicted %d headlines from sentiment cache", evicted)
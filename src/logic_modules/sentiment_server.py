@@ -0,0 +1,238 @@
+# sentiment_server.py
+import ipaddress
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+from logic_modules import finbert_utils
+
+logger = logging.getLogger("tradebot")
+
+# Requests that arrive within ``batch_window`` seconds of the first one are
+# scored together, up to ``max_batch`` headlines. Clients wait ``timeout``
+# seconds for a reply before scoring in-process. The connection key guards
+# the socket, which unpickles what it receives: ``authkey`` when set, else the
+# random key the server writes to ``key_file`` (readable by its user only).
+config = {
+    "batch_window": 0.01,
+    "max_batch": 512,
+    "timeout": 30.0,
+    "authkey": os.getenv("FINBERT_SERVER_KEY", "").encode() or None,
+    "key_file": os.getenv(
+        "FINBERT_SERVER_KEY_FILE", os.path.join("cache", "sentiment_server.key")
+    ),
+}
+
+
+# Loopback TCP works everywhere, a Unix socket path works too except on Windows
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+
+
+def set_config(new_config):
+    global config
+    config.update(new_config)
+
+
+def _is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host.strip("[]")).is_loopback
+    except ValueError:
+        return False
+
+
+def parse_address(address):
+    """``host:port`` for TCP, anything else is a Unix socket path.
+
+    Only loopback hosts are accepted, the server is for this machine only.
+    """
+    host, _, port = address.rpartition(":")
+    if host and port.isdigit():
+        if not _is_loopback(host):
+            raise ValueError(f"Sentiment server address {address!r} is not loopback")
+        return host.strip("[]"), int(port)
+    return address
+
+
+def authkey(create=False):
+    """The connection key, generating ``key_file`` first if ``create`` is set."""
+    if config["authkey"]:
+        return config["authkey"]
+    path = config["key_file"]
+    if create and not os.path.exists(path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:  # another server was first
+            pass
+        else:
+            with os.fdopen(fd, "w") as file:
+                file.write(secrets.token_hex(32))
+    with open(path) as file:
+        return file.read().strip().encode()
+
+
+class SentimentServer:
+    """One FinBERT for every strategy, backtest worker and UI on the machine.
+
+    Clients send lists of headlines over a local socket and get one logits
+    row per headline back. Requests that arrive close together are scored in
+    a single forward pass, so concurrent callers share batches and the
+    headline cache as well as the model.
+    """
+
+    def __init__(self, address, batch_window=None, max_batch=None):
+        self.listener = Listener(parse_address(address), authkey=authkey(create=True))
+        self.address = self.listener.address
+        self.batch_window = (
+            config["batch_window"] if batch_window is None else batch_window
+        )
+        self.max_batch = max_batch or config["max_batch"]
+        self.requests = queue.Queue()
+        self.stats = {"requests": 0, "batches": 0, "headlines": 0}
+        self._threads = []
+
+    def start(self):
+        for target, name in (
+            (self._accept, "sentiment-accept"),
+            (self._batch, "sentiment-batch"),
+        ):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info("Sentiment server listening on %s", self.address)
+        return self
+
+    def serve_forever(self):
+        self.start()
+        try:
+            self._threads[-1].join()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        self.listener.close()
+        self.requests.put(None)
+
+    def _accept(self):
+        while True:
+            try:
+                connection = self.listener.accept()
+            except OSError:  # closed
+                return
+            except Exception as e:  # e.g. a client with the wrong key
+                logger.warning("Rejected sentiment client: %s", e)
+                continue
+            threading.Thread(
+                target=self._handle,
+                args=(connection,),
+                name="sentiment-client",
+                daemon=True,
+            ).start()
+
+    def _handle(self, connection):
+        with connection:
+            while True:
+                try:
+                    headlines = connection.recv()
+                except (EOFError, OSError):
+                    return
+                reply = Future()
+                self.requests.put((list(headlines), reply))
+                try:
+                    result = reply.result()
+                except Exception as e:
+                    # Not every exception pickles
+                    result = RuntimeError(f"Scoring failed: {e}")
+                try:
+                    connection.send(result)
+                except OSError:
+                    return
+
+    def _batch(self):
+        while True:
+            first = self.requests.get()
+            if first is None:
+                return
+            batch = [first]
+            count = len(first[0])
+            deadline = time.monotonic() + self.batch_window
+            while count < self.max_batch:
+                try:
+                    request = self.requests.get(
+                        timeout=max(0.0, deadline - time.monotonic())
+                    )
+                except queue.Empty:
+                    break
+                if request is None:
+                    self.requests.put(None)
+                    break
+                batch.append(request)
+                count += len(request[0])
+            self._score(batch)
+
+    def _score(self, batch):
+        headlines = [headline for request, _ in batch for headline in request]
+        try:
+            logits = (
+                finbert_utils.local_logits(headlines).numpy()
+                if headlines
+                else np.empty((0, len(finbert_utils.labels)), dtype=np.float32)
+            )
+        except Exception as e:
+            logger.error("Error scoring %d headlines: %s", len(headlines), e)
+            for _, reply in batch:
+                reply.set_exception(e)
+            return
+        start = 0
+        for request, reply in batch:
+            reply.set_result(logits[start : start + len(request)])
+            start += len(request)
+        self.stats["requests"] += len(batch)
+        self.stats["batches"] += 1
+        self.stats["headlines"] += len(headlines)
+        logger.debug("Scored %d requests in one batch", len(batch))
+
+
+class SentimentClient:
+    """Connection to a ``SentimentServer``, shared by the threads of a process."""
+
+    def __init__(self, address, timeout=None):
+        self.address = address
+        self.timeout = config["timeout"] if timeout is None else timeout
+        self._connection = Client(parse_address(address), authkey=authkey())
+        self._lock = threading.Lock()
+
+    def logits(self, headlines):
+        """One logits row per headline as an array, raises when the server fails."""
+        with self._lock:
+            self._connection.send(list(headlines))
+            if not self._connection.poll(self.timeout):
+                raise TimeoutError(f"no reply within {self.timeout}s")
+            reply = self._connection.recv()
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    def close(self):
+        # Not in the middle of another thread's request
+        with self._lock:
+            self._connection.close()
+
+
+def serve(address):
+    """Run a server on ``address`` until interrupted."""
+    # Never forward to a server from inside one
+    finbert_utils.set_config({"server": None})
+    finbert_utils.warmup()
+    SentimentServer(address).serve_forever()
@@ -0,0 +1,137 @@
+# trade_plan.py
+import numpy as np
+
+HOLD, BUY, SELL = 0, 1, -1
+ACTIONS = {"buy": BUY, "sell": SELL}
+ACTION_NAMES = {BUY: "buy", SELL: "sell"}
+# Stage that last set each entry
+SOURCES = ("none", "news", "momentum", "random", "ai", "manual")
+
+
+class TradePlan:
+    """The trades of one iteration as parallel arrays over a symbol universe.
+
+    ``action`` holds ``HOLD``, ``BUY`` or ``SELL`` per symbol, ``quantity`` the
+    shares (NaN: sized when the order is placed) and ``source`` the index in
+    ``SOURCES`` of the stage that set it. Stages update whole masks at once
+    and a copy only duplicates the three arrays.
+
+    For callers of the old dict plans, the active entries can also be read as
+    a mapping of ``symbol`` to "buy"/"sell", or ``(action, quantity)`` when a
+    quantity is set.
+    """
+
+    __slots__ = ("symbols", "symbol_index", "action", "quantity", "source")
+
+    def __init__(self, symbols):
+        self.symbols = list(symbols)
+        self.symbol_index = {s: i for i, s in enumerate(self.symbols)}
+        self.action = np.zeros(len(self.symbols), dtype=np.int8)
+        self.quantity = np.full(len(self.symbols), np.nan)
+        self.source = np.zeros(len(self.symbols), dtype=np.int8)
+
+    @classmethod
+    def from_dict(cls, entries, symbols=(), source="manual"):
+        """Plan from a ``{symbol: action or (action, quantity)}`` dict.
+
+        The universe is ``symbols`` plus any symbol of ``entries`` not in it.
+        """
+        symbols = list(symbols)
+        known = set(symbols)
+        plan = cls(symbols + [s for s in entries if s not in known])
+        for symbol, entry in entries.items():
+            action, quantity = entry if isinstance(entry, tuple) else (entry, None)
+            plan.set(symbol, action, quantity, source)
+        return plan
+
+    def index(self, symbols):
+        """Positions of ``symbols`` in the universe, KeyError for unknown ones."""
+        return np.fromiter(
+            (self.symbol_index[s] for s in symbols), dtype=np.intp, count=len(symbols)
+        )
+
+    def assign(self, where, action, source, quantity=np.nan):
+        """Set ``action`` (and ``quantity``) where the mask or index array points."""
+        self.action[where] = action
+        self.quantity[where] = quantity
+        self.source[where] = SOURCES.index(source)
+
+    def set(self, symbol, action, quantity=None, source="manual"):
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action {action!r}")
+        self.assign(
+            self.symbol_index[symbol],
+            ACTIONS[action],
+            source,
+            np.nan if quantity is None else quantity,
+        )
+
+    def drop(self, where):
+        """Clear the entries selected by a mask or index array."""
+        self.assign(where, HOLD, "none")
+
+    @property
+    def active(self):
+        return self.action != HOLD
+
+    def copy(self):
+        plan = TradePlan.__new__(TradePlan)
+        plan.symbols, plan.symbol_index = self.symbols, self.symbol_index
+        plan.action = self.action.copy()
+        plan.quantity = self.quantity.copy()
+        plan.source = self.source.copy()
+        return plan
+
+    def entries(self):
+        """``(symbol, action, quantity or None, source)`` of every active entry."""
+        for i in np.flatnonzero(self.active):
+            quantity = self.quantity[i]
+            yield (
+                self.symbols[i],
+                ACTION_NAMES[self.action[i]],
+                None if np.isnan(quantity) else _number(quantity),
+                SOURCES[self.source[i]],
+            )
+
+    def items(self):
+        for symbol, action, quantity, _ in self.entries():
+            yield symbol, action if quantity is None else (action, quantity)
+
+    def keys(self):
+        return [symbol for symbol, _ in self.items()]
+
+    def values(self):
+        return [entry for _, entry in self.items()]
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __getitem__(self, symbol):
+        i = self.symbol_index.get(symbol)
+        if i is None or self.action[i] == HOLD:
+            raise KeyError(symbol)
+        quantity = self.quantity[i]
+        action = ACTION_NAMES[self.action[i]]
+        return action if np.isnan(quantity) else (action, _number(quantity))
+
+    def __contains__(self, symbol):
+        i = self.symbol_index.get(symbol)
+        return i is not None and self.action[i] != HOLD
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return int(np.count_nonzero(self.action))
+
+    def __eq__(self, other):
+        if isinstance(other, (TradePlan, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self):
+        return f"TradePlan({self.to_dict()})"
+
+
+def _number(quantity):
+    return int(quantity) if float(quantity).is_integer() else float(quantity)
@@ -1,6 +1,9 @@
 import logging
 
 import gradio as gr
+import numpy as np
+
+from logic_modules.trade_plan import ACTION_NAMES
 
 logger = logging.getLogger("tradebot")
 
@@ -14,12 +17,25 @@ def set_config(new_config):
 
 
 def filter_transactions(portfolio, plan, spreads):
+    """Drop the active entries whose relative spread exceeds ``spread_limit``.
+
+    ``spreads`` maps symbols to spreads or is an array aligned with
+    ``plan.symbols``, like ``QuoteBook.spreads``. Unknown (NaN) spreads pass.
+    """
     try:
-        for symbol, action in plan.items():
-            spread = spreads.get(symbol, 0)
-            if spread > config["spread_limit"]:
-                logger.info(f"Spread too high for {symbol}. Rejecting {action} action.")
-                del plan[symbol]
+        if isinstance(spreads, dict):
+            spread = np.array(
+                [spreads.get(s, np.nan) for s in plan.symbols], dtype=float
+            )
+        else:
+            spread = np.asarray(spreads, dtype=float)
+        rejected = plan.active & (spread > config["spread_limit"])
+        for i in np.flatnonzero(rejected):
+            logger.info(
+                f"Spread too high for {plan.symbols[i]}. "
+                f"Rejecting {ACTION_NAMES[plan.action[i]]} action."
+            )
+        plan.drop(rejected)
 
     except Exception as e:
         logger.error(f"Error filtering transactions: {e}")
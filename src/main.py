@@ -1,7 +1,13 @@
+import argparse
 import concurrent.futures
+import functools
+import json
 import logging
 import os
+import queue
+import time
 from datetime import datetime, timedelta
+from types import SimpleNamespace
 
 import gradio as gr
 from alpaca_trade_api import REST, TimeFrame
@@ -14,18 +20,49 @@ from logger_setup import setup_logger
 from logic_modules.ai_revisor import revise_plan
 
 # Import utility functions and logic modules
-from logic_modules.asset_utils import get_sentiment, position_sizing
+from logic_modules.asset_utils import position_sizing, update_news
+from logic_modules.bar_store import BarStore
+from logic_modules.broker_snapshot import BrokerSnapshot
+from logic_modules.fast_backtest import run_fast_backtest
+from logic_modules.finbert_utils import warmup as warmup_finbert
+from logic_modules.intraday import (
+    TIMEFRAMES,
+    AlpacaBarStream,
+    BarAggregator,
+    BarWindow,
+    LatencyTracker,
+    ReplayBarStream,
+    bar_timeframe,
+    next_bars,
+)
+from logic_modules.local_data import LocalREST, load_dataset, local_data_backtesting
+from logic_modules.log_tail import LogTail
+from logic_modules.log_tail import config as log_tail_config
 from logic_modules.momentum_trading import create_ui as create_momentum_ui
 from logic_modules.momentum_trading import execute_momentum_trades
 from logic_modules.news_reaction import create_ui as create_news_ui
 from logic_modules.news_reaction import react_to_news
+from logic_modules.news_window import NewsWindow
+from logic_modules.order_execution import execute_plan
+from logic_modules.param_sweep import expand_grid, run_sweep
+from logic_modules.pipeline import Pipeline
+from logic_modules.quote_feed import (
+    AlpacaDataStream,
+    AlpacaQuoteFeed,
+    QuoteBook,
+    ReplayQuoteFeed,
+)
 from logic_modules.portfolio_utils import optimize_portfolio
 from logic_modules.price_utils import (
     fetch_historical_prices,
 )  # Import the new utility function
 from logic_modules.random_trading import create_ui as create_random_ui
 from logic_modules.random_trading import execute_random_trades
+from logic_modules.random_trading import seed as seed_random_trades
+from logic_modules.sentiment_server import DEFAULT_ADDRESS as DEFAULT_SENTIMENT_SERVER
+from logic_modules.sentiment_server import serve as serve_sentiment
 from logic_modules.transaction_filter import create_ui as create_spread_ui
+from logic_modules.trade_plan import TradePlan
 from logic_modules.transaction_filter import filter_transactions
 
 # Set up the logger
@@ -42,45 +79,65 @@ ALPACA_CREDS = {
     "BASE_URL": os.getenv("ALPACA_BASE_URL"),
 }
 
+# Where backtests log by default, and what the log view of the UI shows
+BACKTEST_LOG = os.path.join("logs", "my_log.log")
+_log_tail = None
+
+# Watchlist when the strategy gets no ``symbols`` parameter
+DEFAULT_SYMBOLS = [
+    "AAPL",
+    "MSFT",
+    "GOOG",
+    "AMZN",
+    "TSLA",
+    "JPM",
+    "BAC",
+    "HSBC",
+    "GS",
+    "V",
+    "PFE",
+    "JNJ",
+    "MRK",
+    "GSK",
+    "AZN",
+    "XOM",
+    "CVX",
+    "BP",
+    "SHEL",
+    "TTE",
+    "PG",
+    "KO",
+    "UL",
+    "BA",
+    "GE",
+]
+
 
 class PortfolioTrader(Strategy):
     def initialize(
-        self, symbols=None, cash_at_risk=0.5, timeframe="day", bars_length=150
+        self,
+        symbols=None,
+        cash_at_risk=0.5,
+        timeframe="day",
+        bars_length=150,
+        data_dir=None,
+        seed=0,
     ):
-        self.api = REST(
-            ALPACA_CREDS["API_KEY"],
-            ALPACA_CREDS["API_SECRET"],
-            base_url=ALPACA_CREDS["BASE_URL"],
-        )
+        if data_dir:
+            # Offline backtest: bars, news and quotes come from the local dataset
+            self.dataset = load_dataset(data_dir)
+            self.api = LocalREST(self.dataset, self.get_datetime)
+            seed_random_trades(seed)
+        else:
+            self.dataset = None
+            self.api = REST(
+                ALPACA_CREDS["API_KEY"],
+                ALPACA_CREDS["API_SECRET"],
+                base_url=ALPACA_CREDS["BASE_URL"],
+            )
 
         if symbols is None:
-            self.symbols = [
-                "AAPL",
-                "MSFT",
-                "GOOG",
-                "AMZN",
-                "TSLA",
-                "JPM",
-                "BAC",
-                "HSBC",
-                "GS",
-                "V",
-                "PFE",
-                "JNJ",
-                "MRK",
-                "GSK",
-                "AZN",
-                "XOM",
-                "CVX",
-                "BP",
-                "SHEL",
-                "TTE",
-                "PG",
-                "KO",
-                "UL",
-                "BA",
-                "GE",
-            ]
+            self.symbols = list(DEFAULT_SYMBOLS)
         else:
             self.symbols = symbols
 
@@ -88,60 +145,190 @@ class PortfolioTrader(Strategy):
         self.sleeptime = "24H"
         self.cash_at_risk = cash_at_risk
         self.timeframe = timeframe
+        self.bar_timeframe = bar_timeframe(timeframe)
         self.bars_length = bars_length
+        # The bar store holds the latest bars, a backtest must only see the past
+        self.bar_store = BarStore() if self.dataset is None else None
         self.last_trades = {symbol: None for symbol in self.symbols}
+        self.snapshot = None
+        # Scored headlines of the news lookback, only new articles are fetched
+        self.news = NewsWindow(self.symbols)
+        # Latest bid/ask of the watchlist, read by the spread filter
+        self.quotes = QuoteBook(self.symbols)
+        self.quote_replay = None
+        # Live, quotes and intraday bars share one market data websocket
+        self.data_stream = None
+        if self.dataset is not None:
+            self.quote_replay = ReplayQuoteFeed(self.quotes, self.dataset.quotes)
+        elif not self.is_backtesting:
+            self.data_stream = AlpacaDataStream(ALPACA_CREDS)
+            AlpacaQuoteFeed(self.quotes, self.data_stream)
+        self.intraday = timeframe in TIMEFRAMES
+        if self.intraday:
+            self._start_bar_stream()
+        if self.data_stream is not None:
+            self.data_stream.start()
+        self.pipeline = self._build_pipeline()
+
+    def _start_bar_stream(self):
+        # Iterations are triggered by completed bars: live, an iteration waits
+        # for the next bar from the stream; offline, the dataset's bars are
+        # replayed up to the backtest clock every bar period
+        minutes = TIMEFRAMES[self.timeframe]
+        self.bar_events = queue.Queue()
+        aggregator = BarAggregator(self.symbols, minutes, self.bar_events)
+        self.bar_window = None
+        self.latency = LatencyTracker()
+        if self.dataset is not None:
+            self.sleeptime = f"{minutes}M"
+            self.bar_replay = ReplayBarStream(aggregator, self.dataset.bars)
+        else:
+            self.sleeptime = "1S"
+            self.bar_replay = None
+            AlpacaBarStream(aggregator, self.data_stream)
+
+    def _next_bars(self):
+        """Completed bars since the last iteration that were new to the window."""
+        if self.bar_window is None:
+            # History once, every later bar comes from the stream
+            self.bar_window = BarWindow.from_prices(
+                fetch_historical_prices(
+                    self.api,
+                    self.symbols,
+                    self.bars_length,
+                    self.bar_store,
+                    self.bar_timeframe,
+                ),
+                self.symbols,
+                self.bars_length,
+            )
+            if self.bar_replay is not None:
+                self.bar_replay.seek(self.get_datetime())
+        if self.bar_replay is not None:
+            self.bar_replay.advance(self.get_datetime())
+            bars = next_bars(self.bar_events)
+        else:
+            bars = next_bars(self.bar_events, timeout=self.bar_timeframe.amount * 60)
+        # Bars the window already has (e.g. seeded by the history) are stale,
+        # no iteration runs on them
+        return [bar for bar in bars if self.bar_window.update(bar)]
 
     def position_sizing(self, symbol):
-        return position_sizing(self, symbol, self.cash_at_risk)
+        return position_sizing(self, symbol, self.cash_at_risk, self.snapshot)
+
+    def _build_pipeline(self):
+        pipeline = Pipeline()
+        pipeline.register("snapshot", self._take_snapshot)
+        pipeline.register("prices", self._fetch_prices)
+        pipeline.register("optimizer", self._optimize)
+        pipeline.register("news", self._fetch_news)
+        pipeline.register("sentiment", self._react_to_news)
+        pipeline.register("momentum", self._momentum)
+        pipeline.register("filter", self._filter)
+        pipeline.register("random", self._random_trades)
+        pipeline.register("revise", self._revise)
+        pipeline.register("orders", self._submit_orders)
+        return pipeline
 
     def on_trading_iteration(self):
-        try:
-            historical_prices = fetch_historical_prices(self.api, self.symbols)
-
-            if historical_prices.empty:
-                logger.error("No historical prices available.")
-                return
-
-            portfolio_weights = optimize_portfolio(historical_prices)
-            logger.info(f"Portfolio Weights: {portfolio_weights}")
-
-            plan = {}
-            news_data = {}  # Fetch or simulate news data
-            spreads = {}  # Fetch or simulate spread data
-
-            react_to_news(self, plan, news_data)
-            execute_momentum_trades(self, plan, historical_prices)
-            filter_transactions(self, plan, spreads)
-            execute_random_trades(self, plan)
-
-            # Revise the plan using AI
-            revised_plan = revise_plan(plan)
-            logger.info(f"Revised Plan: {revised_plan}")
-
-            for symbol, (action, quantity) in revised_plan.items():
-                if action == "buy":
-                    logger.info(
-                        f"Placing buy order for {symbol} - Quantity: {quantity}"
-                    )
-                    order = self.create_order(
-                        symbol, quantity, "buy", type="market", time_in_force="day"
-                    )
-                    self.submit_order(order)
-                    self.last_trades[symbol] = "buy"
+        if not self.intraday:
+            state = SimpleNamespace(plan=TradePlan(self.symbols))
+            self.pipeline.run(state, strategy_time=self.get_datetime())
+            return
+
+        bars = self._next_bars()
+        if not bars:
+            return
+        # Decide on the latest bar only, when several completed at once
+        state = SimpleNamespace(plan=TradePlan(self.symbols), bar=bars[-1])
+        self.pipeline.run(
+            state, strategy_time=self.get_datetime(), bar_time=state.bar.timestamp
+        )
 
-                elif action == "sell":
-                    self.sell_all(symbol)
+    def _take_snapshot(self, state):
+        # Cash, positions and prices for the whole iteration in three calls
+        self.snapshot = BrokerSnapshot.take(self, self.symbols)
 
-        except Exception as e:
-            logger.error(f"Error during trading iteration: {e}")
+    def _fetch_prices(self, state):
+        if self.intraday:
+            state.historical_prices = self.bar_window.prices()
+        else:
+            state.historical_prices = fetch_historical_prices(
+                self.api, self.symbols, self.bars_length, self.bar_store
+            )
+        if state.historical_prices.empty:
+            logger.error("No historical prices available.")
+            return False
+
+    def _optimize(self, state):
+        portfolio_weights = optimize_portfolio(state.historical_prices)
+        logger.info("Portfolio Weights: %s", portfolio_weights)
+
+    def _fetch_news(self, state):
+        update_news(self, self.news)
+        state.news_data = self.news.headlines()
+
+    def _react_to_news(self, state):
+        react_to_news(self, state.plan, state.news_data, self.news.sentiments())
+
+    def _momentum(self, state):
+        execute_momentum_trades(self, state.plan, state.historical_prices)
+
+    def _filter(self, state):
+        # Spreads straight from the in-memory quote book, no request
+        now = self.get_datetime()
+        if self.quote_replay is not None:
+            self.quote_replay.advance(now)
+        spreads = self.quotes.spreads(state.plan.symbols, now)
+        filter_transactions(self, state.plan, spreads)
+
+    def _random_trades(self, state):
+        execute_random_trades(self, state.plan)
+
+    def _revise(self, state):
+        # Revise the plan using AI, not in offline backtests where the
+        # remote model would make runs neither offline nor reproducible
+        plan = state.plan
+        state.plan = revise_plan(plan) if self.dataset is None else plan
+        logger.info("Revised Plan: %s", state.plan)
+
+    def _submit_orders(self, state):
+        report = execute_plan(self, state.plan, snapshot=self.snapshot)
+        if getattr(state, "bar", None) is not None:
+            # Offline, on the backtest clock that replayed the bar
+            now = (
+                time.time() if self.dataset is None else self.get_datetime().timestamp()
+            )
+            latency = self.latency.observe(state.bar.end.timestamp(), now)
+            logger.info(
+                "Orders for the %s bar submitted %.3fs after it closed (p95 %.3fs)",
+                state.bar.timestamp,
+                latency,
+                self.latency.summary()["p95"],
+            )
+        for symbol, (action, _) in report["submitted"].items():
+            if action == "buy":
+                self.last_trades[symbol] = "buy"
+
+    def _dump_benchmark_stats(self):
+        if self.dataset is None:
+            return super()._dump_benchmark_stats()
+        # Offline, take the benchmark from the local dataset instead of Yahoo
+        self._benchmark_returns_df = self.dataset.benchmark_returns(
+            self._benchmark_asset, self._backtesting_start, self._backtesting_end
+        )
 
     def sell_all(self, symbol):
         try:
-            position = self.get_position(symbol)
-            if position and position.quantity > 0:
+            if self.snapshot is not None:
+                quantity = self.snapshot.position(symbol)
+            else:
+                position = self.get_position(symbol)
+                quantity = position.quantity if position else 0
+            if quantity > 0:
                 order = self.create_order(
                     symbol,
-                    position.quantity,
+                    quantity,
                     "sell",
                     type="market",
                     time_in_force="day",
@@ -151,29 +338,90 @@ class PortfolioTrader(Strategy):
             logger.error(f"Error selling all for {symbol}: {e}")
 
 
-def backtest(start_date, end_date):
-    broker = Alpaca(ALPACA_CREDS)
-    strategy = PortfolioTrader(
-        name="PortfolioTrader",
-        broker=broker,
-        parameters={"symbols": None, "cash_at_risk": 0.5},
+def backtest(
+    start_date, end_date, parameters=None, log_file_path=None, data_dir=None, **options
+):
+    """Backtest PortfolioTrader and return lumibot's results.
+
+    With ``data_dir`` (or ``BACKTEST_DATA_DIR``, or a ``data_dir`` parameter)
+    the run is offline: lumibot and ``self.api`` are both served from the local
+    dataset in that directory, see ``local_data.LocalDataset.from_directory``.
+    Otherwise prices come from Yahoo and news from Alpaca.
+    """
+    # Load FinBERT in the background while the broker and strategy are set up
+    warmup_finbert()
+
+    parameters = {"symbols": None, "cash_at_risk": 0.5, **(parameters or {})}
+    data_dir = data_dir or parameters.get("data_dir") or os.getenv("BACKTEST_DATA_DIR")
+    if data_dir:
+        parameters["data_dir"] = data_dir
+        # lumibot fails mid-run on a symbol without bars, leave those out
+        bars = load_dataset(data_dir).bars
+        symbols = parameters["symbols"] or DEFAULT_SYMBOLS
+        missing = [symbol for symbol in symbols if symbol not in bars]
+        if len(missing) == len(symbols):
+            raise ValueError(f"No bars for any of {symbols} in {data_dir}")
+        if missing:
+            logger.warning("No bars for %s in %s, leaving them out", missing, data_dir)
+            parameters["symbols"] = [s for s in symbols if s in bars]
+        data_source = local_data_backtesting(data_dir)
+        # No Yahoo download of the risk free rate either
+        options = {"risk_free_rate": 0.0, **options}
+        strategy = PortfolioTrader
+    else:
+        data_source = YahooDataBacktesting
+        broker = Alpaca(ALPACA_CREDS)
+        strategy = PortfolioTrader(
+            name="PortfolioTrader",
+            broker=broker,
+            parameters=parameters,
+        )
+
+    # Define the log file path and ensure its directory exists
+    if log_file_path is None:
+        log_file_path = BACKTEST_LOG
+    os.makedirs(os.path.dirname(log_file_path), exist_ok=True)
+
+    results = strategy.backtest(
+        data_source,
+        start_date,
+        end_date,
+        logfile=log_file_path,
+        parameters=parameters,
+        **options,
     )
+    logger.info("Backtesting completed.")
+    return results
 
-    # Ensure the logs directory exists
-    log_dir = "logs"
-    os.makedirs(log_dir, exist_ok=True)
 
-    # Define the log file path
-    log_file_path = os.path.join(log_dir, "my_log.log")
+def fast_backtest(
+    start_date, end_date, parameters=None, log_file_path=None, data_dir=None
+):
+    """Backtest with the vectorized engine and return lumibot-style results.
 
-    strategy.backtest(
-        YahooDataBacktesting, start_date, end_date, logfile=log_file_path, parameters={}
+    Needs a local dataset like the offline lumibot run. The equity curve and
+    trade log are written next to ``log_file_path`` in lumibot's stats and
+    trades file formats.
+    """
+    parameters = dict(parameters or {})
+    data_dir = (
+        data_dir or parameters.pop("data_dir", None) or os.getenv("BACKTEST_DATA_DIR")
     )
-    logger.info("Backtesting completed.")
-    return "Backtesting completed."
+    if not data_dir:
+        raise ValueError("The fast engine needs a local dataset, set data_dir")
+
+    run = run_fast_backtest(load_dataset(data_dir), start_date, end_date, **parameters)
+    if log_file_path is not None:
+        base = os.path.splitext(log_file_path)[0]
+        os.makedirs(os.path.dirname(base) or ".", exist_ok=True)
+        run.equity.to_csv(f"{base}_stats.csv")
+        run.trades.to_csv(f"{base}_trades.csv", index=False)
+    logger.info("Fast backtesting completed.")
+    return run.results
 
 
-def run_backtesting(start_date, end_date):
+def run_backtesting(start_date, end_date, data_dir=None):
+    """Backtest in a worker process, yielding the log view while it runs."""
     logger.info("Starting backtesting...")
 
     # Convert input strings to datetime objects
@@ -181,13 +429,68 @@ def run_backtesting(start_date, end_date):
     end_date = datetime.strptime(end_date, "%Y-%m-%d")
 
     with concurrent.futures.ProcessPoolExecutor() as executor:
-        future = executor.submit(backtest, start_date, end_date)
-        return future.result()
+        future = executor.submit(
+            backtest, start_date, end_date, data_dir=data_dir or None
+        )
+        while True:
+            try:
+                future.result(timeout=log_tail_config["interval"])
+                break
+            except concurrent.futures.TimeoutError:
+                yield read_log_file()
+    yield read_log_file() + "\nBacktesting completed."
+
+
+def _sweep_backtest(
+    start_date, end_date, parameters, log_file_path, engine="lumibot", data_dir=None
+):
+    if engine == "fast":
+        return fast_backtest(start_date, end_date, parameters, log_file_path, data_dir)
+    # No plots or tearsheets opening in the browser for every run
+    return backtest(
+        start_date,
+        end_date,
+        parameters,
+        log_file_path,
+        data_dir=data_dir,
+        show_plot=False,
+        show_tearsheet=False,
+        save_tearsheet=False,
+    )
+
+
+def run_sweep_backtesting(
+    start_date, end_date, grid, max_workers=None, engine="lumibot", data_dir=None
+):
+    """Backtest every parameter set of ``grid`` in parallel, best runs first.
+
+    ``grid`` is JSON (or the parsed object): a ``{name: [values]}`` grid or a
+    list of parameter sets, see ``param_sweep.expand_grid``. ``engine`` is
+    "lumibot" or "fast", the vectorized engine for offline data. ``data_dir``
+    is the local dataset, as for ``backtest``.
+    """
+    if isinstance(grid, str):
+        grid = json.loads(grid)
+    param_sets = expand_grid(grid)
+
+    start_date = datetime.strptime(start_date, "%Y-%m-%d")
+    end_date = datetime.strptime(end_date, "%Y-%m-%d")
+    job = functools.partial(
+        _sweep_backtest,
+        start_date,
+        end_date,
+        engine=engine,
+        data_dir=data_dir or None,
+    )
+    return run_sweep(job, param_sets, max_workers=max_workers and int(max_workers))
 
 
 def read_log_file():
-    with open("my_log.log", "r") as file:
-        return file.read()
+    """The recent lines of the backtest log, only new bytes are read."""
+    global _log_tail
+    if _log_tail is None:
+        _log_tail = LogTail(BACKTEST_LOG)
+    return _log_tail.text()
 
 
 def create_ui():
@@ -208,21 +511,101 @@ def create_ui():
 
                 start_date = gr.Textbox(label="Start Date", value=default_start_date)
                 end_date = gr.Textbox(label="End Date", value=default_end_date)
+                data_dir = gr.Textbox(
+                    label="Local Data Directory (offline backtest, optional)",
+                    value=os.getenv("BACKTEST_DATA_DIR", ""),
+                )
                 start_button = gr.Button("Start Backtesting")
 
+                with gr.Accordion("Parameter Sweep", open=False):
+                    sweep_grid = gr.Code(
+                        value=json.dumps(
+                            {"cash_at_risk": [0.25, 0.5], "momentum_threshold": [0.02]}
+                        ),
+                        language="json",
+                        label="Parameter grid",
+                    )
+                    sweep_workers = gr.Number(
+                        value=os.cpu_count(), precision=0, label="Workers"
+                    )
+                    sweep_engine = gr.Radio(
+                        ["lumibot", "fast"], value="lumibot", label="Engine"
+                    )
+                    sweep_button = gr.Button("Start Sweep")
+
             with gr.Column():
                 log_view = gr.Textbox(label="Log Output", lines=20, interactive=False)
                 refresh_button = gr.Button("Refresh Log")
+                sweep_results = gr.Dataframe(label="Sweep Results")
 
         start_button.click(
-            run_backtesting, inputs=[start_date, end_date], outputs=log_view
+            run_backtesting, inputs=[start_date, end_date, data_dir], outputs=log_view
         )
 
         refresh_button.click(read_log_file, inputs=[], outputs=log_view)
 
+        sweep_button.click(
+            run_sweep_backtesting,
+            inputs=[
+                start_date,
+                end_date,
+                sweep_grid,
+                sweep_workers,
+                sweep_engine,
+                data_dir,
+            ],
+            outputs=sweep_results,
+        )
+
     return demo
 
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Portfolio trader backtesting")
+    commands = parser.add_subparsers(dest="command")
+    sweep = commands.add_parser("sweep", help="Backtest a parameter grid in parallel")
+    sweep.add_argument("--start", required=True, help="YYYY-MM-DD")
+    sweep.add_argument("--end", required=True, help="YYYY-MM-DD")
+    sweep.add_argument(
+        "--grid", required=True, help="JSON grid or path to a JSON file with one"
+    )
+    sweep.add_argument("--workers", type=int, default=None)
+    sweep.add_argument(
+        "--data-dir", help="Backtest offline on the local dataset in this directory"
+    )
+    sweep.add_argument(
+        "--engine",
+        choices=["lumibot", "fast"],
+        default="lumibot",
+        help="fast: vectorized engine, needs --data-dir",
+    )
+    sweep.add_argument("--output", help="Write the ranked summary to this CSV file")
+    server = commands.add_parser(
+        "sentiment-server", help="Serve FinBERT to other processes"
+    )
+    server.add_argument(
+        "--address",
+        default=os.getenv("FINBERT_SERVER") or DEFAULT_SENTIMENT_SERVER,
+        help="Unix socket path or host:port, point FINBERT_SERVER at it",
+    )
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    ui = create_ui()
-    ui.launch()
+    args = parse_args()
+    if args.command == "sweep":
+        grid = args.grid
+        if os.path.exists(grid):
+            with open(grid, "r") as file:
+                grid = file.read()
+        summary = run_sweep_backtesting(
+            args.start, args.end, grid, args.workers, args.engine, args.data_dir
+        )
+        print(summary.to_string(index=False))
+        if args.output:
+            summary.to_csv(args.output, index=False)
+    elif args.command == "sentiment-server":
+        serve_sentiment(args.address)
+    else:
+        ui = create_ui()
+        ui.launch()
@@ -0,0 +1,128 @@
+# tests/test_ai_revisor.py
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from logic_modules import ai_revisor
+from logic_modules.ai_revisor import plan_key, revise_plan
+from logic_modules.trade_plan import TradePlan
+
+
+class CompletionHandler(BaseHTTPRequestHandler):
+    """Answers Azure OpenAI completion requests like the real endpoint would."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.prompts.append(body["prompt"])
+        time.sleep(self.server.delay)
+        response = json.dumps(
+            {
+                "id": "cmpl-test",
+                "object": "text_completion",
+                "created": 0,
+                "model": body.get("model", "test"),
+                "choices": [
+                    {
+                        "text": self.server.reply,
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "logprobs": None,
+                    }
+                ],
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def endpoint(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CompletionHandler)
+    server.prompts, server.delay, server.reply = [], 0.0, "AAPL: buy 3\nMSFT: sell 5"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    monkeypatch.setenv(
+        "AZURE_OPENAI_ENDPOINT", f"http://127.0.0.1:{server.server_port}"
+    )
+    monkeypatch.setenv("AZURE_OPENAI_API_KEY", "test")
+    monkeypatch.setattr(ai_revisor, "deployment_name", "test-deployment")
+    monkeypatch.setattr(ai_revisor, "_cache", ai_revisor._cache.__class__())
+    for key, value in ai_revisor.config.items():
+        monkeypatch.setitem(ai_revisor.config, key, value)
+    ai_revisor.set_config({"timeout": 2.0})
+    yield server
+    server.shutdown()
+    ai_revisor.set_config({})
+
+
+def test_revision_is_memoized_by_plan_hash(endpoint):
+    plan = {"MSFT": ("sell", 5), "AAPL": "buy"}
+
+    assert revise_plan(plan) == {"AAPL": ("buy", 3), "MSFT": ("sell", 5)}
+    assert "AAPL: buy\n" in endpoint.prompts[0]
+    # Same plan in a different order: served from the cache
+    assert revise_plan({"AAPL": "buy", "MSFT": ("sell", 5)})["AAPL"] == ("buy", 3)
+    assert len(endpoint.prompts) == 1
+    assert plan_key(plan) != plan_key({"AAPL": "buy"})
+
+
+def test_empty_plans_are_not_sent(endpoint):
+    assert revise_plan({}) == {}
+    assert endpoint.prompts == []
+
+
+def test_slow_revision_falls_back_to_the_original_plan(endpoint):
+    endpoint.delay = 1.0
+    ai_revisor.set_config({"timeout": 0.2})
+    plan = {"AAPL": ("buy", 10)}
+
+    started = time.perf_counter()
+    assert revise_plan(plan) is plan
+    assert time.perf_counter() - started < 0.5
+
+
+def test_errors_fall_back_to_the_original_plan(endpoint):
+    endpoint.reply = "I cannot help with that."
+    plan = {"AAPL": ("buy", 10)}
+
+    assert revise_plan(plan) is plan
+    assert ai_revisor.revisor_stats()["cached"] == 0
+
+
+def test_only_valid_lines_of_the_reply_are_kept(endpoint):
+    endpoint.reply = (
+        "Revised plan:\nAAPL: buy 3\nMSFT: hold\nGOOG: buy\nTSLA: sell 0\nTSLA: sell"
+    )
+    plan = {"AAPL": ("buy", 10), "MSFT": "sell", "TSLA": "sell"}
+
+    assert revise_plan(plan) == {"AAPL": ("buy", 3), "TSLA": "sell"}
+
+
+def test_revision_that_is_no_valid_trade_plan_is_not_cached(endpoint, monkeypatch):
+    monkeypatch.setattr(ai_revisor, "_parse_plan", lambda text, plan: {"AAPL": "plan"})
+    plan = TradePlan.from_dict({"AAPL": "buy"}, ["AAPL", "MSFT"])
+
+    assert revise_plan(plan) is plan
+    assert revise_plan(plan) is plan
+    assert len(endpoint.prompts) == 2
+    assert ai_revisor.revisor_stats()["cached"] == 0
+
+
+def test_trade_plan_revisions_come_back_as_trade_plans(endpoint):
+    plan = TradePlan.from_dict({"AAPL": "buy", "MSFT": "sell"}, ["AAPL", "MSFT"])
+
+    revised = revise_plan(plan)
+    cached = revise_plan(plan)
+
+    assert isinstance(revised, TradePlan) and isinstance(cached, TradePlan)
+    assert revised == cached == {"AAPL": ("buy", 3), "MSFT": ("sell", 5)}
+    assert cached is not revised
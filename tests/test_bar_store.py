@@ -0,0 +1,119 @@
+# tests/test_bar_store.py
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from logic_modules import news_fetcher, price_utils
+from logic_modules.bar_store import BarStore
+from logic_modules.price_utils import fetch_historical_prices
+
+
+def bars_frame(symbols, days, start="2024-01-01"):
+    index = pd.date_range(start, periods=days, freq="D", tz="UTC")
+    frames = [
+        pd.DataFrame(
+            {
+                "open": np.arange(days) + 100.0 * n,
+                "high": np.arange(days) + 100.0 * n,
+                "low": np.arange(days) + 100.0 * n,
+                "close": np.arange(days) + 100.0 * n,
+                "volume": 1000.0,
+                "symbol": symbol,
+            },
+            index=index,
+        )
+        for n, symbol in enumerate(symbols)
+    ]
+    return pd.concat(frames).rename_axis("timestamp")
+
+
+def test_window_is_a_view_of_the_file(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.append_frame(bars_frame(["AAPL", "MSFT"], 10), "1Day")
+
+    window = store.window("MSFT", "1Day", 3)
+
+    assert isinstance(window.base, np.memmap)
+    np.testing.assert_array_equal(window["close"], [107.0, 108.0, 109.0])
+
+
+def test_append_skips_bars_already_stored(tmp_path):
+    store = BarStore(str(tmp_path))
+    assert store.append_frame(bars_frame(["AAPL"], 5), "1Day") == 5
+
+    assert store.append_frame(bars_frame(["AAPL"], 7), "1Day") == 2
+    assert len(store.bars("AAPL", "1Day")) == 7
+
+
+def test_bar_stored_before_its_close_is_replaced(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.append_frame(bars_frame(["AAPL"], 5), "1Day")
+    final = bars_frame(["AAPL"], 2, start="2024-01-05")
+    final["close"] = [50.0, 51.0]
+
+    assert store.append_frame(final, "1Day") == 1
+    np.testing.assert_array_equal(
+        store.window("AAPL", "1Day", 3)["close"], [3.0, 50.0, 51.0]
+    )
+
+
+def test_fetch_only_requests_new_bars(tmp_path):
+    store = BarStore(str(tmp_path))
+    api = MagicMock()
+    api.get_bars.return_value.df = bars_frame(["AAPL", "MSFT"], 30)
+    fetch_historical_prices(api, ["AAPL", "MSFT"], bars_length=20, store=store)
+
+    api.get_bars.return_value.df = bars_frame(["AAPL", "MSFT"], 2, start="2024-01-31")
+    prices = fetch_historical_prices(api, ["AAPL", "MSFT"], bars_length=20, store=store)
+
+    start = api.get_bars.call_args.kwargs["start"]
+    # From the last stored bar on, it may have been stored unfinished
+    assert pd.Timestamp(start) == pd.Timestamp("2024-01-30", tz="UTC")
+    assert prices.shape == (20, 2)
+    assert prices.dtypes.eq(np.float32).all()
+    assert prices["MSFT"].iloc[-1] == 101.0
+
+
+def test_a_stale_symbol_does_not_widen_the_others_requests(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.append_frame(bars_frame(["AAPL", "MSFT"], 30), "1Day")
+    store.append_frame(bars_frame(["HALT"], 5), "1Day")
+    api = MagicMock()
+    api.get_bars.return_value.df = bars_frame(["AAPL", "MSFT"], 2, start="2024-01-31")
+
+    fetch_historical_prices(api, ["AAPL", "HALT", "MSFT"], bars_length=20, store=store)
+
+    requests = {
+        tuple(call.args[0]): pd.Timestamp(call.kwargs["start"])
+        for call in api.get_bars.call_args_list
+    }
+    assert requests == {
+        ("AAPL", "MSFT"): pd.Timestamp("2024-01-30", tz="UTC"),
+        ("HALT",): pd.Timestamp("2024-01-05", tz="UTC"),
+    }
+
+
+def test_store_updates_are_chunked_and_rate_limited(tmp_path, monkeypatch):
+    monkeypatch.setitem(price_utils.config, "chunk_size", 2)
+    acquired = []
+    monkeypatch.setattr(
+        news_fetcher,
+        "_rate_limiter",
+        lambda: MagicMock(acquire=lambda: acquired.append(1)),
+    )
+    symbols = ["AAPL", "MSFT", "GOOG", "AMZN", "TSLA"]
+    api = MagicMock(offline=False)
+    api.get_bars.side_effect = lambda chunk, timeframe, start: MagicMock(
+        df=bars_frame(chunk, 30)
+    )
+
+    prices = fetch_historical_prices(
+        api, symbols, bars_length=20, store=BarStore(str(tmp_path))
+    )
+
+    chunks = sorted(call.args[0] for call in api.get_bars.call_args_list)
+    assert chunks == [["AAPL", "MSFT"], ["GOOG", "AMZN"], ["TSLA"]]
+    assert len(acquired) == 3
+    assert list(prices.columns) == symbols
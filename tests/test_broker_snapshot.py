@@ -0,0 +1,64 @@
+# tests/test_broker_snapshot.py
+from unittest.mock import MagicMock
+
+from logic_modules.asset_utils import position_sizing
+from logic_modules.broker_snapshot import BrokerSnapshot
+from logic_modules.order_execution import execute_plan
+
+
+def make_strategy(symbols):
+    strategy = MagicMock()
+    strategy.is_backtesting = False
+    strategy.symbols = symbols
+    strategy.get_cash.return_value = 10000.0
+    strategy.get_positions.return_value = [
+        MagicMock(asset=MagicMock(symbol="AAPL"), quantity=12),
+        MagicMock(asset=MagicMock(symbol="USD"), quantity=10000.0),
+    ]
+    strategy.get_last_prices.side_effect = lambda assets: {
+        symbol: 50.0 for symbol in assets
+    }
+    return strategy
+
+
+def test_snapshot_costs_three_calls_whatever_the_universe():
+    symbols = [f"SYM{i}" for i in range(500)] + ["AAPL"]
+    strategy = make_strategy(symbols)
+
+    snapshot = BrokerSnapshot.take(strategy, symbols)
+    sizes = [position_sizing(strategy, s, 0.5, snapshot)[2] for s in symbols]
+
+    assert sizes[0] == round(10000.0 * 0.5 / len(symbols) / 50.0)
+    assert strategy.get_cash.call_count == 1
+    assert strategy.get_positions.call_count == 1
+    assert strategy.get_last_prices.call_count == 1
+    strategy.get_last_price.assert_not_called()
+    assert snapshot.position("AAPL") == 12
+    assert snapshot.position("MSFT") == 0
+
+
+def test_symbols_without_a_snapshot_price_are_sized_from_the_broker():
+    strategy = make_strategy(["AAPL", "MSFT", "HALT"])
+    snapshot = BrokerSnapshot(10000.0, {}, {"AAPL": 50.0})
+    strategy.get_last_price.side_effect = {"MSFT": 25.0, "HALT": None}.get
+
+    assert position_sizing(strategy, "MSFT", 0.5, snapshot) == (10000.0, 25.0, 67)
+    assert position_sizing(strategy, "HALT", 0.5, snapshot)[2] == 0
+    strategy.position_sizing.side_effect = lambda symbol: position_sizing(
+        strategy, symbol, 0.5, snapshot
+    )
+    report = execute_plan(strategy, {"AAPL": "buy", "HALT": "buy"}, snapshot=snapshot)
+    assert list(report["submitted"]) == ["AAPL"]
+    assert report["failed"] == {}
+
+
+def test_sells_read_positions_from_the_snapshot():
+    strategy = make_strategy(["AAPL", "MSFT"])
+    snapshot = BrokerSnapshot.take(strategy, strategy.symbols)
+
+    report = execute_plan(
+        strategy, {"AAPL": "sell", "MSFT": ("sell", 3)}, snapshot=snapshot
+    )
+
+    assert report["submitted"] == {"AAPL": ("sell", 12)}
+    strategy.get_position.assert_not_called()
@@ -0,0 +1,188 @@
+# tests/test_fast_backtest.py
+import glob
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+
+from logic_modules import fast_backtest, finbert_utils, momentum_trading
+from logic_modules import random_trading
+from logic_modules.fast_backtest import momentum_signals, run_fast_backtest
+from logic_modules.local_data import LocalDataset
+from logic_modules.momentum_trading import momentum_scores
+
+
+def make_dataset(
+    symbols=("AAPL", "MSFT", "GOOG", "SPY"), days=260, seed=0, articles_per_day=0
+):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2023-01-02", periods=days, tz="America/New_York")
+    bars = {}
+    for symbol in symbols:
+        close = 100 * np.exp(np.cumsum(rng.normal(5e-4, 0.02, days)))
+        bars[symbol] = pd.DataFrame(
+            {
+                "open": close * (1 + rng.normal(0, 0.002, days)),
+                "high": close * 1.01,
+                "low": close * 0.99,
+                "close": close,
+                "volume": 1e6,
+            },
+            index=index.tz_convert("UTC"),
+        )
+    news = []
+    for symbol in symbols:
+        for day in index.tz_convert("UTC").normalize():
+            tone = rng.choice(["rose", "fell", "held steady"])
+            minutes = np.sort(rng.integers(0, 24 * 60, articles_per_day))
+            news.extend(
+                (symbol, day + pd.Timedelta(minutes=int(minute)), f"{symbol} {tone}")
+                for minute in minutes
+            )
+    return LocalDataset(
+        bars, pd.DataFrame(news, columns=["symbol", "created_at", "headline"])
+    )
+
+
+def word_logits(headlines, max_batch_size=None):
+    """Logits that read the tone off the headline instead of running FinBERT."""
+    tones = [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]
+    return torch.tensor(
+        [
+            (
+                tones[0]
+                if "rose" in headline
+                else tones[1] if "fell" in headline else tones[2]
+            )
+            for headline in headlines
+        ]
+    )
+
+
+@pytest.fixture
+def configs(monkeypatch):
+    monkeypatch.setitem(momentum_trading.config, "momentum_threshold", 0.05)
+    monkeypatch.setitem(momentum_trading.config, "lookbacks", [1, 5, 20])
+    monkeypatch.setitem(random_trading.config, "buy_probability", 0.5)
+    monkeypatch.setitem(random_trading.config, "sell_probability", 0.5)
+    for key, value in fast_backtest.config.items():
+        monkeypatch.setitem(fast_backtest.config, key, value)
+
+
+def test_momentum_signals_only_see_the_past(configs):
+    closes = make_dataset(days=80).bars
+    closes = np.column_stack([frame["close"] for frame in closes.values()])
+
+    signals = momentum_signals(closes, 10, bars_length=30)
+
+    threshold = momentum_trading.config["momentum_threshold"]
+    for row, day in enumerate(range(10, len(closes))):
+        scores = momentum_scores(closes[max(0, day - 30) : day], [1, 5, 20])
+        expected = np.where(scores > threshold, 1, np.where(scores < -threshold, -1, 0))
+        assert (signals[row] == expected).all()
+
+
+def test_fills_pay_slippage_and_commission(configs, monkeypatch):
+    dataset = make_dataset(symbols=("AAPL",), days=40)
+    monkeypatch.setitem(momentum_trading.config, "lookbacks", [])
+    monkeypatch.setitem(random_trading.config, "buy_probability", 0.0)
+    monkeypatch.setitem(random_trading.config, "sell_probability", 0.0)
+    fast_backtest.set_config(
+        {"slippage_bps": 10.0, "commission_per_share": 0.01, "commission_rate": 0.001}
+    )
+    days = 5
+    labels = np.array(
+        [["positive"], ["neutral"], ["negative"], ["neutral"], ["neutral"]]
+    )
+    probability = np.full((days, 1), 0.99)
+
+    run = run_fast_backtest(
+        dataset,
+        datetime(2023, 2, 1),
+        datetime(2023, 2, 8),
+        cash_at_risk=0.5,
+        sentiment=(probability, labels),
+    )
+
+    opens = dataset.bars["AAPL"]["open"].loc["2023-02-01":"2023-02-07"].to_numpy()
+    buy, sell = run.trades.iloc[0], run.trades.iloc[1]
+    assert list(run.trades["side"]) == ["buy", "sell"]
+    assert buy["filled_quantity"] == round(100000 * 0.5 / opens[0])
+    assert buy["price"] == pytest.approx(opens[0] * 1.001)
+    assert sell["price"] == pytest.approx(opens[2] * 0.999)
+    quantity = buy["filled_quantity"]
+    assert buy["trade_cost"] == pytest.approx(
+        quantity * 0.01 + quantity * buy["price"] * 0.001
+    )
+    cash = (
+        100000
+        - quantity * (buy["price"] - sell["price"])
+        - buy["trade_cost"]
+        - sell["trade_cost"]
+    )
+    assert run.equity["cash"].iloc[-1] == pytest.approx(cash)
+    assert list(run.trades.columns) == fast_backtest.TRADE_COLUMNS
+
+
+def test_matches_the_lumibot_backtest(configs, tmp_path, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "warmup_finbert", lambda: None)
+    monkeypatch.setattr(finbert_utils, "headline_logits", word_logits)
+    monkeypatch.chdir(tmp_path)
+    # More articles per news window than one request returns.
+    make_dataset(articles_per_day=6).save(str(tmp_path / "data"))
+    parameters = {"symbols": ["AAPL", "MSFT", "GOOG"], "bars_length": 30, "seed": 3}
+    start, end = datetime(2023, 10, 2), datetime(2023, 11, 1)
+
+    main.backtest(
+        start,
+        end,
+        dict(parameters),
+        str(tmp_path / "logs" / "run.log"),
+        data_dir=str(tmp_path / "data"),
+        show_plot=False,
+        show_tearsheet=False,
+        save_tearsheet=False,
+    )
+    run = run_fast_backtest(
+        LocalDataset.from_directory(str(tmp_path / "data")), start, end, **parameters
+    )
+
+    trades = pd.read_csv(glob.glob(str(tmp_path / "logs" / "*_trades.csv"))[0])
+    trades = trades[trades["status"] == "fill"]
+    key = ["time", "symbol", "side"]
+    expected = trades.sort_values(key)[key + ["price", "filled_quantity"]]
+    actual = run.trades.assign(time=run.trades["time"].astype(str)).sort_values(key)
+    assert len(actual) > 5
+    assert actual[key].values.tolist() == expected[key].values.tolist()
+    np.testing.assert_allclose(actual["price"], expected["price"])
+    np.testing.assert_allclose(actual["filled_quantity"], expected["filled_quantity"])
+
+    stats = pd.read_csv(glob.glob(str(tmp_path / "logs" / "*_stats.csv"))[0])
+    stats = stats[stats["datetime"].str.endswith(("09:30:00-04:00", "09:30:00-05:00"))]
+    stats = stats.drop_duplicates("datetime").set_index("datetime")["portfolio_value"]
+    equity = run.equity["portfolio_value"]
+    np.testing.assert_allclose(stats.loc[equity.index.astype(str)], equity)
+
+
+def test_fast_sweep_runs_on_the_given_data_dir(configs, tmp_path, monkeypatch):
+    import main
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("BACKTEST_DATA_DIR", raising=False)
+    make_dataset().save(str(tmp_path / "data"))
+
+    summary = main.run_sweep_backtesting(
+        "2023-10-02",
+        "2023-11-01",
+        {"cash_at_risk": [0.25, 0.5], "symbols": ["AAPL, MSFT"]},
+        max_workers=1,
+        engine="fast",
+        data_dir=str(tmp_path / "data"),
+    )
+
+    assert len(summary) == 2
+    assert summary["error"].isna().all()
@@ -0,0 +1,147 @@
+# tests/test_finbert_utils.py
+import os
+import subprocess
+import sys
+
+import pytest
+
+from logic_modules import finbert_backends, finbert_utils
+from logic_modules.finbert_utils import ModelHandle
+from logic_modules.sentiment_cache import SentimentCache
+
+POSITIVE = ["rose", "up", "profit", "rallied", "gains"]
+NEGATIVE = ["fell", "down", "loss", "plunged", "misses"]
+NEUTRAL = ["news", "report", "market", "shares", "today"]
+
+HEADLINES = {
+    "AAPL": ["shares rose on profit news", "market up"],
+    "GOOG": [],
+    "TSLA": ["shares fell", "loss report", "market down today"],
+}
+
+# Every neutral/keyword/neutral triple, labelled by its keyword
+CORPUS = [
+    (f"{first} {keyword} {last}", label)
+    for label, keywords in enumerate((POSITIVE, NEGATIVE, NEUTRAL))
+    for keyword in keywords
+    for first in NEUTRAL
+    for last in NEUTRAL[:2]
+]
+
+
+@pytest.fixture(scope="module")
+def tiny_model_dir(tmp_path_factory):
+    """A three-label BERT small enough to build and fit offline in a second."""
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    tokenizers = pytest.importorskip("tokenizers")
+
+    specials = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+    vocab = {w: i for i, w in enumerate(specials + POSITIVE + NEGATIVE + NEUTRAL)}
+    backend = tokenizers.Tokenizer(
+        tokenizers.models.WordLevel(vocab, unk_token="[UNK]")
+    )
+    backend.normalizer = tokenizers.normalizers.Lowercase()
+    backend.pre_tokenizer = tokenizers.pre_tokenizers.Whitespace()
+    backend.post_processor = tokenizers.processors.TemplateProcessing(
+        single="[CLS] $A [SEP]", special_tokens=[("[CLS]", 2), ("[SEP]", 3)]
+    )
+    tokenizer = transformers.PreTrainedTokenizerFast(
+        tokenizer_object=backend,
+        unk_token="[UNK]",
+        pad_token="[PAD]",
+        cls_token="[CLS]",
+        sep_token="[SEP]",
+        mask_token="[MASK]",
+    )
+
+    torch.manual_seed(0)
+    config = transformers.BertConfig(
+        vocab_size=len(vocab),
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        num_labels=3,
+    )
+    model = transformers.BertForSequenceClassification(config)
+    tokens = tokenizer([h for h, _ in CORPUS], return_tensors="pt", padding=True)
+    targets = torch.tensor([label for _, label in CORPUS])
+    optimizer = torch.optim.Adam(model.parameters(), lr=3e-3)
+    for _ in range(60):
+        model(**tokens, labels=targets).loss.backward()
+        optimizer.step()
+        optimizer.zero_grad()
+
+    path = tmp_path_factory.mktemp("tiny_finbert")
+    model.save_pretrained(path)
+    tokenizer.save_pretrained(path)
+    return str(path)
+
+
+@pytest.fixture
+def tiny_finbert(monkeypatch, tiny_model_dir):
+    monkeypatch.setattr(finbert_utils, "model_handle", ModelHandle(tiny_model_dir))
+    monkeypatch.setattr(finbert_utils, "sentiment_cache", SentimentCache(path=None))
+    return finbert_utils
+
+
+def test_import_does_not_load_model():
+    src = os.path.join(os.path.dirname(__file__), "..", "src")
+    code = (
+        "import sys, logic_modules.finbert_utils as f;"
+        "print(f.model_handle.loaded, 'torch' in sys.modules, 'transformers' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": src},
+        check=True,
+    )
+    assert result.stdout.split() == ["False", "False", "False"]
+
+
+def test_batch_matches_per_symbol(tiny_finbert):
+    batch = tiny_finbert.estimate_sentiment_batch(HEADLINES, max_batch_size=2)
+
+    assert batch["GOOG"] == (0.0, "neutral")
+    for symbol in ("AAPL", "TSLA"):
+        probability, sentiment = tiny_finbert.estimate_sentiment(HEADLINES[symbol])
+        assert batch[symbol][1] == sentiment
+        assert batch[symbol][0] == pytest.approx(probability.item(), abs=1e-5)
+
+
+def test_cached_headlines_skip_the_model(tiny_finbert):
+    first = tiny_finbert.estimate_sentiment_batch(HEADLINES)
+    misses = tiny_finbert.cache_stats()["misses"]
+
+    second = tiny_finbert.estimate_sentiment_batch(HEADLINES)
+
+    assert second == first
+    assert tiny_finbert.cache_stats()["misses"] == misses
+
+
+def test_warmup_loads_in_background(tiny_model_dir):
+    handle = ModelHandle(tiny_model_dir)
+
+    handle.warmup().join(timeout=60)
+
+    assert handle.loaded
+
+
+@pytest.mark.parametrize("backend", ["int8", "onnx"])
+def test_backend_agrees_with_fp32(monkeypatch, tmp_path, tiny_model_dir, backend):
+    if backend == "onnx":
+        pytest.importorskip("onnxruntime")
+        pytest.importorskip("onnx")
+    monkeypatch.setattr(finbert_backends, "ONNX_DIR", str(tmp_path))
+    tokenizer, reference = ModelHandle(tiny_model_dir, "torch").load()
+    _, candidate = ModelHandle(tiny_model_dir, backend).load()
+    tokens = tokenizer([h for h, _ in CORPUS], return_tensors="pt", padding=True)
+
+    expected = reference.logits(tokens).argmax(-1)
+    actual = candidate.logits(tokens).argmax(-1)
+
+    assert len(set(expected.tolist())) == 3  # the fixture model is not degenerate
+    assert (actual == expected).float().mean().item() >= 0.95
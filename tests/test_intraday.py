@@ -0,0 +1,137 @@
+# tests/test_intraday.py
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from logic_modules.intraday import (
+    AlpacaBarStream,
+    BarAggregator,
+    BarWindow,
+    LatencyTracker,
+    ReplayBarStream,
+    next_bars,
+)
+from logic_modules.quote_feed import AlpacaQuoteFeed, QuoteBook
+
+
+def minute_bars(symbols=("AAPL", "MSFT"), minutes=12, missing=()):
+    index = pd.date_range("2024-01-02 14:30", periods=minutes, freq="min", tz="UTC")
+    bars = {}
+    for n, symbol in enumerate(symbols):
+        close = 100.0 * (n + 1) + np.arange(minutes)
+        frame = pd.DataFrame(
+            {
+                "open": close - 0.5,
+                "high": close + 1,
+                "low": close - 1,
+                "close": close,
+                "volume": 10.0,
+            },
+            index=index,
+        )
+        bars[symbol] = frame.drop(index[list(missing)] if n else [])
+    return bars
+
+
+def test_replayed_minutes_aggregate_into_five_minute_bars():
+    # MSFT has no bar in the last minute of the first 5 minute bar
+    bars = minute_bars(missing=[4])
+    aggregator = BarAggregator(["AAPL", "MSFT"], minutes=5)
+    stream = ReplayBarStream(aggregator, bars)
+
+    stream.advance(pd.Timestamp("2024-01-02 14:34:59Z"))
+    assert next_bars(aggregator.events) == []
+    # The first minute of the next bar completes it
+    stream.advance(pd.Timestamp("2024-01-02 14:36Z"))
+    [bar] = next_bars(aggregator.events)
+    assert bar.timestamp == pd.Timestamp("2024-01-02 14:30Z")
+    assert list(bar.close) == [104.0, 203.0]
+    assert list(bar.open) == [99.5, 199.5]
+    assert list(bar.volume) == [50.0, 40.0]
+
+    # Both symbols complete the second bar on its last minute
+    stream.advance(pd.Timestamp("2024-01-02 14:40Z"))
+    [bar] = next_bars(aggregator.events)
+    assert bar.timestamp == pd.Timestamp("2024-01-02 14:35Z")
+    assert list(bar.high) == [110.0, 210.0]
+    assert stream.advance(pd.Timestamp("2024-01-02 14:40Z")) == 0
+
+
+def test_window_updates_incrementally():
+    history = pd.DataFrame(
+        {"AAPL": [1.0, 2.0, 3.0], "MSFT": [10.0, 20.0, 30.0]},
+        index=pd.date_range("2024-01-02 14:30", periods=3, freq="5min", tz="UTC"),
+    )
+    window = BarWindow.from_prices(history, ["AAPL", "MSFT"], length=3)
+    aggregator = BarAggregator(["AAPL", "MSFT"], minutes=5)
+
+    aggregator.add("AAPL", "2024-01-02 14:45Z", 4, 4, 4, 4.0, 1)
+    aggregator.flush()
+    aggregator.add("AAPL", "2024-01-02 14:35Z", 9, 9, 9, 9.0, 1)  # already seen
+    aggregator.flush()
+    for bar in next_bars(aggregator.events):
+        window.update(bar)
+
+    prices = window.prices()
+    assert prices.index[0] == pd.Timestamp("2024-01-02 14:35Z")
+    assert prices["AAPL"].tolist() == [2.0, 3.0, 4.0]
+    # No MSFT bar: its last close carries over
+    assert prices["MSFT"].tolist() == [20.0, 30.0, 30.0]
+
+
+def test_bars_wake_the_waiting_iteration():
+    aggregator = BarAggregator(["AAPL"], minutes=1)
+    latency = LatencyTracker()
+
+    def stream():
+        time.sleep(0.1)
+        aggregator.add("AAPL", "2024-01-02 14:30Z", 1, 1, 1, 1.0, 1)
+
+    threading.Thread(target=stream).start()
+    started = time.perf_counter()
+    [bar] = next_bars(aggregator.events, timeout=5)
+
+    assert time.perf_counter() - started < 1
+    assert bar.end == pd.Timestamp("2024-01-02 14:31Z")
+    assert 0 <= latency.observe(bar.received) < 1
+    assert latency.summary()["count"] == 1
+
+
+def test_minutes_of_a_completed_bar_start_no_stale_bar():
+    aggregator = BarAggregator(["AAPL", "MSFT"], minutes=5)
+    aggregator.add("AAPL", "2024-01-02 14:34Z", 1, 1, 1, 1.0, 1)
+    aggregator.add("MSFT", "2024-01-02 14:34Z", 2, 2, 2, 2.0, 1)
+    [bar] = next_bars(aggregator.events)
+    assert bar.end == pd.Timestamp("2024-01-02 14:35Z")
+
+    aggregator.add("MSFT", "2024-01-02 14:33Z", 3, 3, 3, 3.0, 1)  # late
+    aggregator.flush()
+    assert next_bars(aggregator.events) == []
+    aggregator.add("MSFT", "2024-01-02 14:35Z", 4, 4, 4, 4.0, 1)
+    aggregator.flush()
+    [bar] = next_bars(aggregator.events)
+    assert bar.timestamp == pd.Timestamp("2024-01-02 14:35Z")
+
+
+class FakeStream:
+    def __init__(self):
+        self.subscriptions = []
+
+    def subscribe_bars(self, handler, *symbols):
+        self.subscriptions.append(("bars", symbols))
+
+    def subscribe_quotes(self, handler, *symbols):
+        self.subscriptions.append(("quotes", symbols))
+
+
+def test_bars_and_quotes_subscribe_on_one_stream():
+    stream = FakeStream()
+    AlpacaQuoteFeed(QuoteBook(["AAPL", "MSFT"]), stream)
+    AlpacaBarStream(BarAggregator(["AAPL", "MSFT"]), stream)
+
+    assert stream.subscriptions == [
+        ("quotes", ("AAPL", "MSFT")),
+        ("bars", ("AAPL", "MSFT")),
+    ]
@@ -0,0 +1,146 @@
+# tests/test_local_data.py
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+from alpaca_trade_api import TimeFrame
+from lumibot.entities import Asset
+
+from logic_modules.bar_store import BarStore
+from logic_modules.local_data import LocalDataset, LocalREST, local_data_backtesting
+from logic_modules.news_fetcher import fetch_headlines
+from logic_modules.price_utils import fetch_historical_prices
+
+
+@pytest.fixture
+def dataset():
+    index = pd.date_range("2024-01-01 05:00", periods=10, freq="D", tz="UTC")
+    bars = {
+        symbol: pd.DataFrame(
+            {
+                "open": np.arange(10) + 100.0 * n,
+                "high": np.arange(10) + 100.0 * n,
+                "low": np.arange(10) + 100.0 * n,
+                "close": np.arange(10) + 100.0 * n,
+                "volume": 1000.0,
+            },
+            index=index,
+        )
+        for n, symbol in enumerate(["AAPL", "MSFT"])
+    }
+    news = pd.DataFrame(
+        {
+            "symbol": ["AAPL", "AAPL", "MSFT", "AAPL"],
+            "created_at": [
+                "2024-01-03T14:00:00Z",
+                "2024-01-05T14:00:00Z",
+                "2024-01-05T15:00:00Z",
+                "2024-01-08T14:00:00Z",
+            ],
+            "headline": ["old news", "profits surge", "shares plunge", "future news"],
+        }
+    )
+    quotes = pd.DataFrame(
+        {
+            "symbol": ["AAPL", "AAPL", "AAPL"],
+            "timestamp": [
+                "2024-01-05T14:00:00Z",
+                "2024-01-06T14:00:00Z",
+                "2024-01-08T14:00:00Z",
+            ],
+            "bid_price": [104.0, 105.0, 107.0],
+            "ask_price": [104.1, 105.2, 107.1],
+        }
+    )
+    return LocalDataset(bars, news, quotes)
+
+
+def test_csv_and_parquet_round_trip(tmp_path, dataset):
+    for file_format in ("csv", "parquet"):
+        dataset.save(str(tmp_path / file_format), file_format)
+        loaded = LocalDataset.from_directory(str(tmp_path / file_format))
+
+        assert loaded.symbols == ["AAPL", "MSFT"]
+        pd.testing.assert_frame_equal(
+            loaded.bars["MSFT"], dataset.bars["MSFT"], check_freq=False
+        )
+        assert list(loaded.news["headline"]) == list(dataset.news["headline"])
+
+
+def test_local_rest_never_serves_the_future(dataset):
+    now = datetime(2024, 1, 7, 14, 30, tzinfo=timezone.utc)
+    api = LocalREST(dataset, lambda: now)
+
+    bars = api.get_bars(["AAPL", "MSFT"], TimeFrame.Day, limit=3).df
+    # The 2024-01-07 bar has not closed yet
+    assert bars.index.max() == pd.Timestamp("2024-01-06 05:00", tz="UTC")
+    assert (bars.groupby("symbol").size() == 3).all()
+
+    headlines = fetch_headlines(api, ["AAPL", "MSFT"], "2024-01-04", "2024-01-07")
+    assert headlines == {"AAPL": ["profits surge"], "MSFT": ["shares plunge"]}
+
+    assert api.get_latest_quote("AAPL").bid_price == 105.0
+    assert api.get_latest_quotes(["AAPL", "MSFT"]).keys() == {"AAPL"}
+
+
+def test_historical_prices_are_deterministic_offline(dataset):
+    now = datetime(2024, 1, 9, 14, 30, tzinfo=timezone.utc)
+    api = LocalREST(dataset, lambda: now)
+
+    first = fetch_historical_prices(api, ["AAPL", "MSFT"], bars_length=5)
+    second = fetch_historical_prices(api, ["AAPL", "MSFT"], bars_length=5)
+
+    pd.testing.assert_frame_equal(first, second)
+    assert first["MSFT"].tolist() == [103.0, 104.0, 105.0, 106.0, 107.0]
+
+
+def test_dataset_from_bar_store(tmp_path, dataset):
+    store = BarStore(str(tmp_path))
+    frame = pd.concat(bars.assign(symbol=s) for s, bars in dataset.bars.items())
+    store.append_frame(frame, "1Day")
+
+    snapshot = LocalDataset.from_bar_store(store, ["AAPL", "MSFT", "TSLA"], "1Day")
+
+    assert snapshot.symbols == ["AAPL", "MSFT"]
+    pd.testing.assert_frame_equal(
+        snapshot.bars["AAPL"], dataset.bars["AAPL"], check_freq=False
+    )
+
+
+def test_lumibot_source_keeps_intraday_bar_times(tmp_path, dataset):
+    index = pd.date_range("2024-01-02 14:30", periods=3, freq="min", tz="UTC")
+    minutes = pd.DataFrame(
+        {name: [1.0, 2.0, 3.0] for name in ("open", "high", "low", "close")},
+        index=index,
+    ).assign(volume=10.0)
+    LocalDataset({"AAPL": minutes}).save(str(tmp_path / "minutes"))
+    dataset.save(str(tmp_path / "days"))
+
+    minute_source = local_data_backtesting(str(tmp_path / "minutes"))(
+        datetime(2024, 1, 2), datetime(2024, 1, 3)
+    )
+    day_source = local_data_backtesting(str(tmp_path / "days"))(
+        datetime(2024, 1, 2), datetime(2024, 1, 9)
+    )
+
+    stored = minute_source._data_store[Asset("AAPL")]
+    assert list(stored.index) == list(index.tz_convert("America/New_York"))
+    daily = day_source._data_store[Asset("AAPL")].index
+    assert (daily == daily.normalize()).all()
+
+
+def test_backtest_rejects_a_dataset_without_the_watchlist(
+    tmp_path, dataset, monkeypatch
+):
+    import main
+
+    monkeypatch.setattr(main, "warmup_finbert", lambda: None)
+    dataset.save(str(tmp_path / "data"))
+    with pytest.raises(ValueError, match="No bars"):
+        main.backtest(
+            datetime(2024, 1, 2),
+            datetime(2024, 1, 9),
+            {"symbols": ["NVDA"]},
+            data_dir=str(tmp_path / "data"),
+        )
@@ -0,0 +1,48 @@
+# tests/test_log_tail.py
+import os
+
+from logic_modules.log_tail import LogTail
+
+
+def append(path, text):
+    with open(path, "a") as file:
+        file.write(text)
+
+
+def test_only_appended_lines_are_read(tmp_path):
+    path = tmp_path / "my_log.log"
+    tail = LogTail(str(path), max_lines=3)
+    assert tail.read() == []
+
+    append(path, "one\ntwo\nthr")
+    assert tail.read() == ["one", "two"]
+    append(path, "ee\nfour\n")
+    assert tail.read() == ["three", "four"]
+    assert tail.read() == []
+    assert tail.text() == "two\nthree\nfour"
+    assert tail.offset == os.path.getsize(path)
+
+
+def test_large_files_start_near_the_end(tmp_path):
+    path = tmp_path / "my_log.log"
+    append(path, "".join(f"line {i:05d}\n" for i in range(10000)))
+
+    tail = LogTail(str(path), initial_bytes=100)
+
+    lines = tail.read()
+    assert lines[-1] == "line 09999"
+    assert len(lines) == 9 and all(line.startswith("line ") for line in lines)
+
+
+def test_rotated_files_are_read_from_the_start(tmp_path):
+    path = tmp_path / "my_log.log"
+    append(path, "old line\n" * 10)
+    tail = LogTail(str(path))
+    tail.read()
+
+    os.replace(path, tmp_path / "my_log.log.1")
+    append(path, "new\n")
+    assert tail.read() == ["new"]
+    path.write_text("")
+    append(path, "x\n")
+    assert tail.read() == ["x"]
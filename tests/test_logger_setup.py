@@ -0,0 +1,90 @@
+# tests/test_logger_setup.py
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import logger_setup
+from logger_setup import configure_logger, log_stats, stop_logging
+
+
+class Rendered:
+    """Remembers the thread that turned it into text."""
+
+    def __init__(self):
+        self.thread = None
+
+    def __str__(self):
+        self.thread = threading.current_thread().name
+        return "rendered"
+
+
+def log_from_worker(name, i):
+    logging.getLogger(name).info("worker line %d", i)
+    return os.getpid()
+
+
+@pytest.fixture
+def fresh_logger(request, monkeypatch):
+    for key, value in logger_setup.config.items():
+        monkeypatch.setitem(logger_setup.config, key, value)
+    logger = logging.getLogger(f"tradebot.test.{request.node.name}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    yield logger
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def test_async_json_lines_are_formatted_off_the_logging_thread(fresh_logger, tmp_path):
+    logger_setup.set_config({"async": True, "format": "json"})
+    path = tmp_path / "logs" / "bot.log"
+    configure_logger(fresh_logger, str(path), console=False)
+    before = log_stats()["records"]
+
+    argument = Rendered()
+    fresh_logger.info("Plan: %s", argument)
+    stop_logging(fresh_logger)
+
+    assert argument.thread != threading.current_thread().name
+    assert log_stats()["records"] == before + 1
+    with open(path) as file:
+        entry = json.loads(file.readline())
+    assert entry["message"] == "Plan: rendered"
+    assert entry["level"] == "INFO"
+
+
+def test_sync_log_file_rotates_by_size(fresh_logger, tmp_path):
+    logger_setup.set_config({"async": False, "max_bytes": 1000, "backup_count": 2})
+    path = tmp_path / "bot.log"
+    configure_logger(fresh_logger, str(path), console=False)
+
+    for i in range(100):
+        fresh_logger.info("line %d", i)
+
+    assert sorted(os.listdir(tmp_path)) == ["bot.log", "bot.log.1", "bot.log.2"]
+    assert os.path.getsize(path) <= 1000
+
+
+def test_async_records_logged_in_forked_workers_are_written(fresh_logger, tmp_path):
+    logger_setup.set_config({"async": True})
+    path = tmp_path / "bot.log"
+    configure_logger(fresh_logger, str(path), console=False)
+    fresh_logger.info("parent line")
+
+    with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context("fork")) as pool:
+        pids = set(pool.map(log_from_worker, [fresh_logger.name] * 4, range(4)))
+    stop_logging(fresh_logger)
+
+    assert os.getpid() not in pids
+    lines = path.read_text().splitlines()
+    assert len(lines) == 5
+    assert sorted(line.rsplit(" - ", 1)[1] for line in lines) == [
+        "parent line",
+        *(f"worker line {i}" for i in range(4)),
+    ]
@@ -6,9 +6,16 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 
 from unittest.mock import MagicMock
 
+import numpy as np
+import pandas as pd
 import pytest
 
-from logic_modules.momentum_trading import execute_momentum_trades
+from logic_modules.momentum_trading import (
+    execute_momentum_trades,
+    momentum_scores,
+    set_config,
+)
+from logic_modules.trade_plan import TradePlan
 
 
 def test_execute_momentum_trades():
@@ -17,9 +24,35 @@ def test_execute_momentum_trades():
     strategy.logger = MagicMock()
 
     historical_prices = {"AAPL": [150, 155], "GOOG": [1000, 995]}
+    set_config({"momentum_threshold": 0.001, "lookbacks": [1, 5, 20, 60]})
 
-    plan = {}
+    plan = TradePlan(strategy.watchlist)
     execute_momentum_trades(strategy, plan, historical_prices)
 
     assert plan["AAPL"] == "buy"
     assert plan["GOOG"] == "sell"
+
+
+def test_threshold_applies_to_mean_relative_return():
+    strategy = MagicMock()
+    strategy.watchlist = ["UP", "FLAT", "DOWN", "NEW"]
+    prices = pd.DataFrame(
+        {
+            "UP": np.linspace(100, 120, 21),  # +20% over 20 bars
+            "FLAT": np.full(21, 50.0),
+            "DOWN": np.linspace(100, 80, 21),
+            "NEW": [np.nan] * 20 + [10.0],
+        }
+    )
+    set_config({"momentum_threshold": 0.05, "lookbacks": [1, 5, 20]})
+
+    plan = TradePlan(strategy.watchlist)
+    execute_momentum_trades(strategy, plan, prices)
+
+    assert plan == {"UP": "buy", "DOWN": "sell"}
+
+
+def test_momentum_scores_skip_lookbacks_beyond_history():
+    prices = np.array([[100.0], [110.0]])
+
+    np.testing.assert_allclose(momentum_scores(prices, [1, 5]), [0.1])
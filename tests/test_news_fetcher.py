@@ -0,0 +1,56 @@
+# tests/test_news_fetcher.py
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from logic_modules import news_fetcher
+from logic_modules.news_fetcher import TokenBucket, fetch_headlines
+
+
+@pytest.fixture(autouse=True)
+def fast_config():
+    saved = dict(news_fetcher.config)
+    news_fetcher.set_config(
+        {"max_workers": 8, "requests_per_second": 1000, "burst": 100, "backoff": 0.0}
+    )
+    yield
+    news_fetcher.set_config(saved)
+
+
+def slow_news(symbol, start, end, limit=None):
+    time.sleep(0.05)
+    return [SimpleNamespace(headline=f"{symbol} rallies")]
+
+
+def test_fetches_symbols_concurrently():
+    api = MagicMock()
+    api.get_news.side_effect = slow_news
+    symbols = [f"S{i}" for i in range(16)]
+
+    started = time.perf_counter()
+    news = fetch_headlines(api, symbols, "2024-01-01", "2024-01-04")
+
+    assert time.perf_counter() - started < 16 * 0.05 / 2
+    assert news["S3"] == ["S3 rallies"]
+    assert list(news) == symbols
+
+
+def test_retries_then_gives_up():
+    api = MagicMock()
+    api.get_news.side_effect = [ConnectionError("reset"), slow_news("AAPL", 0, 0)]
+    assert fetch_headlines(api, ["AAPL"], "a", "b") == {"AAPL": ["AAPL rallies"]}
+
+    api.get_news.side_effect = ConnectionError("down")
+    assert fetch_headlines(api, ["AAPL"], "a", "b") == {"AAPL": []}
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=50, capacity=1)
+
+    started = time.perf_counter()
+    for _ in range(6):
+        bucket.acquire()
+
+    assert time.perf_counter() - started >= 5 / 50 * 0.9
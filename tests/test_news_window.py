@@ -0,0 +1,138 @@
+# tests/test_news_window.py
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from logic_modules import finbert_utils, news_fetcher
+from logic_modules.finbert_utils import estimate_sentiment_batch
+from logic_modules.news_fetcher import fetch_headlines
+from logic_modules.news_window import NewsWindow
+
+torch = pytest.importorskip("torch")
+
+
+def word_logits(headlines, max_batch_size=None):
+    """Positive for "rose", negative for "fell", neutral otherwise."""
+    return torch.tensor(
+        [[2.0 * ("rose" in h), 2.0 * ("fell" in h), 1.0] for h in headlines]
+    )
+
+
+class NewsAPI:
+    """Serves ``articles`` published by ``now`` and records every request.
+    Like Alpaca, only the ``limit`` newest come back, newest first."""
+
+    offline = True
+
+    def __init__(self, articles):
+        self.articles = articles
+        self.now = None
+        self.requests = []
+
+    def get_news(self, symbol, start, end, limit=10):
+        self.requests.append((symbol, start))
+        start = pd.Timestamp(start, tz=None if "+" in start else "UTC")
+        articles = [
+            SimpleNamespace(id=i, headline=headline, created_at=created_at)
+            for i, (owner, created_at, headline) in enumerate(self.articles)
+            if owner == symbol and start <= created_at <= self.now
+        ]
+        articles.sort(key=lambda article: article.created_at, reverse=True)
+        return articles[:limit]
+
+
+@pytest.fixture
+def scored(monkeypatch):
+    headlines = []
+
+    def headline_logits(batch, max_batch_size=None):
+        headlines.extend(batch)
+        return word_logits(batch)
+
+    monkeypatch.setattr(finbert_utils, "headline_logits", headline_logits)
+    monkeypatch.setitem(news_fetcher.config, "max_workers", 1)
+    return headlines
+
+
+def at(text):
+    return pd.Timestamp(text, tz="UTC")
+
+
+def test_only_new_articles_are_scored_and_old_ones_age_out(scored):
+    api = NewsAPI(
+        [
+            ("AAPL", at("2024-01-01 10:00"), "shares fell"),
+            ("AAPL", at("2024-01-02 10:00"), "shares rose"),
+            ("AAPL", at("2024-01-04 09:00"), "shares rose again"),
+            ("MSFT", at("2024-01-04 09:00"), "market report"),
+        ]
+    )
+    window = NewsWindow(["AAPL", "MSFT"])
+
+    api.now = at("2024-01-03 12:00")
+    assert window.update(api, "2023-12-31", "2024-01-03") == 2
+    api.now = at("2024-01-04 12:00")
+    assert window.update(api, "2024-01-01", "2024-01-04") == 2
+    assert scored == [
+        "shares fell",
+        "shares rose",
+        "shares rose again",
+        "market report",
+    ]
+    assert ("AAPL", at("2024-01-02 10:00").isoformat()) in api.requests
+
+    # The 01-01 article is out of the window once it starts on 01-02
+    api.now = at("2024-01-05 12:00")
+    assert window.update(api, "2024-01-02", "2024-01-05") == 0
+    assert window.headlines() == {
+        "AAPL": ["shares rose", "shares rose again"],
+        "MSFT": ["market report"],
+    }
+    expected = torch.softmax(
+        word_logits(["shares rose", "shares rose again"]).sum(0), 0
+    )
+    probability, label = window.sentiments()["AAPL"]
+    assert label == "positive"
+    np.testing.assert_allclose(probability, expected.max().item(), rtol=1e-6)
+    assert window.sentiments()["MSFT"][1] == "neutral"
+
+
+def test_articles_at_the_high_water_mark_are_not_rescored(scored):
+    api = NewsAPI([("AAPL", at("2024-01-02 10:00"), "shares rose")])
+    window = NewsWindow(["AAPL"])
+    api.now = at("2024-01-02 12:00")
+    window.update(api, "2024-01-01", "2024-01-02")
+
+    # A second article with the same timestamp arrives later
+    api.articles.append(("AAPL", at("2024-01-02 10:00"), "shares fell"))
+    assert window.update(api, "2024-01-01", "2024-01-02") == 1
+    assert scored == ["shares rose", "shares fell"]
+
+    window.expire(at("2024-01-03"))
+    assert window.sentiments()["AAPL"] == (0.0, "neutral")
+    assert not window.sums.any()
+
+
+def test_window_matches_a_full_fetch_when_many_articles_arrive(scored):
+    api = NewsAPI([("AAPL", at("2024-01-02 09:00"), "shares fell")])
+    window = NewsWindow(["AAPL"])
+    api.now = at("2024-01-02 12:00")
+    window.update(api, "2024-01-01", "2024-01-02")
+
+    # More new articles than one request returns
+    api.articles += [
+        ("AAPL", at("2024-01-03 09:00") + pd.Timedelta(minutes=i), f"shares rose {i}")
+        for i in range(12)
+    ]
+    api.now = at("2024-01-03 12:00")
+    window.update(api, "2024-01-01", "2024-01-03")
+
+    full = fetch_headlines(api, ["AAPL"], "2024-01-01", "2024-01-03")
+    assert window.headlines() == {"AAPL": full["AAPL"][::-1]}
+    assert window.headlines()["AAPL"][0] == "shares rose 2"
+    probability, label = window.sentiments()["AAPL"]
+    expected = estimate_sentiment_batch(full)["AAPL"]
+    assert label == expected[1]
+    np.testing.assert_allclose(probability, expected[0], rtol=1e-6)
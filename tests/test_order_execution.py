@@ -0,0 +1,76 @@
+# tests/test_order_execution.py
+import threading
+import time
+from unittest.mock import MagicMock
+
+from logic_modules.order_execution import execute_plan, plan_orders
+
+
+def make_strategy(latency=0.0, failing=()):
+    strategy = MagicMock()
+    strategy.is_backtesting = False
+    strategy.position_sizing.side_effect = lambda symbol: (1000.0, 10.0, 5.0)
+    strategy.get_position.side_effect = lambda symbol: (
+        MagicMock(quantity=7) if symbol != "NONE" else None
+    )
+    strategy.create_order.side_effect = lambda symbol, quantity, side, **kwargs: (
+        symbol,
+        quantity,
+        side,
+    )
+    strategy.in_flight = 0
+    strategy.peak = 0
+    lock = threading.Lock()
+
+    def submit_order(order):
+        with lock:
+            strategy.in_flight += 1
+            strategy.peak = max(strategy.peak, strategy.in_flight)
+        time.sleep(latency)
+        with lock:
+            strategy.in_flight -= 1
+        if order[0] in failing:
+            raise ConnectionError("broker unavailable")
+
+    strategy.submit_order.side_effect = submit_order
+    return strategy
+
+
+def test_plan_orders_accepts_signals_and_random_trades():
+    plan = {"AAPL": "buy", "MSFT": ("sell", 3), "GOOG": ("buy", 2)}
+
+    assert plan_orders(plan) == [
+        ("AAPL", "buy", None),
+        ("MSFT", "sell", 3),
+        ("GOOG", "buy", 2),
+    ]
+
+
+def test_orders_are_submitted_concurrently_and_failures_isolated():
+    strategy = make_strategy(latency=0.1, failing={"TSLA"})
+    plan = {f"SYM{i}": "buy" for i in range(7)}
+    plan.update({"TSLA": ("buy", 4), "MSFT": "sell", "NONE": "sell"})
+
+    started = time.perf_counter()
+    report = execute_plan(strategy, plan, max_workers=10)
+
+    assert time.perf_counter() - started < 0.5
+    assert strategy.peak > 1
+    assert report["failed"] == {"TSLA": "broker unavailable"}
+    assert report["submitted"]["SYM0"] == ("buy", 5.0)
+    # Sells close the whole position, symbols without one are skipped
+    assert report["submitted"]["MSFT"] == ("sell", 7)
+    assert "NONE" not in report["submitted"]
+    assert report["seconds"] > 0
+
+
+def test_backtests_submit_in_plan_order():
+    strategy = make_strategy()
+    strategy.is_backtesting = True
+    plan = {"GOOG": ("buy", 1), "AAPL": "sell", "MSFT": "buy"}
+
+    execute_plan(strategy, plan, max_workers=8)
+
+    assert strategy.peak == 1
+    submitted = [call.args[0][0] for call in strategy.submit_order.call_args_list]
+    assert submitted == ["GOOG", "AAPL", "MSFT"]
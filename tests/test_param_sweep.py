@@ -0,0 +1,70 @@
+# tests/test_param_sweep.py
+import os
+
+import pytest
+
+from logic_modules import momentum_trading, param_sweep, random_trading
+from logic_modules.param_sweep import (
+    apply_parameters,
+    expand_grid,
+    module_configs,
+    run_sweep,
+)
+
+
+def fake_backtest(parameters, log_file_path):
+    """Stands in for a lumibot backtest, scores the run from its configs."""
+    with open(log_file_path, "w") as file:
+        file.write(f"{parameters}\n")
+    if parameters["cash_at_risk"] > 1:
+        raise ValueError("cash_at_risk above 1")
+    return {
+        "total_return": parameters["cash_at_risk"],
+        "sharpe": parameters["cash_at_risk"]
+        - momentum_trading.config["momentum_threshold"],
+        "max_drawdown": {"drawdown": random_trading.config["buy_probability"]},
+    }
+
+
+def test_expand_grid_builds_the_cartesian_product():
+    sets = expand_grid({"cash_at_risk": [0.25, 0.5], "symbols": ["AAPL, MSFT", "TSLA"]})
+
+    assert len(sets) == 4
+    assert {"cash_at_risk": 0.5, "symbols": ["AAPL", "MSFT"]} in sets
+    with pytest.raises(ValueError):
+        expand_grid({"cash_at_rsk": [0.5]})
+
+
+def test_apply_parameters_starts_every_run_from_the_base_configs():
+    base = module_configs()
+    threshold = momentum_trading.config["momentum_threshold"]
+
+    strategy = apply_parameters({"momentum_threshold": 0.5, "cash_at_risk": 0.1}, base)
+    assert momentum_trading.config["momentum_threshold"] == 0.5
+    assert strategy == {"cash_at_risk": 0.1}
+
+    apply_parameters({"buy_probability": 0.0}, base)
+    assert momentum_trading.config["momentum_threshold"] == threshold
+    apply_parameters({}, base)
+
+
+def test_run_sweep_ranks_runs_and_keeps_failures(tmp_path, monkeypatch):
+    monkeypatch.setitem(param_sweep.config, "log_dir", str(tmp_path))
+    sets = expand_grid(
+        [
+            {"cash_at_risk": 0.2, "momentum_threshold": 0.1},
+            {"cash_at_risk": 0.9, "momentum_threshold": 0.1},
+            {"cash_at_risk": 0.5, "buy_probability": 0.3},
+            {"cash_at_risk": 2.0},
+        ]
+    )
+
+    summary = run_sweep(fake_backtest, sets, max_workers=2)
+
+    assert list(summary["run"]) == [1, 2, 0, 3]
+    assert summary["sharpe"].iloc[0] == pytest.approx(0.8)
+    assert summary["max_drawdown"].iloc[1] == 0.3
+    assert summary["error"].iloc[-1] == "cash_at_risk above 1"
+    assert (summary["wall_time"] > 0).all()
+    assert all(os.path.exists(path) for path in summary["log_file"])
+    assert len(set(summary["log_file"])) == 4
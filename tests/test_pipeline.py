@@ -0,0 +1,78 @@
+# tests/test_pipeline.py
+import json
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from logic_modules import pipeline
+from logic_modules.pipeline import Pipeline, load_timings
+
+
+@pytest.fixture
+def timings_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "timings.jsonl")
+    monkeypatch.setitem(pipeline.config, "timings_file", path)
+    monkeypatch.setitem(pipeline.config, "profile_dir", str(tmp_path / "profiles"))
+    monkeypatch.setitem(pipeline.config, "profile_iterations", 0)
+    return path
+
+
+def make_pipeline():
+    steps = Pipeline()
+
+    @steps.stage("fetch")
+    def fetch(state):
+        time.sleep(0.02)
+        state.prices = state.n
+
+    @steps.stage("decide")
+    def decide(state):
+        if state.prices < 0:
+            return False
+        if state.prices == 0:
+            raise ValueError("no prices")
+        state.plan = state.prices * 2
+
+    @steps.stage("submit")
+    def submit(state):
+        state.submitted = True
+
+    return steps
+
+
+def test_stages_are_timed_and_recorded(timings_file):
+    steps = make_pipeline()
+
+    state = SimpleNamespace(n=2)
+    record = steps.run(state, strategy_time="2024-01-02")
+    steps.run(SimpleNamespace(n=-1))
+    steps.run(SimpleNamespace(n=0))
+
+    assert state.plan == 4 and state.submitted
+    assert record["stages"]["fetch"]["wall"] >= 0.02
+    assert record["strategy_time"] == "2024-01-02"
+    assert steps.stats["fetch"]["calls"] == 3
+    assert steps.stats["submit"]["calls"] == 1
+
+    with open(timings_file) as file:
+        records = [json.loads(line) for line in file]
+    assert [r["stopped_at"] for r in records] == [None, "decide", "decide"]
+    assert records[2]["error"] == "decide: no prices"
+    timings = load_timings(timings_file)
+    assert list(timings.columns[:3]) == ["fetch", "decide", "submit"]
+    assert len(timings) == 3
+
+
+def test_profiles_the_requested_iterations(timings_file, tmp_path):
+    steps = make_pipeline()
+    with pytest.raises(ValueError):
+        steps.register("fetch", print)
+
+    steps.profile(2)
+    for n in range(3):
+        steps.run(SimpleNamespace(n=1))
+
+    profiles = sorted(os.listdir(tmp_path / "profiles"))
+    assert profiles == ["iteration_00001.prof", "iteration_00002.prof"]
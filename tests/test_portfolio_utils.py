@@ -0,0 +1,110 @@
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pandas as pd
+from pypfopt.expected_returns import mean_historical_return
+from pypfopt.risk_models import CovarianceShrinkage
+
+from logic_modules import portfolio_utils
+from logic_modules.portfolio_utils import RollingMoments
+
+
+def _random_walk(bars, symbols, seed=0):
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0005, 0.02, size=(bars, len(symbols)))
+    index = pd.date_range("2024-01-01", periods=bars, freq="B", tz="UTC")
+    return pd.DataFrame(
+        100 * np.cumprod(1 + returns, axis=0), index=index, columns=symbols
+    )
+
+
+def test_rolling_moments_match_pypfopt_on_a_sliding_window():
+    prices = _random_walk(120, ["AAPL", "MSFT", "GOOG", "AMZN", "TSLA"])
+    moments = RollingMoments()
+
+    for end in range(30, len(prices) + 1):
+        window = prices.iloc[end - 30 : end]
+        moments.update(window)
+        np.testing.assert_allclose(
+            moments.expected_returns(), mean_historical_return(window), rtol=1e-8
+        )
+        np.testing.assert_allclose(
+            moments.ledoit_wolf(),
+            CovarianceShrinkage(window).ledoit_wolf(),
+            rtol=1e-6,
+            atol=1e-12,
+        )
+
+    assert moments.rebuilds == 1
+    assert moments.updates == len(prices) - 30
+
+
+def test_rolling_moments_recover_once_nan_rows_leave_the_window():
+    prices = _random_walk(50, ["AAPL", "MSFT", "GOOG"])
+    prices.iloc[:5, 2] = np.nan  # listed late
+    moments = RollingMoments()
+
+    for end in range(30, 41):
+        moments.update(prices.iloc[end - 30 : end])
+
+    window = prices.iloc[10:40]
+    fresh = RollingMoments()
+    fresh.update(window)
+    assert np.isfinite(moments.expected_returns()).all()
+    np.testing.assert_allclose(moments.expected_returns(), fresh.expected_returns())
+    np.testing.assert_allclose(
+        moments.ledoit_wolf(), CovarianceShrinkage(window).ledoit_wolf(), rtol=1e-6
+    )
+
+
+def test_rolling_moments_rebuild_on_rewritten_history():
+    prices = _random_walk(40, ["AAPL", "MSFT", "GOOG"])
+    moments = RollingMoments()
+    moments.update(prices.iloc[:30])
+
+    revised = prices.iloc[1:31].copy()
+    revised.iloc[-2, 0] *= 1.01
+    moments.update(revised)
+
+    assert moments.rebuilds == 2
+    np.testing.assert_allclose(
+        moments.ledoit_wolf(), CovarianceShrinkage(revised).ledoit_wolf(), rtol=1e-6
+    )
+
+
+def test_rolling_moments_rebuild_when_a_middle_bar_is_rewritten():
+    prices = _random_walk(40, ["AAPL", "MSFT", "GOOG"])
+    moments = RollingMoments()
+    moments.update(prices.iloc[:30])
+
+    revised = prices.iloc[1:31].copy()
+    revised.iloc[14, 1] *= 1.05
+    moments.update(revised)
+
+    assert moments.rebuilds == 2
+    np.testing.assert_allclose(
+        moments.expected_returns(), mean_historical_return(revised), rtol=1e-8
+    )
+    np.testing.assert_allclose(
+        moments.ledoit_wolf(), CovarianceShrinkage(revised).ledoit_wolf(), rtol=1e-6
+    )
+
+
+def test_optimize_portfolio_reuses_weights_for_unchanged_inputs(monkeypatch):
+    monkeypatch.setattr(portfolio_utils, "_moments", RollingMoments())
+    monkeypatch.setattr(portfolio_utils, "_cache", portfolio_utils.OptimizerCache())
+    prices = _random_walk(60, ["AAPL", "MSFT", "GOOG", "AMZN"], seed=3)
+
+    before = portfolio_utils.optimizer_stats()
+    first = portfolio_utils.optimize_portfolio(prices)
+    second = portfolio_utils.optimize_portfolio(prices)
+    after = portfolio_utils.optimizer_stats()
+
+    assert first and first == second
+    assert after["calls"] - before["calls"] == 2
+    assert after["optimizations"] - before["optimizations"] == 1
+    assert after["cache_hits"] - before["cache_hits"] == 1
@@ -0,0 +1,90 @@
+# tests/test_price_utils.py
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from logic_modules import price_utils
+from logic_modules.price_utils import bars_to_prices, fetch_price_matrix
+
+
+def long_bars(closes_by_symbol):
+    """Alpaca-style bars frame from {symbol: {date: close}}."""
+    rows = [
+        (pd.Timestamp(day, tz="UTC"), symbol, close)
+        for symbol, closes in closes_by_symbol.items()
+        for day, close in closes.items()
+    ]
+    frame = pd.DataFrame(rows, columns=["timestamp", "symbol", "close"])
+    return frame.set_index("timestamp")
+
+
+BARS = long_bars(
+    {
+        "AAPL": {"2024-01-02": 10.0, "2024-01-03": 11.0, "2024-01-04": 12.0},
+        "MSFT": {"2024-01-02": 20.0, "2024-01-04": 22.0},  # missing 01-03
+        "TSLA": {"2024-01-04": 30.0},  # listed late
+    }
+)
+
+
+def test_rows_are_aligned_by_timestamp():
+    prices = bars_to_prices(BARS, ["MSFT", "AAPL", "NVDA"], gap_policy="ffill")
+
+    assert list(prices.columns) == ["MSFT", "AAPL"]
+    assert prices.index[1] == pd.Timestamp("2024-01-03", tz="UTC")
+    np.testing.assert_array_equal(prices["MSFT"], [20.0, 20.0, 22.0])
+    np.testing.assert_array_equal(prices["AAPL"], [10.0, 11.0, 12.0])
+
+
+def test_drop_policy_removes_gappy_symbols():
+    prices = bars_to_prices(BARS, ["AAPL", "MSFT", "TSLA"], gap_policy="drop")
+
+    assert list(prices.columns) == ["AAPL"]
+    assert not prices.isna().values.any()
+
+
+class ChunkedAPI:
+    """Serves ``BARS`` from ``start`` on and records the symbols of every
+    request. Like Alpaca, ``limit`` caps the rows of the whole response."""
+
+    offline = True
+
+    def __init__(self):
+        self.clock = lambda: pd.Timestamp("2024-01-05", tz="UTC")
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def get_bars(self, symbols, timeframe, start=None, limit=None):
+        with self._lock:
+            self.requests.append(list(symbols))
+        bars = BARS[BARS["symbol"].isin(symbols)]
+        if start is not None:
+            bars = bars[bars.index >= pd.Timestamp(start, tz="UTC")]
+        return SimpleNamespace(df=bars.iloc[:limit])
+
+
+def test_chunked_fetch_matches_single_reshape(monkeypatch):
+    monkeypatch.setitem(price_utils.config, "chunk_size", 1)
+    api = ChunkedAPI()
+    symbols = ["MSFT", "AAPL", "NVDA", "TSLA"]
+
+    prices = fetch_price_matrix(api, symbols, bars_length=3, gap_policy="drop")
+
+    assert sorted(api.requests) == [["AAPL"], ["MSFT"], ["NVDA"], ["TSLA"]]
+    assert prices.dtypes.eq(np.float32).all()
+    expected = bars_to_prices(BARS, symbols, gap_policy="drop")
+    pd.testing.assert_frame_equal(prices, expected.astype(np.float32))
+
+
+def test_every_symbol_of_a_chunk_gets_its_last_bars(monkeypatch):
+    monkeypatch.setitem(price_utils.config, "chunk_size", 2)
+    symbols = ["AAPL", "MSFT"]
+
+    prices = fetch_price_matrix(ChunkedAPI(), symbols, bars_length=2)
+
+    expected = bars_to_prices(BARS, symbols, gap_policy="ffill").iloc[-2:]
+    pd.testing.assert_frame_equal(prices, expected.astype(np.float32))
+    np.testing.assert_array_equal(prices["MSFT"], [20.0, 22.0])
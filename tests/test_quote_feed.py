@@ -0,0 +1,73 @@
+# tests/test_quote_feed.py
+import numpy as np
+import pandas as pd
+
+from logic_modules import quote_feed
+from logic_modules.quote_feed import QuoteBook, ReplayQuoteFeed, spread_matrix
+from logic_modules.trade_plan import TradePlan
+from logic_modules.transaction_filter import filter_transactions
+
+
+def make_quotes():
+    return pd.DataFrame(
+        {
+            "symbol": ["AAPL", "MSFT", "AAPL", "TSLA", "MSFT"],
+            "timestamp": pd.to_datetime(
+                [
+                    "2024-01-02 14:00",
+                    "2024-01-02 14:05",
+                    "2024-01-02 15:00",
+                    "2024-01-02 15:30",
+                    "2024-01-03 14:00",
+                ],
+                utc=True,
+            ),
+            "bid_price": [99.0, 50.0, 99.9, 10.0, 48.0],
+            "ask_price": [101.0, 50.5, 100.1, 10.5, 52.0],
+        }
+    )
+
+
+def test_replay_keeps_the_latest_quote_per_symbol():
+    book = QuoteBook(["AAPL", "MSFT", "GOOG"])
+    feed = ReplayQuoteFeed(book, make_quotes())
+
+    assert feed.advance(pd.Timestamp("2024-01-02 14:30", tz="UTC")) == 2
+    assert np.allclose(book.spreads()[:2], [0.02, 0.5 / 50.25])
+    assert feed.advance(pd.Timestamp("2024-01-02 16:00", tz="UTC")) == 2
+    assert feed.advance(pd.Timestamp("2024-01-02 16:00", tz="UTC")) == 0
+
+    spreads = book.spreads(["MSFT", "AAPL", "GOOG", "XYZ"])
+    assert np.allclose(spreads[:2], [0.5 / 50.25, 0.2 / 100.0])
+    assert np.isnan(spreads[2:]).all()
+
+
+def test_stale_quotes_count_as_missing(monkeypatch):
+    monkeypatch.setitem(quote_feed.config, "max_age", 3600)
+    book = QuoteBook(["AAPL", "MSFT"])
+    ReplayQuoteFeed(book, make_quotes()).advance(pd.Timestamp("2024-01-02 16:00Z"))
+
+    spreads = book.spreads(now=pd.Timestamp("2024-01-02 15:45Z"))
+    assert not np.isnan(spreads[0]) and np.isnan(spreads[1])
+
+
+def test_filter_applies_the_book_spreads_as_a_mask():
+    symbols = ["AAPL", "MSFT", "GOOG"]
+    book = QuoteBook(symbols)
+    book.update("MSFT", 48.0, 52.0)
+    book.update("AAPL", 99.9, 100.1)
+    plan = TradePlan.from_dict({"AAPL": "buy", "MSFT": "buy", "GOOG": "sell"})
+
+    filter_transactions(None, plan, book.spreads(plan.symbols))
+
+    assert plan.to_dict() == {"AAPL": "buy", "GOOG": "sell"}
+
+
+def test_spread_matrix_matches_the_book_at_every_time():
+    times = pd.to_datetime(
+        ["2024-01-02 14:30", "2024-01-02 16:00", "2024-01-03 15:00"], utc=True
+    )
+    spreads = spread_matrix(make_quotes(), times, ["AAPL", "MSFT"])
+
+    assert spreads.shape == (3, 2)
+    assert np.allclose(spreads[:, 1], [0.5 / 50.25, 0.5 / 50.25, 0.08])
@@ -4,6 +4,7 @@ from unittest.mock import MagicMock
 import pytest
 
 from logic_modules.random_trading import execute_random_trades, set_config
+from logic_modules.trade_plan import TradePlan
 
 
 def test_execute_random_trades_buy():
@@ -11,7 +12,7 @@ def test_execute_random_trades_buy():
     strategy.watchlist = ["AAPL", "GOOG"]
     strategy.last_trades = {}
 
-    plan = {}
+    plan = TradePlan(strategy.watchlist)
     set_config({"buy_probability": 1.0, "sell_probability": 0.0})  # Force buy
 
     execute_random_trades(strategy, plan)
@@ -25,7 +26,7 @@ def test_execute_random_trades_sell():
     strategy.watchlist = ["AAPL", "GOOG"]
     strategy.last_trades = {"AAPL": "buy"}
 
-    plan = {}
+    plan = TradePlan(strategy.watchlist)
     set_config({"buy_probability": 0.0, "sell_probability": 1.0})  # Force sell
 
     execute_random_trades(strategy, plan)
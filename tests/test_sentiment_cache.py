@@ -0,0 +1,40 @@
+# tests/test_sentiment_cache.py
+import numpy as np
+import pytest
+
+from logic_modules.sentiment_cache import SentimentCache
+
+
+def test_memory_tier_counts_hits_and_misses():
+    cache = SentimentCache(path=None, max_memory_items=2)
+    cache.put_many(["a", "b", "c"], np.eye(3))
+
+    rows = cache.get_many(["a", "b", "c"])
+
+    assert rows[0] is None  # evicted as least recently used
+    np.testing.assert_array_equal(rows[2], [0, 0, 1])
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    SentimentCache(path=path).put_many(["markets rose"], [[1.0, 2.0, 3.0]])
+
+    cache = SentimentCache(path=path)
+    rows = cache.get_many(["markets rose", "traders were displeased"])
+
+    np.testing.assert_array_equal(rows[0], [1.0, 2.0, 3.0])
+    assert rows[1] is None
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_disk_tier_is_bounded(tmp_path):
+    cache = SentimentCache(
+        path=str(tmp_path / "cache.sqlite"), max_disk_bytes=64 * 1024
+    )
+    for start in range(0, 5000, 500):
+        headlines = [f"headline {i}" for i in range(start, start + 500)]
+        cache.put_many(headlines, np.ones((500, 3)))
+
+    assert cache.stats()["disk_bytes"] <= 64 * 1024
@@ -0,0 +1,140 @@
+# tests/test_sentiment_server.py
+import os
+import stat
+import threading
+
+import numpy as np
+import pytest
+
+from logic_modules import finbert_utils, sentiment_server
+from logic_modules.sentiment_cache import SentimentCache
+from logic_modules.sentiment_server import SentimentClient, SentimentServer
+
+torch = pytest.importorskip("torch")
+
+
+def word_logits(headlines, max_batch_size=None):
+    """Positive for "rose", negative for "fell", neutral otherwise."""
+    return torch.tensor(
+        [[2.0 * ("rose" in h), 2.0 * ("fell" in h), 1.0] for h in headlines]
+    )
+
+
+@pytest.fixture(autouse=True)
+def key_file(monkeypatch, tmp_path):
+    path = tmp_path / "sentiment_server.key"
+    monkeypatch.setitem(sentiment_server.config, "authkey", None)
+    monkeypatch.setitem(sentiment_server.config, "key_file", str(path))
+    monkeypatch.setattr(finbert_utils, "sentiment_cache", SentimentCache(path=None))
+    return path
+
+
+@pytest.fixture
+def server(monkeypatch):
+    calls = []
+
+    def local_logits(headlines, max_batch_size=None):
+        calls.append(list(headlines))
+        return word_logits(headlines)
+
+    monkeypatch.setattr(finbert_utils, "local_logits", local_logits)
+    server = SentimentServer("127.0.0.1:0", batch_window=0.2).start()
+    server.calls = calls
+    host, port = server.address
+    monkeypatch.setitem(finbert_utils.config, "server", f"{host}:{port}")
+    monkeypatch.setattr(finbert_utils, "_client", None)
+    yield server
+    server.close()
+
+
+def test_concurrent_requests_share_one_batch(server):
+    address = finbert_utils.config["server"]
+    requests = [["shares rose"], ["shares fell", "report"], ["market today"]]
+    results = [None] * len(requests)
+    barrier = threading.Barrier(len(requests))
+
+    def score(i):
+        client = SentimentClient(address)
+        barrier.wait()
+        results[i] = client.logits(requests[i])
+        client.close()
+
+    threads = [threading.Thread(target=score, args=(i,)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(server.calls) == 1 and len(server.calls[0]) == 4
+    for request, logits in zip(requests, results):
+        np.testing.assert_array_equal(logits, word_logits(request).numpy())
+
+
+def test_estimate_sentiment_uses_the_server(server):
+    probability, sentiment = finbert_utils.estimate_sentiment(["shares rose"])
+
+    assert sentiment == "positive"
+    assert server.stats["requests"] == 1
+    # Nothing was loaded in this process
+    assert finbert_utils.warmup() is None
+
+
+def test_cached_headlines_are_not_sent_to_the_server(server):
+    finbert_utils.estimate_sentiment(["shares rose"])
+    finbert_utils.estimate_sentiment_batch(
+        {"AAPL": ["shares rose"], "MSFT": ["shares fell"]}
+    )
+
+    assert server.calls == [["shares rose"], ["shares fell"]]
+
+
+def test_threads_share_one_client_that_a_failure_replaces(server):
+    address = finbert_utils.config["server"]
+    clients, results = [], []
+    barrier = threading.Barrier(8)
+
+    def score():
+        barrier.wait()
+        clients.append(finbert_utils._server_client())
+        results.append(finbert_utils._server_logits(["market report"]))
+
+    threads = [threading.Thread(target=score) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(map(id, clients))) == 1
+    assert all(logits is not None for logits in results)
+
+    clients[0].close()
+    assert finbert_utils._server_logits(["shares fell"]) is None
+    assert finbert_utils._client is None
+    assert finbert_utils._server_client().address == address
+
+
+def test_unreachable_server_falls_back_in_process(monkeypatch):
+    monkeypatch.setitem(finbert_utils.config, "server", "127.0.0.1:1")
+    monkeypatch.setattr(finbert_utils, "_client", None)
+    monkeypatch.setattr(finbert_utils, "local_logits", word_logits)
+
+    assert finbert_utils.estimate_sentiment(["shares fell"])[1] == "negative"
+
+
+def test_parse_address():
+    assert sentiment_server.parse_address("localhost:8765") == ("localhost", 8765)
+    assert sentiment_server.parse_address("[::1]:8765") == ("::1", 8765)
+    assert sentiment_server.parse_address("/tmp/finbert.sock") == "/tmp/finbert.sock"
+    for address in ("0.0.0.0:8765", "192.168.1.5:8765", "example.com:8765"):
+        with pytest.raises(ValueError):
+            sentiment_server.parse_address(address)
+
+
+def test_server_generates_a_private_random_key(server, key_file):
+    key = key_file.read_text()
+    assert len(key) == 64
+    assert stat.S_IMODE(os.stat(key_file).st_mode) == 0o600
+
+    address = finbert_utils.config["server"]
+    sentiment_server.set_config({"authkey": b"guessed"})
+    with pytest.raises(Exception):
+        SentimentClient(address)
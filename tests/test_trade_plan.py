@@ -0,0 +1,54 @@
+# tests/test_trade_plan.py
+import numpy as np
+import pytest
+
+from logic_modules.order_execution import plan_orders
+from logic_modules.trade_plan import BUY, SELL, TradePlan
+from logic_modules.transaction_filter import filter_transactions, set_config
+
+
+def test_stages_write_masks_and_later_stages_win():
+    plan = TradePlan(["AAPL", "MSFT", "GOOG", "TSLA"])
+
+    plan.assign(np.array([True, True, False, False]), BUY, "news")
+    plan.assign(plan.index(["MSFT", "GOOG"]), SELL, "momentum")
+    plan.set("TSLA", "buy", 4, source="random")
+
+    assert plan == {
+        "AAPL": "buy",
+        "MSFT": "sell",
+        "GOOG": "sell",
+        "TSLA": ("buy", 4),
+    }
+    assert [source for *_, source in plan.entries()] == [
+        "news",
+        "momentum",
+        "momentum",
+        "random",
+    ]
+    assert plan_orders(plan)[-1] == ("TSLA", "buy", 4)
+
+
+def test_copies_are_independent_and_share_the_universe():
+    plan = TradePlan.from_dict({"AAPL": "buy"}, ["AAPL", "MSFT"])
+    copy = plan.copy()
+
+    copy.drop(copy.active)
+
+    assert len(copy) == 0 and plan["AAPL"] == "buy"
+    assert copy.symbol_index is plan.symbol_index
+    with pytest.raises(KeyError):
+        plan["MSFT"]
+    with pytest.raises(ValueError):
+        plan.set("MSFT", "hold")
+
+
+def test_spread_filter_drops_every_rejected_entry():
+    symbols = [f"SYM{i}" for i in range(6)]
+    plan = TradePlan.from_dict(dict.fromkeys(symbols, "buy"))
+    set_config({"spread_limit": 0.02})
+
+    # Used to delete keys from the dict it was iterating over
+    filter_transactions(None, plan, {s: 0.05 for s in symbols[:4]})
+
+    assert list(plan) == ["SYM4", "SYM5"]
@@ -1,11 +1,12 @@
 # tests/test_transaction_filter.py
 import pytest
 
+from logic_modules.trade_plan import TradePlan
 from logic_modules.transaction_filter import filter_transactions, set_config
 
 
 def test_filter_transactions():
-    plan = {"AAPL": "buy", "GOOG": "sell"}
+    plan = TradePlan.from_dict({"AAPL": "buy", "GOOG": "sell"})
     spreads = {"AAPL": 0.03, "GOOG": 0.01}
 
     set_config({"spread_limit": 0.02})
@@ -1,4 +1,5 @@
 import os
+import time
 from dotenv import load_dotenv
 import pandas as pd
 import logging
@@ -10,8 +11,13 @@ from lumibot.backtesting import YahooDataBacktesting
 from alpaca_trade_api import REST, TimeFrame
 
 # Import utility functions
-from logic_modules.asset_utils import position_sizing, get_sentiment
+from logic_modules.asset_utils import position_sizing, get_sentiments
+from logic_modules.finbert_utils import warmup as warmup_finbert
 from logic_modules.portfolio_utils import optimize_portfolio
+from logic_modules.price_utils import fetch_historical_prices
+from logic_modules.bar_store import BarStore
+from logic_modules.broker_snapshot import BrokerSnapshot
+from logic_modules.local_data import LocalREST, load_dataset, local_data_backtesting
 
 from logger_setup import setup_logger
 
@@ -31,9 +37,14 @@ ALPACA_CREDS = {
 
 # Define the strategy
 class PortfolioTrader(Strategy):
-    def initialize(self, symbols: list = None, cash_at_risk: float = 0.5, timeframe='day', bars_length=150):
-        # Initialize the API
-        self.api = REST(ALPACA_CREDS["API_KEY"], ALPACA_CREDS["API_SECRET"], base_url=ALPACA_CREDS["BASE_URL"])
+    def initialize(self, symbols: list = None, cash_at_risk: float = 0.5, timeframe='day', bars_length=150, data_dir=None):
+        # Initialize the API, served from the local dataset in offline backtests
+        if data_dir:
+            self.dataset = load_dataset(data_dir)
+            self.api = LocalREST(self.dataset, self.get_datetime)
+        else:
+            self.dataset = None
+            self.api = REST(ALPACA_CREDS["API_KEY"], ALPACA_CREDS["API_SECRET"], base_url=ALPACA_CREDS["BASE_URL"])
         
         # Default to 25 diverse symbols if none are provided
         if symbols is None:
@@ -52,41 +63,24 @@ class PortfolioTrader(Strategy):
         self.cash_at_risk = cash_at_risk
         self.timeframe = timeframe
         self.bars_length = bars_length  # Number of historical bars to fetch
+        # Local bar history, updated incrementally; offline the dataset already is one
+        self.bar_store = BarStore() if self.dataset is None else None
         self.last_trades = {symbol: None for symbol in self.symbols}
+        self.snapshot = None  # Broker state of the current iteration
 
     def position_sizing(self, symbol):
-        return position_sizing(self, symbol, self.cash_at_risk)
+        return position_sizing(self, symbol, self.cash_at_risk, self.snapshot)
 
     def fetch_historical_prices(self):
-        logging.info(f"Fetching historical prices for {', '.join(self.symbols)}")
-
-        try:
-            # Ensure no 'quote' parameter is passed
-            bars = self.api.get_bars(
-                self.symbols,
-                TimeFrame.Day,
-                limit=30  # Adjust this as needed
-            )
-
-            price_data = {}
-            for symbol in self.symbols:
-                df = bars.df[bars.df['symbol'] == symbol]
-                if df.empty:
-                    logging.warning(f"No data for {symbol}")
-                else:
-                    price_data[symbol] = df['close'].values
-
-            price_df = pd.DataFrame(price_data)
-            logging.info(f"Retrieved historical prices: {price_df.head()}")
-            return price_df
-
-        except Exception as e:
-            logging.error(f"Error fetching historical prices: {e}")
-            raise
+        # Only bars newer than the local store are downloaded, windows are served from disk
+        return fetch_historical_prices(self.api, self.symbols, self.bars_length, self.bar_store)
 
 
     def on_trading_iteration(self):
+        started = time.perf_counter()
         try:
+            # One bulk fetch of cash, positions and prices instead of calls per symbol
+            self.snapshot = BrokerSnapshot.take(self, self.symbols)
             historical_prices = self.fetch_historical_prices()
             
             # Check if historical prices are valid
@@ -97,6 +91,9 @@ class PortfolioTrader(Strategy):
             portfolio_weights = optimize_portfolio(historical_prices)
             logger.info(f"Portfolio Weights: {portfolio_weights}")
 
+            # Score the whole universe in one batched model run
+            sentiments = get_sentiments(self, self.symbols)
+
             for symbol in self.symbols:
                 cash, last_price, quantity = self.position_sizing(symbol)
 
@@ -109,7 +106,7 @@ class PortfolioTrader(Strategy):
 
                 # Check if cash is available for the trade
                 if cash > last_price:
-                    probability, sentiment = get_sentiment(self, symbol)
+                    probability, sentiment = sentiments[symbol]
                     logger.info(f"Sentiment for {symbol}: Probability={probability}, Sentiment={sentiment}")
 
                     # Positive sentiment - Buy
@@ -158,16 +155,22 @@ class PortfolioTrader(Strategy):
 
         except Exception as e:
             logger.error(f"Error during trading iteration: {e}")
+        finally:
+            logger.info("Trading iteration took %.2fs", time.perf_counter() - started)
 
 
     def sell_all(self, symbol):
         """Sell all shares of a specific symbol."""
         try:
-            position = self.get_position(symbol)
-            if position and position.quantity > 0:
+            if self.snapshot is not None:
+                quantity = self.snapshot.position(symbol)
+            else:
+                position = self.get_position(symbol)
+                quantity = position.quantity if position else 0
+            if quantity > 0:
                 order = self.create_order(
                     symbol,
-                    position.quantity,
+                    quantity,
                     "sell",
                     type="market",
                     time_in_force="day"
@@ -176,24 +179,46 @@ class PortfolioTrader(Strategy):
         except Exception as e:
             logger.error(f"Error selling all for {symbol}: {e}")
 
+    def _dump_benchmark_stats(self):
+        if self.dataset is None:
+            return super()._dump_benchmark_stats()
+        self._benchmark_returns_df = self.dataset.benchmark_returns(
+            self._benchmark_asset, self._backtesting_start, self._backtesting_end
+        )
+
 if __name__ == "__main__":
     start_date = datetime(2023, 11, 15)
     end_date = datetime(2023, 12, 31)
 
-    broker = Alpaca(ALPACA_CREDS)
-    strategy = PortfolioTrader(
-        name="PortfolioTrader",
-        broker=broker,
-        parameters={
-            "symbols": None,  # Use default list
-            "cash_at_risk": 0.5
-        }
-    )
-
-    strategy.backtest(
-        YahooDataBacktesting,
-        start_date,
-        end_date,
-        logfile="my_log.log",
-        parameters={}
-    )
+    # Load FinBERT in the background while the broker and strategy are set up
+    warmup_finbert()
+
+    # BACKTEST_DATA_DIR points at a local dataset for an offline, reproducible run
+    data_dir = os.getenv("BACKTEST_DATA_DIR")
+    if data_dir:
+        PortfolioTrader.backtest(
+            local_data_backtesting(data_dir),
+            start_date,
+            end_date,
+            logfile="my_log.log",
+            parameters={"symbols": None, "cash_at_risk": 0.5, "data_dir": data_dir},
+            risk_free_rate=0.0
+        )
+    else:
+        broker = Alpaca(ALPACA_CREDS)
+        strategy = PortfolioTrader(
+            name="PortfolioTrader",
+            broker=broker,
+            parameters={
+                "symbols": None,  # Use default list
+                "cash_at_risk": 0.5
+            }
+        )
+
+        strategy.backtest(
+            YahooDataBacktesting,
+            start_date,
+            end_date,
+            logfile="my_log.log",
+            parameters={}
+        )